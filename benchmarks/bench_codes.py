@@ -0,0 +1,25 @@
+'''Compares parsing the JMdict with its entity descriptions expanded against keeping the entity codes
+
+Run from the repository root:
+    python -m benchmarks.bench_codes [path/to/JMdict_e_examp.xml]
+'''
+from src.JapaneseParsers.parseJMdict import parseEntries
+
+from .util_bench import report, retainedMemory, samplePath, timeIt
+
+
+def main():
+    xlmFile = samplePath('data', 'JMdict_e_examp.xml')
+
+    for name, codes in [('descriptions', False), ('codes', True)]:
+        for remove_archaic, filter in [(False, False), (True, True)]:
+            label = '{}{}'.format(name, ' + filters' if remove_archaic else '')
+            seconds, entries = timeIt(lambda: list(parseEntries(xlmFile, remove_archaic, filter, True, codes=codes)),
+                                      repeat=1)
+            report(label, seconds, len(entries))
+        retained, peak = retainedMemory(lambda: list(parseEntries(xlmFile, stream=True, codes=codes)))
+        print('    retained: {:.1f} MiB, peak: {:.1f} MiB'.format(retained / 2**20, peak / 2**20))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+'''Compares parsing the JMdict straight from its gzip archive with unpacking it to disk first
+
+Run from the repository root:
+    python -m benchmarks.bench_compressed [path/to/JMdict_e_examp.gz]
+
+An uncompressed xml can also be given, which is gzipped into a temporary folder first
+'''
+import gzip
+import os
+import shutil
+import tempfile
+
+from src.JapaneseParsers.parseJMdict import parseEntries
+from src.JapaneseParsers.util_parse import isPlainFile
+
+from .util_bench import report, samplePath, timeIt
+
+
+def unpackThenParse(gzName, folder):
+    '''The previous flow, which gunzips the archive to disk before parsing it
+
+    returns the number of entries and the bytes written to disk
+    '''
+    xlmFile = os.path.join(folder, 'JMdict_e_examp.xml')
+    with gzip.open(gzName, 'rb') as archive, open(xlmFile, 'wb') as file:
+        shutil.copyfileobj(archive, file, 2**20)
+    written = os.path.getsize(xlmFile)
+    count = sum(1 for _ in parseEntries(xlmFile, stream=True))
+    os.remove(xlmFile)
+    return count, written
+
+def parseArchive(gzName):
+    '''Parses the entries straight from the archive
+
+    returns the number of entries and the bytes written to disk
+    '''
+    return sum(1 for _ in parseEntries(gzName, stream=True)), 0
+
+def main():
+    source = samplePath('data', 'JMdict_e_examp.gz')
+
+    with tempfile.TemporaryDirectory() as folder:
+        gzName = source
+        if isPlainFile(source):
+            gzName = os.path.join(folder, 'JMdict_e_examp.gz')
+            with open(source, 'rb') as file, gzip.open(gzName, 'wb') as archive:
+                shutil.copyfileobj(file, archive, 2**20)
+        archiveSize = os.path.getsize(gzName)
+
+        for name, func in [('unpack then parse', lambda: unpackThenParse(gzName, folder)),
+                           ('parse gzip', lambda: parseArchive(gzName))]:
+            seconds, (count, written) = timeIt(func, repeat=1)
+            report(name, seconds, count)
+            print('    written to disk: {:.1f} MiB, footprint: {:.1f} MiB'.format(
+                written / 2**20, (archiveSize + written) / 2**20))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+'''Compares the single-pass getKEle/getREle/getSense with the previous findall versions
+
+Run from the repository root:
+    python -m benchmarks.bench_decode [path/to/JMdict_e_examp.xml]
+
+Every element is decoded by both versions, and the pickled results must be identical
+'''
+import pickle
+import time
+
+from src.JapaneseParsers import parseJMdict
+from src.JapaneseParsers.util_parse import parseTree
+
+from .util_bench import report, samplePath
+
+
+# Reference versions, one findall per tag
+def findallKEle(k_ele):
+    infList = [item.text for item in k_ele.findall('ke_inf')]
+    priList = [item.text for item in k_ele.findall('ke_pri')]
+    return k_ele.find('keb').text, infList, priList
+
+def findallREle(r_ele):
+    trueKanji = not r_ele.find('re_nokanji')
+
+    restrict = [item.text for item in r_ele.findall('re_restr')]
+    infList = [item.text for item in r_ele.findall('re_inf')]
+    priList = [item.text for item in r_ele.findall('re_pri')]
+
+    return r_ele.find('reb').text, trueKanji, restrict, infList, priList
+
+def findallSense(sense):
+    kRestrict = [item.text for item in sense.findall('stagk')]
+    rRestrict = [item.text for item in sense.findall('stagr')]
+    xref = [item.text.split('・') for item in sense.findall('xref')]
+    ant = [item.text.split('・') for item in sense.findall('ant')]
+    posList = [item.text for item in sense.findall('pos')]
+    fieldList = [item.text for item in sense.findall('field')]
+    mscList = [item.text for item in sense.findall('misc')]
+    dialList = [item.text for item in sense.findall('dial')]
+    priList = [item.text for item in sense.findall('pri')]
+    infList = [item.text for item in sense.findall('s_inf')]
+
+    lsourceList = {}
+    for item in sense.findall('lsource'):
+        lsourceList[item.text] = {'lang': item.get('xlm:lang'), 'type': item.get('ls_type'), 'wasei': item.get('ls_wasei')}
+
+    glossList = {}
+    for item in sense.findall('gloss'):
+        glossList[item.text] = {'lang': item.get('xml:lang'), 'gender': item.get('g_gend')}
+
+    exampleList = [parseJMdict.getExample(item) for item in sense.findall('example')]
+
+    return kRestrict, rRestrict, xref, ant, posList, fieldList, mscList, lsourceList, dialList, glossList, priList, infList, exampleList
+
+def decodeAll(func, elements, rounds):
+    '''Decodes every element several times
+
+    returns the best time of a round
+    '''
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for element in elements:
+            func(element)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def main():
+    xlmFile = samplePath('data', 'JMdict_e_examp.xml')
+    root = parseTree(xlmFile)
+    elements = {tag: root.findall('entry/' + tag) for tag in ['k_ele', 'r_ele', 'sense']}
+
+    cases = [
+        ('k_ele', findallKEle, parseJMdict.getKEle),
+        ('r_ele', findallREle, parseJMdict.getREle),
+        ('sense', findallSense, parseJMdict.getSense)
+    ]
+    for tag, reference, current in cases:
+        for element in elements[tag]:
+            if pickle.dumps(reference(element)) != pickle.dumps(current(element)):
+                raise AssertionError('{} decodes differently: {}'.format(tag, pickle.dumps(reference(element))))
+
+        rounds = 5
+        for name, func in [('findall', reference), ('single pass', current)]:
+            seconds = decodeAll(func, elements[tag], rounds)
+            report('{} {}'.format(tag, name), seconds, len(elements[tag]))
+    print('outputs are byte-identical')
+
+
+if __name__ == '__main__':
+    main()
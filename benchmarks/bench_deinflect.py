@@ -0,0 +1,82 @@
+'''Compares deinflection through the suffix rule table against trying every rule on every word
+
+Run from the repository root:
+    python -m benchmarks.bench_deinflect [path/to/JMdict_e_examp.xml]
+
+Without the dataset, the sample JMdict in the tests is used instead
+'''
+import os
+from src.JapaneseParsers.deinflectJMdict import RULES, DeinflectIndex, deinflect, getTypes, inflect, splitTypes
+
+from .util_bench import report, samplePath, timeIt
+
+# The number of conjugated words to look up
+SAMPLE = 200000
+
+
+def scanRules(word):
+    '''The naive flow, which tests every rule against every candidate with endswith
+
+    returns the number of candidates
+    '''
+    rules = RULES
+    results = [(word, -1)]
+    seen = set(results)
+    position = 0
+    while position < len(results):
+        candidate, candidateType = results[position]
+        position += 1
+        for inflectedSuffix, dictionarySuffix, typesIn, typeOut, _ in rules:
+            if candidateType & typesIn and candidate.endswith(inflectedSuffix):
+                stem = candidate[:len(candidate) - len(inflectedSuffix)] + dictionarySuffix
+                if stem and (stem, typeOut) not in seen:
+                    seen.add((stem, typeOut))
+                    results.append((stem, typeOut))
+    return len(results)
+
+def conjugatedSample(xlmFile, count):
+    '''Conjugates the verbs and adjectives of a JMdict file
+
+    returns a list of count conjugated words, repeating the forms if there are fewer
+    '''
+    from src.JapaneseParsers import parseJMdict
+    words = []
+    for _, kana, resultDic in parseJMdict.parseEntries(xlmFile, stream=True, sequence=True, codes=True, keys=['part_of_speech']):
+        readings = resultDic.values() if kana else [data for readings in resultDic.values() for data in readings.values()]
+        written = next(iter(resultDic))
+        for data in readings:
+            for wordType in splitTypes(getTypes(data['part_of_speech'])):
+                words.extend(inflect(written, wordType))
+            break
+        if len(words) >= count:
+            break
+    return (words * (count // len(words) + 1))[:count]
+
+def main():
+    xlmFile = samplePath('data', 'JMdict_e_examp.xml')
+    if not os.path.exists(xlmFile):
+        xlmFile = os.path.join('tests', 'samples', 'JMdict_sample.xml')
+
+    seconds, index = timeIt(lambda: DeinflectIndex.fromFile(xlmFile), repeat=1)
+    report('build index', seconds, len(index))
+
+    words = conjugatedSample(xlmFile, SAMPLE)
+    distinct = list(dict.fromkeys(words))
+    print('    {} conjugated words, {} distinct'.format(len(words), len(distinct)))
+
+    seconds, _ = timeIt(lambda: [scanRules(word) for word in distinct[:2000]], repeat=1)
+    report('every rule, 2000 words', seconds, min(2000, len(distinct)))
+    seconds, _ = timeIt(lambda: [deinflect(word) for word in distinct])
+    report('suffix table deinflect', seconds, len(distinct))
+
+    index.cacheSize = 0
+    seconds, _ = timeIt(lambda: [index.lookup(word) for word in distinct])
+    report('lookup, no cache', seconds, len(distinct))
+    index.cacheSize = 65536
+    seconds, results = timeIt(lambda: [index.lookup(word) for word in words])
+    report('lookup, cached', seconds, len(words))
+    print('    {:.1%} found'.format(sum(1 for result in results if result) / len(results)))
+
+
+if __name__ == '__main__':
+    main()
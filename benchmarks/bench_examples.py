@@ -0,0 +1,29 @@
+'''Compares carrying example sentences in every parsed reading with parsing without them and keeping a separate corpus
+
+Run from the repository root:
+    python -m benchmarks.bench_examples [path/to/JMdict_e_examp.xml]
+'''
+from src.JapaneseParsers.exampleJMdict import ExampleCorpus
+from src.JapaneseParsers.parseJMdict import READING_KEYS, parseEntries
+
+from .util_bench import report, retainedMemory, samplePath, timeIt
+
+KEYS = [key for key in READING_KEYS if key != 'examples']
+
+
+def main():
+    xlmFile = samplePath('data', 'JMdict_e_examp.xml')
+
+    cases = [
+        ('examples in every reading', lambda: list(parseEntries(xlmFile, stream=True))),
+        ('without examples', lambda: list(parseEntries(xlmFile, stream=True, keys=KEYS))),
+        ('example corpus', lambda: ExampleCorpus.fromFile(xlmFile)),
+    ]
+    for name, func in cases:
+        seconds, result = timeIt(func, repeat=1)
+        memory, _ = retainedMemory(func)
+        report(name, seconds, len(result), memory)
+
+
+if __name__ == '__main__':
+    main()
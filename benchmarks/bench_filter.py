@@ -0,0 +1,39 @@
+'''Compares filtering JMdict entries after they are built with filtering them before they are decoded
+
+Run from the repository root:
+    python -m benchmarks.bench_filter [path/to/JMdict_e_examp.xml]
+'''
+from src.JapaneseParsers.filterJMdict import EntryFilter
+from src.JapaneseParsers.parseJMdict import parseEntries
+
+from .util_bench import report, samplePath, timeIt
+
+
+def filterAfter(xlmFile, codes):
+    '''The previous flow, which builds every entry and then checks its part-of-speech
+
+    returns the number of entries kept
+    '''
+    return sum(1 for kana, item in parseEntries(xlmFile, stream=True)
+               if any(codes & set(cell['part_of_speech'])
+                      for cell in (item.values() if kana else
+                                   [cell for readings in item.values() for cell in readings.values()])))
+
+def main():
+    xlmFile = samplePath('data', 'JMdict_e_examp.xml')
+    where = EntryFilter(pos=['v1'])
+
+    cases = [
+        ('build everything', lambda: sum(1 for _ in parseEntries(xlmFile, stream=True))),
+        ('filter after building', lambda: filterAfter(xlmFile, {'Ichidan verb'})),
+        ('filter before decoding', lambda: sum(1 for _ in parseEntries(xlmFile, stream=True, where=where))),
+        ('phrases only', lambda: sum(1 for _ in parseEntries(xlmFile, stream=True, keys=['phrases']))),
+        ('remove archaic and filter', lambda: sum(1 for _ in parseEntries(xlmFile, True, True, True))),
+    ]
+    for name, func in cases:
+        seconds, count = timeIt(func, repeat=1)
+        report(name, seconds, count)
+
+
+if __name__ == '__main__':
+    main()
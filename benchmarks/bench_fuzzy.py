@@ -0,0 +1,67 @@
+'''Compares typo tolerant reading search through the deletion neighbourhood against checking every reading
+
+Run from the repository root:
+    python -m benchmarks.bench_fuzzy [path/to/JMdict_e_examp.xml]
+
+Without the dataset, random readings the size of the JMdict are used instead
+'''
+import os
+import random
+from src.JapaneseParsers.fuzzyJMdict import ReadingIndex, editDistance
+from src.JapaneseParsers.util_kana import normalizeReading
+
+from .util_bench import report, samplePath, timeIt
+
+# About the number of distinct readings in the JMdict
+READINGS = 200000
+
+QUERIES = ['taberu', 'tabelu', 'タベル', 'toukyou', 'konpyuta', 'asoko', 'nihongo', 'sensei']
+
+
+def scanKeys(index, text, maxDistance):
+    '''The previous flow, which compares the query with every reading
+
+    returns the number of readings within maxDistance
+    '''
+    key = normalizeReading(text)
+    return sum(1 for other in index.keys if editDistance(key, other, maxDistance) <= maxDistance)
+
+def randomReadings(count):
+    '''Makes random readings with the length of JMdict readings, and the queries among them
+
+    yields (reb, seq, priList)
+    '''
+    generator = random.Random(0)
+    kana = [chr(code) for code in range(ord('あ'), ord('ん') + 1)]
+    for query in QUERIES:
+        yield normalizeReading(query), 0, ['ichi1']
+    for seq in range(1, count):
+        yield ''.join(generator.choice(kana) for _ in range(generator.randint(2, 7))), seq, []
+
+def buildIndex(xlmFile, maxDistance):
+    '''Builds the index from the dataset, or from random readings when it is missing
+
+    returns the ReadingIndex
+    '''
+    if os.path.exists(xlmFile):
+        return ReadingIndex.fromFile(xlmFile, maxDistance)
+    return ReadingIndex(randomReadings(READINGS), maxDistance)
+
+def main():
+    xlmFile = samplePath('data', 'JMdict_e_examp.xml')
+
+    for maxDistance in [1, 2]:
+        seconds, index = timeIt(lambda: buildIndex(xlmFile, maxDistance), repeat=1)
+        report('build, {} typos'.format(maxDistance), seconds, len(index))
+        print('    memory: {:.1f} MiB, {} deletions'.format(index.memoryUsage() / 2**20, len(index.hashes)))
+
+        seconds, _ = timeIt(lambda: [scanKeys(index, query, maxDistance) for query in QUERIES], repeat=1)
+        report('scan every reading', seconds, len(QUERIES))
+        seconds, _ = timeIt(lambda: [index.search(query) for query in QUERIES])
+        report('deletion neighbourhood', seconds, len(QUERIES))
+        seconds, _ = timeIt(lambda: [index.lookup(query) for query in QUERIES])
+        report('normalized lookup', seconds, len(QUERIES))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+'''Measures the build time, memory, and lookup latency of the JMdictIndex
+
+Run from the repository root:
+    python -m benchmarks.bench_index [path/to/JMdict_e_examp.xml]
+'''
+import random
+import time
+
+from src.JapaneseParsers.indexJMdict import JMdictIndex
+
+from .util_bench import report, samplePath, timeIt
+
+
+def lookupLatency(lookup, keys, rounds=5):
+    '''Times lookups over a list of keys
+    lookup - the lookup method
+    keys - the keys to look up
+    rounds - the number of passes over the keys (default 5)
+
+    returns the mean time of a single lookup in microseconds
+    '''
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for key in keys:
+            lookup(key)
+    return (time.perf_counter() - start) / (rounds * len(keys)) * 1e6
+
+def main():
+    xlmFile = samplePath('data', 'JMdict_e_examp.xml')
+
+    for name, records in [('index (dictionaries)', False), ('index (records)', True)]:
+        seconds, index = timeIt(lambda: JMdictIndex.fromFile(xlmFile, records=records), repeat=1)
+        report(name, seconds, len(index), index.memoryUsage())
+        print('    lookup tables only: {:.1f} MiB'.format(index.memoryUsage(entries=False) / 2**20))
+
+    rng = random.Random(0)
+    samples = {
+        'seq': rng.sample(list(index.entries), min(10000, len(index.entries))),
+        'kanji': rng.sample(list(index.byKanji), min(10000, len(index.byKanji))),
+        'reading': rng.sample(list(index.byReading), min(10000, len(index.byReading))),
+        'gloss': rng.sample(list(index.byGloss), min(10000, len(index.byGloss)))
+    }
+    lookups = {
+        'seq': index.lookupSeq, 'kanji': index.lookupKanji,
+        'reading': index.lookupReading, 'gloss': index.lookupGloss
+    }
+    for name, keys in samples.items():
+        print('lookup {:<8} {:>8.2f} us'.format(name, lookupLatency(lookups[name], keys)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+'''Compares opening the memory mapped dictionary with building a JMdictIndex in each process
+
+Run from the repository root:
+    python -m benchmarks.bench_mapped [path/to/JMdict_e_examp.xml]
+'''
+import os
+import random
+import tempfile
+
+from src.JapaneseParsers.indexJMdict import JMdictIndex
+from src.JapaneseParsers.mappedDictionary import MappedDictionary, compileDictionary
+
+from .bench_index import lookupLatency
+from .util_bench import report, retainedMemory, samplePath, timeIt
+
+
+def main():
+    xlmFile = samplePath('data', 'JMdict_e_examp.xml')
+
+    with tempfile.TemporaryDirectory() as folder:
+        fileName = os.path.join(folder, 'japanese.jdcmap')
+        seconds, _ = timeIt(lambda: compileDictionary(fileName, xlmFile), repeat=1)
+        print('compiled in {:.3f} s, {:.1f} MiB on disk'.format(seconds, os.path.getsize(fileName) / 2**20))
+
+        seconds, index = timeIt(lambda: JMdictIndex.fromFile(xlmFile), repeat=1)
+        memory, _ = retainedMemory(lambda: JMdictIndex.fromFile(xlmFile))
+        report('JMdictIndex build', seconds, len(index), memory)
+
+        seconds, _ = timeIt(lambda: MappedDictionary(fileName).close())
+        # The list keeps the measured dictionary open for the lookups below
+        opened = []
+        memory, _ = retainedMemory(lambda: opened.append(MappedDictionary(fileName)))
+        dictionary = opened[0]
+        report('MappedDictionary open', seconds, len(dictionary), memory)
+
+        rng = random.Random(0)
+        samples = {
+            'seq': rng.sample(list(index.entries), min(10000, len(index.entries))),
+            'kanji': rng.sample(list(index.byKanji), min(10000, len(index.byKanji))),
+            'reading': rng.sample(list(index.byReading), min(2000, len(index.byReading)))
+        }
+        for name, lookups in [('JMdictIndex', index), ('MappedDictionary', dictionary)]:
+            for key, method in [('seq', 'lookupSeq'), ('kanji', 'lookupKanji'), ('reading', 'lookupReading')]:
+                latency = lookupLatency(getattr(lookups, method), samples[key], rounds=1)
+                print('    {:<18} {:<8} {:>10.2f} us'.format(name, key, latency))
+        dictionary.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+'''Compares parseEntries with parseEntriesParallel over a growing number of processes
+
+Run from the repository root:
+    python -m benchmarks.bench_parallel [path/to/JMdict_e_examp.xml]
+'''
+import os
+
+from src.JapaneseParsers.parseJMdict import parseEntries, parseEntriesParallel
+
+from .util_bench import report, samplePath, timeIt
+
+
+def processCounts():
+    '''Gets the numbers of processes to try
+
+    returns 1, 2, 4, ... up to the number of CPUs, ending with the number of CPUs
+    '''
+    cpus = os.cpu_count() or 1
+    counts = []
+    processes = 1
+    while processes < cpus:
+        counts.append(processes)
+        processes *= 2
+    counts.append(cpus)
+    return counts
+
+def main():
+    xlmFile = samplePath('data', 'JMdict_e_examp.xml')
+
+    serial, entries = timeIt(lambda: list(parseEntries(xlmFile)))
+    count = len(entries)
+    del entries
+    report('parseEntries', serial, count)
+
+    for ordered in (True, False):
+        for processes in processCounts():
+            seconds, _ = timeIt(lambda: list(parseEntriesParallel(xlmFile, processes=processes, ordered=ordered)))
+            name = 'parallel {} {}'.format('ordered' if ordered else 'unordered', processes)
+            report(name, seconds, count)
+            print('    speedup {:>6.2f}x'.format(serial / seconds if seconds else 0))
+
+
+if __name__ == '__main__':
+    main()
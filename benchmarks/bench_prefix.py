@@ -0,0 +1,32 @@
+'''Measures the build time and query latency of the autocomplete PrefixIndex
+
+Run from the repository root:
+    python -m benchmarks.bench_prefix [path/to/JMdict_e_examp.xml]
+'''
+import random
+import time
+
+from src.JapaneseParsers.autocompleteJMdict import PrefixIndex
+
+from .util_bench import report, samplePath, timeIt
+
+
+def main():
+    xlmFile = samplePath('data', 'JMdict_e_examp.xml')
+
+    seconds, index = timeIt(lambda: PrefixIndex.fromFile(xlmFile), repeat=1)
+    report('build', seconds, len(index))
+    print('    precomputed prefixes: {}'.format(len(index.top)))
+
+    rng = random.Random(0)
+    for length in (1, 2, 3, 4):
+        prefixes = [word[:length] for word in rng.sample(index.keys, min(10000, len(index.keys)))]
+        start = time.perf_counter()
+        for prefix in prefixes:
+            index.search(prefix, 10)
+        latency = (time.perf_counter() - start) / len(prefixes) * 1e6
+        print('top-10 for {}-character prefixes {:>8.2f} us'.format(length, latency))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,23 @@
+'''Compares the dictionary output of parseEntries with the compact Reading records
+
+Run from the repository root:
+    python -m benchmarks.bench_records [path/to/JMdict_e_examp.xml]
+'''
+from src.JapaneseParsers.parseJMdict import parseEntries
+
+from .util_bench import report, retainedMemory, samplePath, timeIt
+
+
+def main():
+    xlmFile = samplePath('data', 'JMdict_e_examp.xml')
+
+    for name, records in [('dictionaries', False), ('records', True)]:
+        seconds, entries = timeIt(lambda: list(parseEntries(xlmFile, stream=True, records=records)), repeat=1)
+        count = len(entries)
+        del entries
+        memory, _ = retainedMemory(lambda: list(parseEntries(xlmFile, stream=True, records=records)))
+        report(name, seconds, count, memory)
+
+
+if __name__ == '__main__':
+    main()
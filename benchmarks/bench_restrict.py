@@ -0,0 +1,99 @@
+'''Compares parseNKana with the previous restriction resolution on the entries with the most cells
+
+Run from the repository root:
+    python -m benchmarks.bench_restrict [path/to/JMdict_e_examp.xml]
+
+Both versions must give equal dictionaries for every entry
+'''
+import time
+import xml.etree.ElementTree as ET
+
+from src.JapaneseParsers import parseJMdict
+from src.JapaneseParsers.util_parse import deepSizeOf, parseTree
+
+from .util_bench import report, samplePath
+
+
+# Reference version, resolving the restrictions for every (word, pronounce, sense)
+def crossProductNKana(entry):
+    wordDict = {}
+    for item in entry.findall('k_ele'):
+        word_jp, infList, priList = parseJMdict.getKEle(item)
+        wordDict[word_jp] = {}
+
+    for item in entry.findall('r_ele'):
+        word_jp, trueKanji, restrict, infList, priList = parseJMdict.getREle(item)
+        if not restrict:
+            restrict = list(wordDict.keys())
+        for r in restrict:
+            wordDict[r][word_jp] = parseJMdict.newCell(infList, priList)
+
+    for item in entry.findall('sense'):
+        sense = parseJMdict.getSense(item)
+        kRestrict, rRestrict = sense[0], sense[1]
+        if not kRestrict:
+            kRestrict = list(wordDict.keys())
+        if not rRestrict:
+            rRestrict = []
+            for stag in kRestrict:
+                rRestrict.extend(pro for pro in list(wordDict[stag].keys()) if pro not in rRestrict)
+
+        for kstag in kRestrict:
+            for rstag in rRestrict:
+                if rstag in wordDict[kstag].keys():
+                    parseJMdict.addSense(wordDict[kstag][rstag], sense)
+    return wordDict
+
+def makeVariantEntry(kanjiCount=12, readingCount=24, senseCount=40):
+    '''Creates an entry shaped like a common verb with many written and spoken variants
+    '''
+    parts = ['<entry><ent_seq>1</ent_seq>']
+    parts.extend('<k_ele><keb>語{}</keb></k_ele>'.format(k) for k in range(kanjiCount))
+    for r in range(readingCount):
+        restrict = ''.join('<re_restr>語{}</re_restr>'.format(k) for k in range(r % 3, kanjiCount, 3)) if r % 4 == 0 else ''
+        parts.append('<r_ele><reb>ご{}</reb>{}</r_ele>'.format(r, restrict))
+    for s in range(senseCount):
+        stagk = '<stagk>語{}</stagk>'.format(s % kanjiCount) if s % 5 == 0 else ''
+        stagr = '<stagr>ご{}</stagr><stagr>ご{}</stagr>'.format(s % readingCount, (s + 1) % readingCount) if s % 7 == 0 else ''
+        parts.append('<sense>{}{}<pos>verb</pos><gloss>meaning {}</gloss><gloss>sense {}</gloss></sense>'.format(stagk, stagr, s, s))
+    parts.append('</entry>')
+    return ET.fromstring(''.join(parts))
+
+def timeEntries(func, entries, rounds=5):
+    '''Parses every entry several times
+
+    returns the best time of a round
+    '''
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for entry in entries:
+            func(entry)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def main():
+    xlmFile = samplePath('data', 'JMdict_e_examp.xml')
+    entries = [entry for entry in parseTree(xlmFile).iter('entry') if not parseJMdict.isKana(entry)]
+
+    # The worst cases are the entries with the most (word, pronounce) cells and senses
+    def weight(entry):
+        return len(entry.findall('k_ele')) * len(entry.findall('r_ele')) * len(entry.findall('sense'))
+    worst = sorted(entries, key=weight, reverse=True)[:max(len(entries) // 100, 10)]
+
+    cases = [('all entries', entries), ('worst 1%', worst), ('variant entry', [makeVariantEntry()])]
+    for name, sample in cases:
+        for entry in sample:
+            if crossProductNKana(entry) != parseJMdict.parseNKana(entry):
+                raise AssertionError('entry {} parses differently'.format(parseJMdict.getSeqNum(entry)))
+
+        rounds = 100 if len(sample) == 1 else 3
+        for version, func in [('cross product', crossProductNKana), ('index sets', parseJMdict.parseNKana)]:
+            seconds = timeEntries(func, sample, rounds)
+            report('{} {}'.format(name, version), seconds, len(sample), deepSizeOf([func(entry) for entry in sample]))
+    print('outputs are equal')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+'''Compares ranked english search against scanning every parsed entry for the words
+
+Run from the repository root:
+    python -m benchmarks.bench_search [path/to/JMdict_e_examp.xml]
+'''
+import os
+import tempfile
+
+from src.JapaneseParsers.indexJMdict import tokenize
+from src.JapaneseParsers.parseJMdict import parseEntries
+from src.JapaneseParsers.searchEnglish import EnglishIndex
+
+from .util_bench import report, samplePath, timeIt
+
+QUERIES = ['eat', 'to eat', 'there', 'rice field', 'large dog', 'walk slowly', 'computer', 'beautiful']
+
+
+def scanEntries(entries, text):
+    '''The previous flow, which checks the phrases of every entry for all the words
+
+    returns the sequence numbers of the matching entries
+    '''
+    words = set(tokenize(text))
+    found = []
+    for seq, kana, item in entries:
+        cells = item.values() if kana else [cell for readings in item.values() for cell in readings.values()]
+        tokens = set()
+        for cell in cells:
+            for phrase in cell['phrases']:
+                tokens.update(tokenize(phrase))
+        if words <= tokens:
+            found.append(seq)
+    return found
+
+def main():
+    xlmFile = samplePath('data', 'JMdict_e_examp.xml')
+
+    seconds, index = timeIt(lambda: EnglishIndex.fromFiles(xlmFile), repeat=1)
+    report('build index', seconds, len(index))
+    print('    postings: {:.1f} MiB for {} terms'.format(len(index.postings) / 2**20, len(index.terms)))
+
+    with tempfile.TemporaryDirectory() as folder:
+        fileName = os.path.join(folder, 'english.index')
+        index.save(fileName)
+        seconds, loaded = timeIt(lambda: EnglishIndex.load(fileName))
+        report('load index', seconds, len(loaded))
+        print('    file: {:.1f} MiB'.format(os.path.getsize(fileName) / 2**20))
+
+    entries = list(parseEntries(xlmFile, sequence=True))
+    seconds, _ = timeIt(lambda: [scanEntries(entries, query) for query in QUERIES], repeat=1)
+    report('scan parsed entries', seconds, len(QUERIES))
+
+    def searchCold():
+        # Drop the decoded postings so every query decodes its lists again
+        loaded.cache.clear()
+        return [loaded.search(query) for query in QUERIES]
+
+    seconds, _ = timeIt(searchCold)
+    report('ranked search', seconds, len(QUERIES))
+    seconds, _ = timeIt(lambda: [loaded.search(query) for query in QUERIES])
+    report('ranked search (cached)', seconds, len(QUERIES))
+
+
+if __name__ == '__main__':
+    main()
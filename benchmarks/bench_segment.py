@@ -0,0 +1,97 @@
+'''Compares segmenting through the double-array trie against trying every substring in a set of words
+
+Run from the repository root:
+    python -m benchmarks.bench_segment [path/to/JMdict_e_examp.xml]
+
+Without the dataset, random words the size of the JMdict are used instead
+'''
+import os
+import random
+import tempfile
+from src.JapaneseParsers.segmentJMdict import LONGEST, Segmenter, iterWords, segmentCorpus
+
+from .util_bench import report, samplePath, timeIt
+
+# About the number of kebs and rebs in the JMdict
+WORDS = 400000
+SENTENCES = 20000
+
+
+def randomWords(count):
+    '''Makes random words with the length of JMdict words, from kana and the common kanji
+
+    returns a list of (word, seq, priList)
+    '''
+    generator = random.Random(0)
+    characters = [chr(code) for code in range(ord('ぁ'), ord('ん') + 1)] + [chr(code) for code in range(0x4e00, 0x4e00 + 3000)]
+    generator.shuffle(characters)
+    # Characters are used with Zipf frequencies, as in real words
+    weights = [1 / rank for rank in range(1, len(characters) + 1)]
+    # A few words are long expressions, as in the JMdict
+    lengths = [generator.randint(1, 6) if seq % 100 else generator.randint(7, 24) for seq in range(count)]
+    # A word belongs to a single entry, where a JMdict word belongs to a few at most
+    words = dict.fromkeys(''.join(generator.choices(characters, weights, k=length)) for length in lengths)
+    return [(word, seq, []) for seq, word in enumerate(words)]
+
+def randomSentences(words, count):
+    '''Joins random words into sentences
+
+    returns the list of sentences
+    '''
+    generator = random.Random(1)
+    return [''.join(generator.choice(words)[0] for _ in range(generator.randint(4, 12))) for _ in range(count)]
+
+def scanSubstrings(words, longest, text):
+    '''The naive flow, which looks up every substring up to the longest word in a set, longest first
+
+    returns the number of words
+    '''
+    count = 0
+    start = 0
+    while start < len(text):
+        end = start + 1
+        for length in range(min(longest, len(text) - start), 0, -1):
+            if text[start:start + length] in words:
+                end = start + length
+                break
+        count += 1
+        start = end
+    return count
+
+def main():
+    xlmFile = samplePath('data', 'JMdict_e_examp.xml')
+    if os.path.exists(xlmFile):
+        words = list(iterWords(xlmFile))
+    else:
+        words = randomWords(WORDS)
+
+    seconds, segmenter = timeIt(lambda words=words: Segmenter(words), repeat=1)
+    report('build trie', seconds, len(segmenter))
+    used = sum(1 for parent in segmenter.check if parent >= 0)
+    print('    {} slots, {:.1%} used'.format(len(segmenter.check), used / len(segmenter.check)))
+
+    sentences = randomSentences(words, SENTENCES)
+    characters = sum(len(text) for text in sentences)
+    wordSet = {word for word, _, _ in words}
+    longest = max(len(word) for word in wordSet)
+    # The word tuples would otherwise be walked by every garbage collection while timing
+    del words
+
+    seconds, _ = timeIt(lambda: [scanSubstrings(wordSet, longest, text) for text in sentences], repeat=1)
+    report('every substring, longest', seconds, len(sentences))
+    seconds, _ = timeIt(lambda: segmenter.segmentBatch(sentences, LONGEST))
+    report('trie, longest', seconds, len(sentences))
+    seconds, _ = timeIt(lambda: segmenter.segmentBatch(sentences))
+    report('trie, cost lattice', seconds, len(sentences))
+    print('    {:.0f} characters/s'.format(characters / seconds))
+
+    with tempfile.TemporaryDirectory() as directory:
+        fileName = os.path.join(directory, 'segmenter.bin')
+        segmenter.save(fileName)
+        corpus = sentences * 5
+        seconds, _ = timeIt(lambda: sum(1 for _ in segmentCorpus(fileName, corpus)), repeat=1)
+        report('process pool, {} processes'.format(os.cpu_count()), seconds, len(corpus))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+
+def samplePath(*names):
+    '''Gets the dataset to benchmark on
+    names - path parts of the default dataset (relative to the working directory)
+
+    returns the path given on the command line, or the default dataset
+    '''
+    if len(sys.argv) > 1:
+        return sys.argv[1]
+    return os.path.join(*names)
+
+def timeIt(func, repeat=3):
+    '''Times a function, keeping the best run
+    func - the function to call without arguments
+    repeat - the number of runs (default 3)
+
+    returns the best time in seconds and the result of the last run
+    '''
+    best = None
+    result = None
+    for _ in range(repeat):
+        result = None
+        gc.collect()
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best, result
+
+def retainedMemory(func):
+    '''Measures the memory held by the result of a function
+    func - the function to call without arguments
+
+    returns the number of bytes still allocated by the result, and the peak during the call
+    '''
+    gc.collect()
+    tracemalloc.start()
+    result = func()
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current, peak
+
+def report(name, seconds, count, memory=None):
+    '''Prints a line of benchmark results
+    name - the name of the benchmarked case
+    seconds - the time taken
+    count - the number of items processed
+    memory - the number of bytes used (optional)
+    '''
+    line = '{:<32} {:>9.3f} s {:>12.0f} items/s'.format(name, seconds, count / seconds if seconds else 0)
+    if memory is not None:
+        line += ' {:>10.1f} MiB'.format(memory / 2**20)
+    print(line)
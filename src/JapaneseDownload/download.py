@@ -1,23 +1,325 @@
 import gzip
+import hashlib
+import io
+import json
 import os
+import re
 import shutil
 import sys
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 
 import requests
+from requests.adapters import HTTPAdapter
 
 import deprecation
 from .__version import __version__
 
+try:
+    from ..JapaneseParsers import util_parse
+except ImportError:
+    from JapaneseParsers import util_parse
+
+
+JMDICT_URL = 'http://ftp.edrdg.org/pub/Nihongo/JMdict_e_examp.gz'
+KANJIDIC_URL = 'http://www.edrdg.org/kanjidic/kanjidic2.xml.gz'
+RADKFILE_URL = 'http://ftp.usf.edu/pub/ftp.monash.edu.au/pub/nihongo/radkfile.gz'
+KRADFILE_URL = 'http://ftp.usf.edu/pub/ftp.monash.edu.au/pub/nihongo/kradfile.gz'
+RADICALS_URL = 'http://ftp.edrdg.org/pub/Nihongo/kradzip.zip'
+
+CHUNK_SIZE = 2**20
+TIMEOUT = 60
+MANIFEST_NAME = 'manifest.json'
+
+_session = None
+_sessionLock = threading.Lock()
+_manifestLock = threading.Lock()
+
 
 # Utility functions
-def loadDataset(url):
-    r = requests.get(url)
-    if r.status_code == 200:
-        saveName = os.path.join('data', url.split('/')[-1])
-        open(saveName, 'wb').write(r.content)
-        return saveName
+def getSession():
+    '''Gets the session shared by every download, so connections to a host are pooled and reused
+    '''
+    global _session
+    with _sessionLock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=3)
+            _session.mount('http://', adapter)
+            _session.mount('https://', adapter)
+        return _session
+
+def loadDataset(url, dataDir='data', chunkSize=CHUNK_SIZE):
+    '''Downloads a file in chunks, resuming an interrupted download when the server supports ranges
+    url - the location of the file
+    dataDir - the folder to save the file in (default 'data')
+    chunkSize - the number of bytes written at a time (default 1 MiB)
+
+    returns the location of the saved file
+    '''
+    saveName, _ = fetchDataset(url, dataDir, chunkSize)
+    return saveName
+
+def fetchDataset(url, dataDir='data', chunkSize=CHUNK_SIZE, validators=None):
+    '''Downloads a file like loadDataset, optionally only if it changed since the last download
+    url - the location of the file
+    dataDir - the folder to save the file in (default 'data')
+    chunkSize - the number of bytes written at a time (default 1 MiB)
+    validators - dictionary with the 'etag' and 'last_modified' of the last download (default always download)
+
+    returns the location of the saved file (None if the server reported it as unchanged)
+    returns the headers of the response
+    '''
+    saveName = os.path.join(dataDir, url.split('/')[-1])
+    partName = saveName + '.part'
+    validatorName = partName + '.json'
+
+    # A partial file is only resumed when the server can confirm it is still the same file
+    start = os.path.getsize(partName) if os.path.exists(partName) else 0
+    ifRange = readIfRange(validatorName) if start else None
+    if start and ifRange is None:
+        removeFiles(partName, validatorName)
+        start = 0
+    if start:
+        headers = {'Range': 'bytes={}-'.format(start), 'If-Range': ifRange}
     else:
+        headers = getConditionalHeaders(validators)
+
+    with getSession().get(url, headers=headers, stream=True, timeout=TIMEOUT) as r:
+        if r.status_code == 304:
+            return None, r.headers
+        if r.status_code == 416:
+            # The partial file does not fit the file on the server anymore, so start over
+            removeFiles(partName, validatorName)
+            return fetchDataset(url, dataDir, chunkSize, validators)
+        if r.status_code == 206 and getRangeStart(r) == start:
+            mode = 'ab'
+        elif r.status_code == 200:
+            # The whole file is sent when it changed since the partial download, so the old part is dropped
+            mode = 'wb'
+            writeIfRange(validatorName, r.headers)
+        else:
+            raise Exception("Recieved status code {}".format(r.status_code))
+
+        with open(partName, mode) as file:
+            for chunk in r.iter_content(chunkSize):
+                file.write(chunk)
+
+    os.replace(partName, saveName)
+    removeFiles(validatorName)
+    return saveName, r.headers
+
+def readIfRange(validatorName):
+    '''Reads the validator of a partial download, to send as If-Range
+    validatorName - the file holding the ETag and Last-Modified of the partial download
+
+    returns the strong ETag, or else the Last-Modified date, or None if the partial download cannot be checked
+    '''
+    if not os.path.exists(validatorName):
+        return None
+    with open(validatorName, 'r', encoding='utf-8') as file:
+        record = json.load(file)
+    # Weak ETags cannot be used in If-Range
+    etag = record.get('etag')
+    if etag and not etag.startswith('W/'):
+        return etag
+    return record.get('last_modified')
+
+def writeIfRange(validatorName, headers):
+    '''Saves the validators of a download next to its partial file, or removes them if the server sent none
+    validatorName - the file to hold the ETag and Last-Modified
+    headers - the headers of the response
+    '''
+    record = {'etag': headers.get('ETag'), 'last_modified': headers.get('Last-Modified')}
+    if not any(record.values()):
+        removeFiles(validatorName)
+        return
+    with open(validatorName, 'w', encoding='utf-8') as file:
+        json.dump(record, file)
+
+def removeFiles(*fileNames):
+    '''Removes the files that exist
+    '''
+    for fileName in fileNames:
+        if os.path.exists(fileName):
+            os.remove(fileName)
+
+def refreshDataset(url, outputName, unpack, dataDir='data'):
+    '''Downloads and unpacks a dataset, skipping both when it is unchanged since the last refresh
+    url - the location of the file
+    outputName - the file or folder made by unpack
+    unpack - function unpacking the downloaded file (ex. unzip_gz)
+    dataDir - the folder to save the file and the manifest in (default 'data')
+
+    returns True if the dataset was unpacked, False if it was unchanged
+    '''
+    record = readManifest(dataDir).get(url) if os.path.exists(outputName) else None
+    saveName, headers = fetchDataset(url, dataDir, validators=record)
+    if saveName is None:
+        print("{} is unchanged".format(url))
+        return False
+
+    sha256 = util_parse.hashFile(saveName, CHUNK_SIZE)
+    unchanged = record is not None and record.get('sha256') == sha256
+    if not unchanged:
+        unpack(saveName)
+    os.remove(saveName)
+
+    # Only record the download once it is unpacked, so an interrupted refresh is retried in full
+    updateManifest(url, {
+        'etag': headers.get('ETag'), 'last_modified': headers.get('Last-Modified'),
+        'sha256': sha256, 'output': outputName
+    }, dataDir)
+    if unchanged:
+        print("{} has the same checksum".format(url))
+    return not unchanged
+
+def refreshStreamed(url, outputName, dataDir='data', chunkSize=CHUNK_SIZE):
+    '''Downloads a gzip dataset and decompresses it on the fly, skipping it when unchanged since the last refresh
+    url - the location of the gzip file
+    outputName - the file to write the decompressed content to
+    dataDir - the folder holding the manifest (default 'data')
+    chunkSize - the number of bytes read at a time (default 1 MiB)
+
+    returns True if the dataset was written, False if it was unchanged
+    the archive is never saved, so an interrupted download starts over instead of resuming
+    '''
+    record = readManifest(dataDir).get(url) if os.path.exists(outputName) else None
+    headers = getConditionalHeaders(record)
+
+    with getSession().get(url, headers=headers, stream=True, timeout=TIMEOUT) as r:
+        if r.status_code == 304:
+            print("{} is unchanged".format(url))
+            return False
+        if r.status_code != 200:
+            raise Exception("Recieved status code {}".format(r.status_code))
+
+        digest = hashlib.sha256()
+        partName = outputName + '.part'
+        try:
+            with open(partName, 'wb') as file:
+                for data in iterDecompressed(iterHashed(r.iter_content(chunkSize), digest)):
+                    file.write(data)
+        except BaseException:
+            # Without the decompressor state a partial output cannot be resumed
+            removeFiles(partName)
+            raise
+
+    sha256 = digest.hexdigest()
+    unchanged = record is not None and record.get('sha256') == sha256
+    if unchanged:
+        os.remove(partName)
+    else:
+        os.replace(partName, outputName)
+    updateManifest(url, {
+        'etag': r.headers.get('ETag'), 'last_modified': r.headers.get('Last-Modified'),
+        'sha256': sha256, 'output': outputName
+    }, dataDir)
+    if unchanged:
+        print("{} has the same checksum".format(url))
+    return not unchanged
+
+def openDataset(url, chunkSize=CHUNK_SIZE):
+    '''Opens a gzip dataset as a stream of its decompressed content, without writing anything to disk
+    url - the location of the gzip file
+    chunkSize - the number of bytes read at a time (default 1 MiB)
+
+    returns a binary file object, which can be given straight to the parsers
+        (ex. parseEntries(openDataset(JMDICT_URL), stream=True)), and ends the download when closed
+    '''
+    r = getSession().get(url, stream=True, timeout=TIMEOUT)
+    if r.status_code != 200:
+        r.close()
         raise Exception("Recieved status code {}".format(r.status_code))
+    return io.BufferedReader(util_parse.BlockReader(iterDecompressed(r.iter_content(chunkSize)), r.close), chunkSize)
+
+def getConditionalHeaders(validators):
+    '''Gets the headers asking the server to only send a file that changed
+    validators - dictionary with the 'etag' and 'last_modified' of the last download (or None)
+
+    returns the dictionary of headers
+    '''
+    headers = {}
+    if validators:
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+    return headers
+
+def iterHashed(chunks, digest):
+    '''Passes chunks through while adding them to a checksum
+    chunks - an iterator of bytes
+    digest - the hashlib object to update
+
+    yields each chunk
+    '''
+    for chunk in chunks:
+        digest.update(chunk)
+        yield chunk
+
+def iterDecompressed(chunks):
+    '''Decompresses gzip data as it arrives
+    chunks - an iterator of compressed bytes (concatenated gzip members are supported)
+
+    yields the decompressed bytes
+    '''
+    decompressor = None
+    for chunk in chunks:
+        while chunk:
+            if decompressor is None:
+                decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            data = decompressor.decompress(chunk)
+            if data:
+                yield data
+            if decompressor.eof:
+                chunk = decompressor.unused_data
+                decompressor = None
+            else:
+                chunk = b''
+    if decompressor is not None:
+        raise EOFError("Compressed file ended before the end-of-stream marker was reached")
+
+
+def readManifest(dataDir='data'):
+    '''Reads the ETag, Last-Modified, and checksum recorded for every downloaded url
+    dataDir - the folder holding the manifest (default 'data')
+
+    returns a dictionary of {url: {'etag', 'last_modified', 'sha256', 'output'}}
+    '''
+    manifestName = os.path.join(dataDir, MANIFEST_NAME)
+    with _manifestLock:
+        if not os.path.exists(manifestName):
+            return {}
+        with open(manifestName, 'r', encoding='utf-8') as file:
+            return json.load(file)
+
+def updateManifest(url, record, dataDir='data'):
+    '''Records the download of a url in the manifest
+    url - the location of the file
+    record - dictionary of {'etag', 'last_modified', 'sha256', 'output'} for the download
+    dataDir - the folder holding the manifest (default 'data')
+    '''
+    manifestName = os.path.join(dataDir, MANIFEST_NAME)
+    with _manifestLock:
+        manifest = {}
+        if os.path.exists(manifestName):
+            with open(manifestName, 'r', encoding='utf-8') as file:
+                manifest = json.load(file)
+        manifest[url] = record
+        with open(manifestName + '.tmp', 'w', encoding='utf-8') as file:
+            json.dump(manifest, file, indent=4, sort_keys=True)
+        os.replace(manifestName + '.tmp', manifestName)
+
+def getRangeStart(response):
+    '''Gets the first byte of a partial response
+    response - the response with status 206
+
+    returns the start of the Content-Range, or None if missing
+    '''
+    match = re.match(r'bytes (\d+)-', response.headers.get('Content-Range', ''))
+    return int(match.group(1)) if match else None
 
 def unzip_gz(saveName, newExtention=''):
     newName = saveName[:-3] + newExtention
@@ -27,18 +329,17 @@ def unzip_gz(saveName, newExtention=''):
     return newName
 
 def unzip_file(saveName):
-    newName = saveName[:-3]
+    newName = os.path.splitext(saveName)[0]
     shutil.unpack_archive(saveName, newName)
     return newName
 
 def errorDeco(name):
     def deco(func):
-        def wrapper():
+        def wrapper(*args, **kwargs):
             try:
                 print("Attempting to load the {}".format(name))
-                if not os.path.exists('data'):
-                    os.mkdir('data')
-                func()
+                os.makedirs('data', exist_ok=True)
+                func(*args, **kwargs)
                 print("Successfully loaded {}".format(name))
             except Exception as e:
                 print(e)
@@ -48,20 +349,26 @@ def errorDeco(name):
 
 # Extraction Functions
 @errorDeco("JMdict")
-def loadJMdict():
+def loadJMdict(streamed=False):
     ''' Loads the JMdict dataset as JMdict_e_examp.xml
+    streamed - boolean to decompress while downloading (True) or save the archive first so it can resume (False) (default False)
     '''
-    downloadName = loadDataset('http://ftp.edrdg.org/pub/Nihongo/JMdict_e_examp.gz')
-    unzip_gz(downloadName, '.xml')
-    os.remove(downloadName)
+    saveName = os.path.join('data', 'JMdict_e_examp.xml')
+    if streamed:
+        refreshStreamed(JMDICT_URL, saveName)
+    else:
+        refreshDataset(JMDICT_URL, saveName, lambda name: unzip_gz(name, '.xml'))
 
 @errorDeco("KANJIDIC")
-def loadKANJIDIC():
+def loadKANJIDIC(streamed=False):
     '''Loads the KANJIDICT dataset as kanjidic2.xml
+    streamed - boolean to decompress while downloading (True) or save the archive first so it can resume (False) (default False)
     '''
-    downloadName = loadDataset('http://www.edrdg.org/kanjidic/kanjidic2.xml.gz')
-    unzip_gz(downloadName)
-    os.remove(downloadName)
+    saveName = os.path.join('data', 'kanjidic2.xml')
+    if streamed:
+        refreshStreamed(KANJIDIC_URL, saveName)
+    else:
+        refreshDataset(KANJIDIC_URL, saveName, unzip_gz)
 
 @errorDeco("RADKFILE")
 @deprecation.deprecated(deprecated_in="0.0",
@@ -70,9 +377,7 @@ def loadKANJIDIC():
 def loadRADKFILE():
     '''Loads the RADKFILE dataset as radkfile
     '''
-    downloadName = loadDataset('http://ftp.usf.edu/pub/ftp.monash.edu.au/pub/nihongo/radkfile.gz')
-    unzip_gz(downloadName)
-    os.remove(downloadName)
+    refreshDataset(RADKFILE_URL, os.path.join('data', 'radkfile'), unzip_gz)
 
 @errorDeco("KRADFILE")
 @deprecation.deprecated(deprecated_in="0.0", removed_in="1.0",
@@ -81,17 +386,21 @@ def loadRADKFILE():
 def loadKRADFILE():
     '''Loads the KRADFILE dataset as kradfile
     '''
-    downloadName = loadDataset('http://ftp.usf.edu/pub/ftp.monash.edu.au/pub/nihongo/kradfile.gz')
-    unzip_gz(downloadName)
-    os.remove(downloadName)
+    refreshDataset(KRADFILE_URL, os.path.join('data', 'kradfile'), unzip_gz)
 
 @errorDeco("RADFILE")
 def loadRadicals():
     '''Loads the KRAD and RADK datasets as kradfile, kradfile2, and radkfilex in the kradzip folder
     '''
-    downloadName = loadDataset('http://ftp.edrdg.org/pub/Nihongo/kradzip.zip')
-    unzip_file(downloadName)
-    os.remove(downloadName)
+    refreshDataset(RADICALS_URL, os.path.join('data', 'kradzip'), unzip_file)
+
+def loadAll(workers=3):
+    '''Loads the JMdict, KANJIDIC, and radical datasets at the same time
+    workers - the number of datasets downloaded at once (default 3)
+    '''
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for future in [executor.submit(load) for load in (loadJMdict, loadKANJIDIC, loadRadicals)]:
+            future.result()
 
 
 if __name__ == '__main__':
@@ -113,9 +422,7 @@ if __name__ == '__main__':
             data = 'all'
 
         if data in ['all', 'a']:
-            loadJMdict()
-            loadKANJIDIC()
-            loadRadicals()
+            loadAll()
         elif data in ['jmdict', 'edict', 'japanese-multilingual', 'japanese-multilingual dictionary']:
             loadJMdict()
         elif data in ['kanjidic']:
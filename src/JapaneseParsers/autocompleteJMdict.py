@@ -0,0 +1,149 @@
+import heapq
+import os
+from array import array
+from bisect import bisect_left
+
+try:
+    from . import parseJMdict, util_parse
+except ImportError:
+    import parseJMdict
+    import util_parse
+
+
+''' Structure
+keys  # Every keb and reb, sorted so that the words with a prefix are one contiguous range
+seqs  # The sequence number of the entry for each key
+order # The position of each key when sorted by commonness (util_parse.priorityRank, then length)
+top   # {prefix: the most common keys} for prefixes with more keys than the scan limit,
+      # so short prefixes such as 'た' never scan thousands of keys
+'''
+
+LAST_CHARACTER = '\U0010ffff'
+
+
+def main():
+    '''Example function for using the functions in this form
+    '''
+    index = PrefixIndex.fromFile(os.path.join('data', 'JMdict_e_examp.xml'))
+    for word, seq in index.search('たべ'):
+        print(word, seq)
+
+def iterWords(xlmFile):
+    '''Iterates over every keb and reb of a JMdict with its record information
+    xlmFile - the file path for the JMdict file
+
+    yields the word, the sequence number of the entry, and the list of record information
+    '''
+    for entry in parseJMdict.iterEntries(xlmFile, True):
+        seq = int(parseJMdict.getSeqNum(entry))
+        for k_ele in entry.findall('k_ele'):
+            keb, _, priList = parseJMdict.getKEle(k_ele)
+            yield keb, seq, priList
+        for r_ele in entry.findall('r_ele'):
+            reb, _, _, _, priList = parseJMdict.getREle(r_ele)
+            yield reb, seq, priList
+
+
+class PrefixIndex:
+    '''Top-k prefix search over the kanji forms and readings of a JMdict
+    '''
+
+    def __init__(self, words, maxK=50, scanLimit=256):
+        '''Builds the index
+        words - an iterable of (word, seq, priList), as yielded by iterWords
+        maxK - the number of matches kept for the common prefixes (default 50)
+        scanLimit - the largest range of keys scanned at query time (default 256)
+        '''
+        self.maxK = maxK
+        self.scanLimit = scanLimit
+
+        items = sorted({(word, seq): util_parse.priorityRank(priList) for word, seq, priList in words}.items())
+        self.keys = [word for (word, _), _ in items]
+        self.seqs = array('l', (seq for (_, seq), _ in items))
+
+        ranking = sorted(range(len(items)), key=lambda i: (items[i][1], len(self.keys[i]), i))
+        self.order = array('l', [0]) * len(items)
+        for position, i in enumerate(ranking):
+            self.order[i] = position
+
+        self.top = {}
+        self.buildTop()
+
+    @classmethod
+    def fromFile(cls, xlmFile, maxK=50, scanLimit=256):
+        '''Builds the index from a JMdict file
+        xlmFile - the file path for the JMdict file
+        maxK - the number of matches kept for the common prefixes (default 50)
+        scanLimit - the largest range of keys scanned at query time (default 256)
+
+        returns the PrefixIndex
+        '''
+        return cls(iterWords(xlmFile), maxK, scanLimit)
+
+    def buildTop(self):
+        '''Stores the most common keys of every prefix that covers more than scanLimit keys
+        '''
+        if len(self.keys) > self.scanLimit:
+            self.top[''] = array('l', self.rank(0, len(self.keys), self.maxK))
+
+        # Prefixes one character longer can only be large inside a large range, so go deeper one length at a time
+        ranges = [(0, len(self.keys))]
+        depth = 1
+        while ranges:
+            nextRanges = []
+            for lo, hi in ranges:
+                start = lo
+                while start < hi:
+                    if len(self.keys[start]) < depth:
+                        start += 1
+                        continue
+                    prefix = self.keys[start][:depth]
+                    end = self.rangeEnd(prefix, start, hi)
+                    if end - start > self.scanLimit:
+                        self.top[prefix] = array('l', self.rank(start, end, self.maxK))
+                        nextRanges.append((start, end))
+                    start = end
+            ranges = nextRanges
+            depth += 1
+
+    def rangeEnd(self, prefix, lo=0, hi=None):
+        '''Finds the end of the keys starting with a prefix
+        prefix - the prefix
+        lo - the first key to search from (default 0)
+        hi - the key to search to (default the number of keys)
+
+        returns the position after the last key with the prefix
+        '''
+        return bisect_left(self.keys, prefix + LAST_CHARACTER, lo, len(self.keys) if hi is None else hi)
+
+    def rank(self, lo, hi, k):
+        '''Finds the most common keys in a range
+        lo - the first key of the range
+        hi - the position after the range
+        k - the number of keys wanted
+
+        returns the positions of the keys, most common first
+        '''
+        return heapq.nsmallest(k, range(lo, hi), key=self.order.__getitem__)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def search(self, prefix, k=10):
+        '''Finds the most common words starting with a prefix
+        prefix - the start of the keb or reb (ex. 'たべ')
+        k - the number of matches wanted (default 10)
+
+        returns a list of (word, seq), most common first
+        '''
+        top = self.top.get(prefix)
+        if top is not None and k <= self.maxK:
+            positions = top[:k]
+        else:
+            lo = bisect_left(self.keys, prefix)
+            positions = self.rank(lo, self.rangeEnd(prefix, lo), k)
+        return [(self.keys[i], self.seqs[i]) for i in positions]
+
+
+if __name__ == '__main__':
+    main()
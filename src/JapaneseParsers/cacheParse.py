@@ -0,0 +1,173 @@
+import gc
+import hashlib
+import os
+import pickle
+
+try:
+    from . import parseJMdict, parseKANJIDIC, recordJMdict, util_parse
+except ImportError:
+    import parseJMdict
+    import parseKANJIDIC
+    import recordJMdict
+    import util_parse
+
+
+''' Cache layout
+Each cache file holds two pickles written with the highest available protocol (5 on python 3.8+):
+    header # {'version', 'source', 'size', 'mtime', 'sha256'} of the parsed file
+    items  # list of everything the parser yielded
+The header is small, so a stale cache is detected without loading the items.
+A cache is used when the size and mtime of the source are unchanged, or when they changed
+but the content hash is the same (the file was only touched or copied).
+'''
+
+CACHE_VERSION = 2
+
+
+def main():
+    '''Example function for using the functions in this form
+    '''
+    for kana, item in cachedEntries(os.path.join('data', 'JMdict_e_examp.xml')):
+        print(kana, list(item.keys()))
+
+def getCacheName(parseFunc, fileName, args, cacheDir=None):
+    '''Gets the cache file for a parser call
+    parseFunc - the parser function
+    fileName - the file location given to the parser
+    args - the other arguments given to the parser
+    cacheDir - the folder for the cache files (default a 'cache' folder next to the file)
+
+    returns the cache file location
+    '''
+    if cacheDir is None:
+        cacheDir = os.path.join(os.path.dirname(os.path.abspath(fileName)), 'cache')
+    call = '{}.{}{!r}'.format(parseFunc.__module__, parseFunc.__name__, args)
+    callHash = hashlib.sha256(call.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(cacheDir, '{}.{}.{}.pickle'.format(os.path.basename(fileName), parseFunc.__name__, callHash))
+
+def readCache(cacheName, fileName, verify=False):
+    '''Loads a cache file if it is still valid for the source file
+    cacheName - the cache file location
+    fileName - the source file location
+    verify - boolean to always compare the content hash (True) or trust an unchanged size and mtime (False) (default False)
+
+    returns the list of cached items, or None if there is no valid cache
+    '''
+    if not os.path.exists(cacheName):
+        return None
+
+    stat = os.stat(fileName)
+    sha256 = None
+    with open(cacheName, 'rb') as file:
+        try:
+            header = pickle.load(file)
+        except (pickle.UnpicklingError, EOFError):
+            return None
+        if header.get('version') != CACHE_VERSION or header['size'] != stat.st_size:
+            return None
+
+        if verify or header['mtime'] != stat.st_mtime_ns:
+            sha256 = util_parse.hashFile(fileName)
+            if sha256 != header['sha256']:
+                return None
+
+        items = loadItems(file)
+
+    # Same content with a new mtime, so remember it for the next run (once the cache is closed, for Windows)
+    if items is not None and header['mtime'] != stat.st_mtime_ns:
+        writeCache(cacheName, fileName, items, sha256)
+    return items
+
+def loadItems(file):
+    '''Unpickles the items of a cache file
+    file - the open cache file, positioned after the header
+
+    returns the list of cached items, or None if the file was cut short
+    '''
+    # The items are hundreds of thousands of containers, so collecting during the load only wastes time
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return pickle.load(file)
+    except (pickle.UnpicklingError, EOFError):
+        return None
+    finally:
+        if enabled:
+            gc.enable()
+
+def writeCache(cacheName, fileName, items, sha256=None):
+    '''Saves the parsed items of a file
+    cacheName - the cache file location
+    fileName - the source file location
+    items - the list of parsed items
+    sha256 - the content hash of the source file (computed if not given)
+    '''
+    cacheDir = os.path.dirname(cacheName)
+    if cacheDir and not os.path.exists(cacheDir):
+        os.makedirs(cacheDir)
+
+    stat = os.stat(fileName)
+    header = {
+        'version': CACHE_VERSION, 'source': os.path.abspath(fileName),
+        'size': stat.st_size, 'mtime': stat.st_mtime_ns, 'sha256': sha256 or util_parse.hashFile(fileName)
+    }
+
+    util_parse.writeVersioned(cacheName, header, items)
+
+def cachedParse(parseFunc, fileName, *args, cacheDir=None, verify=False):
+    '''Runs a parser, reusing its output from the cache while the file is unchanged
+    parseFunc - a parser function taking the file location first (ex. parseJMdict.parseEntries)
+    fileName - the file location for the parser
+    args - the other arguments for the parser
+    cacheDir - the folder for the cache files (default a 'cache' folder next to the file)
+    verify - boolean to always compare the content hash (True) or trust an unchanged size and mtime (False) (default False)
+
+    yields the same items as the parser
+    the cache is written once the parser has been fully iterated
+    '''
+    cacheName = getCacheName(parseFunc, fileName, args, cacheDir)
+    items = readCache(cacheName, fileName, verify)
+    if items is not None:
+        yield from items
+        return
+
+    # Hash before parsing so a file replaced during the parse is not cached under the new content
+    sha256 = util_parse.hashFile(fileName)
+    items = []
+    for item in parseFunc(fileName, *args):
+        items.append(item)
+        yield item
+    writeCache(cacheName, fileName, items, sha256)
+
+def cachedEntries(xlmFile, remove_archaic=False, filter=False, records=False, cacheDir=None, verify=False):
+    '''Parses all the entries in a JMdict through the cache (see parseJMdict.parseEntries)
+    xlmFile - the file path for the JMdict file
+    remove_archaic - boolean to remove archaic entries (True) or not (False) (default False)
+    filter - boolean to remove inappropriate entries (True) or not (False) (default False)
+    records - boolean to store each reading as a compact recordJMdict.Reading (True) or a dictionary (False) (default False)
+    cacheDir - the folder for the cache files (default a 'cache' folder next to the file)
+    verify - boolean to always compare the content hash (True) or not (False) (default False)
+
+    yields boolean determine if word is only Kana (True) or not (False)
+    yields dictionary for either Kana of non-Kana words
+    '''
+    # The dictionaries are cached, records are rebuilt on load so their strings are interned again
+    for kana, resultDic in cachedParse(parseJMdict.parseEntries, xlmFile, remove_archaic, filter, True,
+                                       cacheDir=cacheDir, verify=verify):
+        if records:
+            resultDic = recordJMdict.toRecords(kana, resultDic)
+        yield kana, resultDic
+
+def cachedCharacters(xmlFile, cacheDir=None, verify=False):
+    '''Parses the characters of a KANJIDIC through the cache (see parseKANJIDIC.parseCharacter)
+    xmlFile - the file location for the KANJIDIC dataset
+    cacheDir - the folder for the cache files (default a 'cache' folder next to the file)
+    verify - boolean to always compare the content hash (True) or not (False) (default False)
+
+    yields the same 19 values as parseKANJIDIC.parseCharacter
+    '''
+    yield from cachedParse(parseKANJIDIC.parseCharacter, xmlFile, True, cacheDir=cacheDir, verify=verify)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,228 @@
+import ast
+import mmap
+import os
+import struct
+import sys
+import zipfile
+from array import array
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    from . import parseKANJIDIC
+except ImportError:
+    import parseKANJIDIC
+
+
+''' Column layout
+Every column is a flat array, stored as an uncompressed .npy member of a .npz file:
+    literal.data, literal.offsets # The Kanji as utf-8 bytes, character i is data[offsets[i]:offsets[i+1]]
+    grade, stroke, freq, jlpt # int16, -1 when missing
+    XXX.offsets # int32, the values of character i are codes[offsets[i]:offsets[i+1]]
+    XXX.codes # int32, index of each value in the dictionary
+    XXX.dictionary.data, XXX.dictionary.offsets # The distinct values as utf-8 bytes
+where XXX is one of the LIST_COLUMNS (on, kun, meanings, nanori).
+This is the layout of Arrow string and list<dictionary<string>> arrays, so the buffers can be
+wrapped by Arrow without copying. The data of every member starts on a 64 byte boundary, so
+loadColumns can memory map the file and hand out views instead of reading it.
+'''
+
+NUMBER_COLUMNS = {'grade': 5, 'stroke': 6, 'freq': 8, 'jlpt': 9}
+LIST_COLUMNS = {'on': 15, 'kun': 16, 'meanings': 17, 'nanori': 18}
+
+ALIGNMENT = 64
+MISSING = -1
+
+# array typecode for each .npy type, all little-endian
+DESCR = {'b': '|i1', 'B': '|u1', 'h': '<i2', 'i': '<i4', 'q': '<i8'}
+TYPECODE = {descr: typecode for typecode, descr in DESCR.items()}
+
+# Zip extra field id used for padding (unknown ids are skipped by zip readers)
+PADDING_ID = 0x4E50
+
+
+def main():
+    '''Example function for using the functions in this form
+    '''
+    fileName = os.path.join('data', 'kanjidic2.npz')
+    saveColumns(buildColumns(os.path.join('data', 'kanjidic2.xml')), fileName)
+
+    columns = loadColumns(fileName)
+    for row in range(5):
+        print(getString(columns, 'literal', row), columns['stroke'][row], getList(columns, 'meanings', row))
+
+def toNumber(value):
+    '''Converts a number from the KANJIDIC to an int
+    value - the string value (or None)
+
+    returns the int, or MISSING if there is no value
+    '''
+    return MISSING if value is None else int(value)
+
+class StringColumn:
+    '''Collects strings as utf-8 data and offsets
+    '''
+
+    def __init__(self):
+        self.data = bytearray()
+        self.offsets = array('i', [0])
+
+    def append(self, text):
+        self.data += text.encode('utf-8')
+        self.offsets.append(len(self.data))
+
+class DictionaryColumn:
+    '''Collects lists of strings as dictionary codes, storing each distinct string once
+    '''
+
+    def __init__(self):
+        self.codes = array('i')
+        self.offsets = array('i', [0])
+        self.dictionary = StringColumn()
+        self.lookup = {}
+
+    def append(self, values):
+        for value in values:
+            code = self.lookup.get(value)
+            if code is None:
+                code = self.lookup[value] = len(self.lookup)
+                self.dictionary.append(value)
+            self.codes.append(code)
+        self.offsets.append(len(self.codes))
+
+def buildColumns(xmlFile):
+    '''Parses a KANJIDIC straight into typed columns
+    xmlFile - the file location (plain, gzip, or zip) or file object for the KANJIDIC dataset
+
+    returns a dictionary of {column name: array or bytes}
+    '''
+    literal = StringColumn()
+    numbers = {name: array('h') for name in NUMBER_COLUMNS}
+    lists = {name: DictionaryColumn() for name in LIST_COLUMNS}
+
+    for kanjiItem in parseKANJIDIC.parseCharacter(xmlFile, True):
+        literal.append(kanjiItem[0])
+        for name, position in NUMBER_COLUMNS.items():
+            numbers[name].append(toNumber(kanjiItem[position]))
+        for name, position in LIST_COLUMNS.items():
+            lists[name].append(kanjiItem[position])
+
+    columns = {'literal.data': bytes(literal.data), 'literal.offsets': literal.offsets}
+    columns.update(numbers)
+    for name, column in lists.items():
+        columns[name + '.offsets'] = column.offsets
+        columns[name + '.codes'] = column.codes
+        columns[name + '.dictionary.data'] = bytes(column.dictionary.data)
+        columns[name + '.dictionary.offsets'] = column.dictionary.offsets
+    return columns
+
+# Saving and Loading
+def npyHeader(descr, length):
+    '''Creates the header of a one dimensional .npy array
+    descr - the .npy type (ex. '<i4')
+    length - the number of items
+
+    returns the header bytes, padded to a multiple of ALIGNMENT
+    '''
+    text = "{{'descr': '{}', 'fortran_order': False, 'shape': ({},), }}".format(descr, length)
+    size = 10 + len(text) + 1
+    text += ' ' * (-size % ALIGNMENT) + '\n'
+    return b'\x93NUMPY\x01\x00' + struct.pack('<H', len(text)) + text.encode('latin1')
+
+def toBytes(column):
+    '''Gets the .npy type and raw bytes of a column
+    column - an array or bytes
+
+    returns the .npy type, the number of items, and the bytes
+    '''
+    if isinstance(column, (bytes, bytearray)):
+        return DESCR['B'], len(column), bytes(column)
+    if sys.byteorder != 'little':
+        column = array(column.typecode, column)
+        column.byteswap()
+    return DESCR[column.typecode], len(column), column.tobytes()
+
+def saveColumns(columns, fileName):
+    '''Saves the columns as an uncompressed .npz file (readable with numpy.load)
+    columns - the dictionary of columns from buildColumns
+    fileName - the file location for the .npz file
+    '''
+    tempName = fileName + '.tmp'
+    with open(tempName, 'wb') as file, zipfile.ZipFile(file, 'w', zipfile.ZIP_STORED) as archive:
+        for name, column in columns.items():
+            descr, length, data = toBytes(column)
+            info = zipfile.ZipInfo(name + '.npy', date_time=(1980, 1, 1, 0, 0, 0))
+
+            # Pad the local header so the array data starts on an aligned offset
+            start = file.tell() + 30 + len(info.filename.encode('utf-8')) + 4
+            info.extra = struct.pack('<HH', PADDING_ID, -start % ALIGNMENT) + b'\0' * (-start % ALIGNMENT)
+            archive.writestr(info, npyHeader(descr, length) + data)
+    os.replace(tempName, fileName)
+
+def loadColumns(fileName, asNumpy=False):
+    '''Memory maps the columns of a .npz file saved by saveColumns, without copying them
+    fileName - the file location for the .npz file
+    asNumpy - boolean to give numpy arrays (True) or memoryviews (False) (default False)
+
+    returns a dictionary of {column name: memoryview or numpy array}
+    the views keep the file mapped until they are all released
+    '''
+    if asNumpy and numpy is None:
+        raise ImportError("numpy is needed to load the columns as numpy arrays")
+    if not asNumpy and sys.byteorder != 'little':
+        raise ValueError("The columns are little-endian, so load them with asNumpy on this machine")
+
+    with open(fileName, 'rb') as file:
+        infos = zipfile.ZipFile(file).infolist()
+        data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    view = memoryview(data)
+    columns = {}
+    for info in infos:
+        if info.compress_type != zipfile.ZIP_STORED:
+            raise ValueError("{} is compressed and cannot be memory mapped".format(info.filename))
+        nameLength, extraLength = struct.unpack_from('<HH', data, info.header_offset + 26)
+        start = info.header_offset + 30 + nameLength + extraLength
+
+        headerLength = struct.unpack_from('<H', data, start + 8)[0]
+        header = ast.literal_eval(data[start + 10:start + 10 + headerLength].decode('latin1'))
+        start += 10 + headerLength
+        length = header['shape'][0]
+
+        name = info.filename[:-len('.npy')]
+        if asNumpy:
+            columns[name] = numpy.frombuffer(data, dtype=header['descr'], count=length, offset=start)
+        else:
+            typecode = TYPECODE[header['descr']]
+            columns[name] = view[start:start + length * array(typecode).itemsize].cast(typecode)
+    return columns
+
+def getString(columns, name, row):
+    '''Gets a string from a string column
+    columns - the loaded columns
+    name - the column name (ex. 'literal')
+    row - the index of the character
+
+    returns the string
+    '''
+    offsets = columns[name + '.offsets']
+    return bytes(columns[name + '.data'][offsets[row]:offsets[row + 1]]).decode('utf-8')
+
+def getList(columns, name, row):
+    '''Gets the strings of a list column
+    columns - the loaded columns
+    name - the column name (ex. 'meanings')
+    row - the index of the character
+
+    returns the list of strings
+    '''
+    offsets = columns[name + '.offsets']
+    codes = columns[name + '.codes']
+    return [getString(columns, name + '.dictionary', code) for code in codes[offsets[row]:offsets[row + 1]]]
+
+
+if __name__ == '__main__':
+    main()
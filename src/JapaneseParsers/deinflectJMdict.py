@@ -0,0 +1,351 @@
+import os
+
+try:
+    from . import parseJMdict
+except ImportError:
+    import parseJMdict
+
+
+''' Deinflection
+A conjugated word is taken back to its dictionary form by rewriting its suffix, one rule at a time:
+    食べられなかった -かった+い (past) 食べられない -ない+る (negative) 食べられる -られる+る (passive) 食べる
+Every rule is (inflected suffix, dictionary suffix, types in, type out, reason). A rule only applies to a
+candidate whose type shares a bit with the types in, and gives a candidate of the type out, so 食べられない
+(an adjective, since ない conjugates like one) can lose ない but 食べられる (ichidan) cannot.
+The word as written has every type. A candidate is a match when it is a keb or reb of an entry
+with a part-of-speech code of its type, or when it is the word as written.
+'''
+
+# Dictionary types, from the part-of-speech codes
+V1 = 1 << 0
+V5U = 1 << 1
+V5K = 1 << 2
+V5KS = 1 << 3
+V5G = 1 << 4
+V5S = 1 << 5
+V5T = 1 << 6
+V5N = 1 << 7
+V5B = 1 << 8
+V5M = 1 << 9
+V5R = 1 << 10
+VK = 1 << 11
+VS = 1 << 12
+NOUN_VS = 1 << 13
+ADJ_I = 1 << 14
+
+# Forms that only come up while deinflecting
+INITIAL = 1 << 20  # The word as written
+TE = 1 << 21  # The te form, which auxiliary verbs are added to
+MASU = 1 << 22  # The polite ます form
+
+ANY = (1 << 23) - 1
+
+POS_TYPES = {
+    'v1': V1, 'v1-s': V1, 'v5u': V5U, 'v5u-s': V5U, 'v5k': V5K, 'v5k-s': V5KS, 'v5g': V5G, 'v5s': V5S,
+    'v5t': V5T, 'v5n': V5N, 'v5b': V5B, 'v5m': V5M, 'v5r': V5R, 'v5r-i': V5R, 'v5aru': V5R,
+    'vk': VK, 'vs-i': VS, 'vs-s': VS, 'vs': NOUN_VS, 'adj-i': ADJ_I, 'adj-ix': ADJ_I
+}
+
+# The stems of each godan row: dictionary ending, i, a, e, o, te, and ta
+GODAN_ROWS = [
+    (V5U, 'う', 'い', 'わ', 'え', 'お', 'って', 'った'),
+    (V5K, 'く', 'き', 'か', 'け', 'こ', 'いて', 'いた'),
+    (V5KS, 'く', 'き', 'か', 'け', 'こ', 'って', 'った'),
+    (V5G, 'ぐ', 'ぎ', 'が', 'げ', 'ご', 'いで', 'いだ'),
+    (V5S, 'す', 'し', 'さ', 'せ', 'そ', 'して', 'した'),
+    (V5T, 'つ', 'ち', 'た', 'て', 'と', 'って', 'った'),
+    (V5N, 'ぬ', 'に', 'な', 'ね', 'の', 'んで', 'んだ'),
+    (V5B, 'ぶ', 'び', 'ば', 'べ', 'ぼ', 'んで', 'んだ'),
+    (V5M, 'む', 'み', 'ま', 'め', 'も', 'んで', 'んだ'),
+    (V5R, 'る', 'り', 'ら', 'れ', 'ろ', 'って', 'った'),
+]
+
+# The endings of every verb type, added to a stem: (stem, ending, types in, reason)
+# where the stem is the godan stem to use, or the ichidan stem (empty)
+VERB_FORMS = [
+    ('a', 'ない', ADJ_I, 'negative'),
+    ('a', 'ず', INITIAL, 'negative'),
+    ('a', 'れる', V1, 'passive'),
+    ('a', 'せる', V1, 'causative'),
+    ('a', 'される', V1, 'causative passive'),
+    ('i', 'ます', MASU, 'polite'),
+    ('i', 'たい', ADJ_I, 'want'),
+    ('i', 'ながら', INITIAL, 'while'),
+    ('i', 'なさい', INITIAL, 'polite imperative'),
+    ('i', 'そう', INITIAL, 'seemingly'),
+    ('i', '', INITIAL, 'stem'),
+    ('e', 'る', V1, 'potential'),
+    ('e', 'ば', INITIAL, 'conditional'),
+    ('e', '', INITIAL, 'imperative'),
+    ('o', 'う', INITIAL, 'volitional'),
+    ('te', '', TE, 'te'),
+    ('ta', '', INITIAL, 'past'),
+    ('ta', 'ら', INITIAL, 'conditional'),
+    ('ta', 'り', INITIAL, 'representative'),
+]
+
+# Ichidan forms, the stem is the verb without る
+ICHIDAN_FORMS = [
+    ('ない', ADJ_I, 'negative'), ('ず', INITIAL, 'negative'), ('られる', V1, 'passive or potential'),
+    ('れる', V1, 'potential'), ('させる', V1, 'causative'), ('させられる', V1, 'causative passive'),
+    ('ます', MASU, 'polite'), ('たい', ADJ_I, 'want'), ('ながら', INITIAL, 'while'),
+    ('なさい', INITIAL, 'polite imperative'), ('そう', INITIAL, 'seemingly'), ('', INITIAL, 'stem'),
+    ('れば', INITIAL, 'conditional'), ('ろ', INITIAL, 'imperative'), ('よ', INITIAL, 'imperative'),
+    ('よう', INITIAL, 'volitional'), ('て', TE, 'te'), ('た', INITIAL, 'past'), ('たら', INITIAL, 'conditional'),
+    ('たり', INITIAL, 'representative'),
+]
+
+# Forms of する and 来る (written in kana or as 来), from the dictionary form
+IRREGULAR_FORMS = [
+    (VS, 'する', [
+        ('しない', ADJ_I, 'negative'), ('せず', INITIAL, 'negative'), ('される', V1, 'passive'),
+        ('させる', V1, 'causative'), ('します', MASU, 'polite'), ('したい', ADJ_I, 'want'),
+        ('しながら', INITIAL, 'while'), ('しなさい', INITIAL, 'polite imperative'),
+        ('すれば', INITIAL, 'conditional'), ('しろ', INITIAL, 'imperative'), ('せよ', INITIAL, 'imperative'),
+        ('しよう', INITIAL, 'volitional'), ('して', TE, 'te'), ('した', INITIAL, 'past'),
+        ('したら', INITIAL, 'conditional'), ('したり', INITIAL, 'representative')
+    ]),
+    (VK, 'くる', [
+        ('こない', ADJ_I, 'negative'), ('こず', INITIAL, 'negative'), ('こられる', V1, 'passive or potential'),
+        ('こさせる', V1, 'causative'), ('きます', MASU, 'polite'), ('きたい', ADJ_I, 'want'),
+        ('くれば', INITIAL, 'conditional'), ('こい', INITIAL, 'imperative'), ('こよう', INITIAL, 'volitional'),
+        ('きて', TE, 'te'), ('きた', INITIAL, 'past'), ('きたら', INITIAL, 'conditional')
+    ]),
+    (VK, '来る', [
+        ('来ない', ADJ_I, 'negative'), ('来ず', INITIAL, 'negative'), ('来られる', V1, 'passive or potential'),
+        ('来させる', V1, 'causative'), ('来ます', MASU, 'polite'), ('来たい', ADJ_I, 'want'),
+        ('来れば', INITIAL, 'conditional'), ('来い', INITIAL, 'imperative'), ('来よう', INITIAL, 'volitional'),
+        ('来て', TE, 'te'), ('来た', INITIAL, 'past'), ('来たら', INITIAL, 'conditional')
+    ]),
+]
+
+# Forms that give another form rather than a dictionary form: (inflected, dictionary, types in, type out, reason)
+CHAIN_RULES = [
+    # い adjectives, which is also how ない and たい conjugate
+    ('かった', 'い', INITIAL, ADJ_I, 'past'), ('くない', 'い', ADJ_I, ADJ_I, 'negative'),
+    ('くて', 'い', TE, ADJ_I, 'te'), ('く', 'い', INITIAL, ADJ_I, 'adverb'),
+    ('ければ', 'い', INITIAL, ADJ_I, 'conditional'), ('かったら', 'い', INITIAL, ADJ_I, 'conditional'),
+    ('かろう', 'い', INITIAL, ADJ_I, 'volitional'), ('さ', 'い', INITIAL, ADJ_I, 'noun'),
+    ('そう', 'い', INITIAL, ADJ_I, 'seemingly'), ('すぎる', 'い', V1, ADJ_I, 'too much'),
+    # Polite forms
+    ('ません', 'ます', INITIAL, MASU, 'negative'), ('ました', 'ます', INITIAL, MASU, 'past'),
+    ('ませんでした', 'ます', INITIAL, MASU, 'negative past'), ('ましょう', 'ます', INITIAL, MASU, 'volitional'),
+    ('まして', 'ます', TE, MASU, 'te'), ('ませ', 'ます', INITIAL, MASU, 'imperative'),
+    # Auxiliary verbs after the te form
+    ('ている', 'て', V1, TE, 'progressive'), ('でいる', 'で', V1, TE, 'progressive'),
+    ('てる', 'て', V1, TE, 'progressive'), ('でる', 'で', V1, TE, 'progressive'),
+    ('てしまう', 'て', V5U, TE, 'completion'), ('でしまう', 'で', V5U, TE, 'completion'),
+    ('ちゃう', 'て', V5U, TE, 'completion'), ('じゃう', 'で', V5U, TE, 'completion'),
+    ('ておく', 'て', V5K, TE, 'in advance'), ('でおく', 'で', V5K, TE, 'in advance'),
+    ('とく', 'て', V5K, TE, 'in advance'), ('どく', 'で', V5K, TE, 'in advance'),
+    ('てある', 'て', V5R, TE, 'resulting state'), ('である', 'で', V5R, TE, 'resulting state'),
+    # Nouns that take する
+    ('する', '', VS, NOUN_VS, 'suru verb'),
+]
+
+
+def main():
+    '''Example function for using the functions in this form
+    '''
+    index = DeinflectIndex.fromFile(os.path.join('data', 'JMdict_e_examp.xml'))
+    for text in ['食べられなかった', '言いました', '高くない', '行って']:
+        for word, seq, reasons in index.lookup(text):
+            print(text, word, seq, ' < '.join(reasons))
+
+def getRules():
+    '''Builds the rule table
+
+    returns a list of (inflected suffix, dictionary suffix, types in, type out, reason)
+    '''
+    rules = list(CHAIN_RULES)
+
+    for rowType, ending, i, a, e, o, te, ta in GODAN_ROWS:
+        stems = {'i': i, 'a': a, 'e': e, 'o': o, 'te': te, 'ta': ta}
+        for stem, form, typesIn, reason in VERB_FORMS:
+            rules.append((stems[stem] + form, ending, typesIn, rowType, reason))
+
+    for form, typesIn, reason in ICHIDAN_FORMS:
+        rules.append((form, 'る', typesIn, V1, reason))
+
+    for verbType, dictionaryForm, forms in IRREGULAR_FORMS:
+        for form, typesIn, reason in forms:
+            rules.append((form, dictionaryForm, typesIn, verbType, reason))
+
+    # An empty inflected suffix would apply to every word
+    return [rule for rule in rules if rule[0]]
+
+def indexRules(rules):
+    '''Groups the rules by their inflected suffix
+
+    returns the dictionary of {inflected suffix: list of rules}, and the longest suffix length
+    '''
+    bySuffix = {}
+    for rule in rules:
+        bySuffix.setdefault(rule[0], []).append(rule)
+    return bySuffix, max(len(suffix) for suffix in bySuffix)
+
+def deinflect(word):
+    '''Finds every form a word could be conjugated from
+    word - the word as written (ex. '食べられなかった')
+
+    returns a list of (candidate, type, reasons), starting with the word itself,
+        where the reasons are the rules applied from the dictionary form outwards (ex. ('passive', 'negative', 'past'))
+    '''
+    results = [(word, ANY, ())]
+    seen = {(word, ANY)}
+    position = 0
+    while position < len(results):
+        candidate, candidateType, reasons = results[position]
+        position += 1
+        for length in range(min(LONGEST_SUFFIX, len(candidate)), 0, -1):
+            rules = RULES_BY_SUFFIX.get(candidate[-length:])
+            if rules is None:
+                continue
+            for _, dictionarySuffix, typesIn, typeOut, reason in rules:
+                if not candidateType & typesIn:
+                    continue
+                stem = candidate[:-length] + dictionarySuffix
+                if stem and (stem, typeOut) not in seen:
+                    seen.add((stem, typeOut))
+                    results.append((stem, typeOut, (reason,) + reasons))
+    return results
+
+def inflect(word, wordType, depth=2):
+    '''Conjugates a dictionary form with the rule table, the reverse of deinflect
+    word - the dictionary form (ex. '食べる')
+    wordType - the type of the word (ex. V1)
+    depth - the number of rules applied on top of each other (default 2)
+
+    returns a dictionary of {conjugated word: reasons}, fewer rules first
+    '''
+    forms = {}
+    current = [(word, wordType, ())]
+    for _ in range(depth):
+        following = []
+        for candidate, candidateType, reasons in current:
+            for inflectedSuffix, dictionarySuffix, typesIn, typeOut, reason in RULES_BY_SUFFIX_OUT.get(candidateType, ()):
+                if not candidate.endswith(dictionarySuffix):
+                    continue
+                conjugated = candidate[:len(candidate) - len(dictionarySuffix)] + inflectedSuffix
+                conjugatedReasons = reasons + (reason,)
+                forms.setdefault(conjugated, conjugatedReasons)
+                # The form conjugates further as each of its types (ex. ない as an adjective)
+                for nextType in splitTypes(typesIn & ~INITIAL):
+                    following.append((conjugated, nextType, conjugatedReasons))
+        current = following
+    return forms
+
+def splitTypes(types):
+    '''Splits a bit mask of types into its single types
+
+    returns the list of types
+    '''
+    return [1 << bit for bit in range(types.bit_length()) if types >> bit & 1]
+
+def getRulesByType(rules):
+    '''Groups the rules by their type out, for inflect
+
+    returns the dictionary of {type out: list of rules}
+    '''
+    byType = {}
+    for rule in rules:
+        byType.setdefault(rule[3], []).append(rule)
+    return byType
+
+def getTypes(posList):
+    '''Gets the deinflection types of a list of part-of-speech codes
+    posList - the part-of-speech codes (ex. ['v1', 'vt'])
+
+    returns the bit mask of types
+    '''
+    types = 0
+    for pos in posList:
+        types |= POS_TYPES.get(pos, 0)
+    return types
+
+
+class DeinflectIndex:
+    '''Lookups of conjugated words, checking each candidate from deinflect against a hash of every keb and reb
+    '''
+
+    def __init__(self, entries=(), cacheSize=65536):
+        '''Builds the index
+        entries - an iterable of (seq, kana, dictionary), as yielded by parseEntries(..., sequence=True, codes=True)
+        cacheSize - the number of looked up words whose results are kept, as running text repeats words (default 65536)
+        '''
+        self.words = {}
+        self.cacheSize = cacheSize
+        self.cache = {}
+        for seq, kana, resultDic in entries:
+            self.add(seq, kana, resultDic)
+
+    @classmethod
+    def fromFile(cls, xlmFile, cacheSize=65536):
+        '''Builds the index from a JMdict file, keeping only the part-of-speech of each reading
+        xlmFile - the file path (plain, gzip, or zip) or file object for the JMdict file
+        cacheSize - the number of looked up words whose results are kept (default 65536)
+
+        returns the DeinflectIndex
+        '''
+        return cls(parseJMdict.parseEntries(xlmFile, stream=True, sequence=True, codes=True, keys=['part_of_speech']),
+                   cacheSize)
+
+    def add(self, seq, kana, resultDic):
+        '''Adds the words of an entry
+        seq - the sequence number of the entry
+        kana - boolean determine if word is only Kana (True) or not (False)
+        resultDic - the dictionary yielded by parseEntries with codes=True
+        '''
+        types = {}
+        if kana:
+            for reb, data in resultDic.items():
+                types[reb] = types.get(reb, 0) | getTypes(data['part_of_speech'])
+        else:
+            for keb, readings in resultDic.items():
+                for reb, data in readings.items():
+                    wordTypes = getTypes(data['part_of_speech'])
+                    types[keb] = types.get(keb, 0) | wordTypes
+                    types[reb] = types.get(reb, 0) | wordTypes
+
+        for word, wordTypes in types.items():
+            self.words.setdefault(word, []).append((seq, wordTypes))
+        self.cache = {}
+
+    def __len__(self):
+        return len(self.words)
+
+    def lookup(self, text):
+        '''Finds the entries a word could be conjugated from
+        text - the word as written (ex. '食べられなかった')
+
+        returns a list of (dictionary form, seq, reasons), the word as written first and then fewer rules first
+        '''
+        results = self.cache.get(text)
+        if results is not None:
+            return results
+
+        results = []
+        found = set()
+        for candidate, candidateType, reasons in deinflect(text):
+            matches = self.words.get(candidate)
+            if matches is None:
+                continue
+            for seq, wordTypes in matches:
+                if (candidateType == ANY or wordTypes & candidateType) and (candidate, seq) not in found:
+                    found.add((candidate, seq))
+                    results.append((candidate, seq, reasons))
+
+        if self.cacheSize > 0:
+            if len(self.cache) >= self.cacheSize:
+                self.cache.pop(next(iter(self.cache)))
+            self.cache[text] = results
+        return results
+
+
+RULES = getRules()
+RULES_BY_SUFFIX, LONGEST_SUFFIX = indexRules(RULES)
+RULES_BY_SUFFIX_OUT = getRulesByType(RULES)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,164 @@
+import hashlib
+import os
+import re
+from collections.abc import Mapping
+
+try:
+    from . import parseJMdict, util_parse
+except ImportError:
+    import parseJMdict
+    import util_parse
+
+
+''' Snapshot layout
+A snapshot records the content hash of every entry in a JMdict release as {ent_seq: hash}.
+The hash is taken over the raw bytes of the entry and the DTD values of the entities it uses,
+so entries are hashed without being parsed, the hash does not depend on the parse options,
+and a new description for an entity only changes the entries that use it.
+Snapshot files hold two pickles:
+    header # {'version', 'source', 'count'}
+    hashes # the {ent_seq: hash} dictionary
+'''
+
+SNAPSHOT_VERSION = 2
+
+SEQ = re.compile(rb'<ent_seq>(\d+)</ent_seq>')
+ENTITY_REF = re.compile(rb'&([\w.-]+);')
+
+ADDED = 'added'
+REMOVED = 'removed'
+MODIFIED = 'modified'
+
+
+def main():
+    '''Example function for using the functions in this form
+    '''
+    xlmFile = os.path.join('data', 'JMdict_e_examp.xml')
+    snapshotName = os.path.join('data', 'JMdict_e_examp.snapshot')
+
+    old = loadSnapshot(snapshotName) if os.path.exists(snapshotName) else {}
+    snapshot = {}
+    for change, seq, kana, item in diffEntries(old, xlmFile, snapshot=snapshot):
+        print(change, seq, None if item is None else list(item.keys()))
+    saveSnapshot(snapshot, snapshotName, xlmFile)
+
+def hashEntry(raw, entities):
+    '''Computes the content hash of an entry
+    raw - the bytes of the entry from the xml
+    entities - the dictionary of DTD entities, from util_parse.getEntities
+
+    returns the 16 byte hash
+    '''
+    digest = hashlib.blake2b(raw, digest_size=16)
+    for name in sorted(set(ENTITY_REF.findall(raw))):
+        digest.update(b'\0' + name + b'\0' + entities.get(name, b''))
+    return digest.digest()
+
+def iterRawEntries(xlmFile):
+    '''Splits a JMdict into its entries without parsing them
+    xlmFile - the file path (plain, gzip, or zip) or file object for the JMdict file
+
+    yields the header of the file
+    yields the sequence number of the entry as an int
+    yields the hash of the entry
+    yields the bytes of the entry
+    '''
+    entities = None
+    for header, raw in util_parse.iterRawElements(xlmFile, 'JMdict', 'entry'):
+        if entities is None:
+            entities = util_parse.getEntities(header)
+        yield header, int(SEQ.search(raw).group(1)), hashEntry(raw, entities), raw
+
+def iterHashes(xlmFile):
+    '''Hashes every entry of a JMdict
+    xlmFile - the file path (plain, gzip, or zip) or file object for the JMdict file
+
+    yields the sequence number of the entry as an int
+    yields the hash of the entry
+    '''
+    for _, seq, digest, _ in iterRawEntries(xlmFile):
+        yield seq, digest
+
+def makeSnapshot(xlmFile):
+    '''Records the content hash of every entry in a JMdict
+    xlmFile - the file path (plain, gzip, or zip) or file object for the JMdict file
+
+    returns the snapshot as a dictionary of {seq: hash}
+    '''
+    return dict(iterHashes(xlmFile))
+
+def saveSnapshot(snapshot, fileName, source=None):
+    '''Saves a snapshot
+    snapshot - the dictionary of {seq: hash}
+    fileName - the file location for the snapshot
+    source - the JMdict the snapshot was made from, kept for reference (optional)
+    '''
+    header = {'version': SNAPSHOT_VERSION, 'source': source if isinstance(source, str) else None,
+              'count': len(snapshot)}
+
+    util_parse.writeVersioned(fileName, header, snapshot)
+
+def loadSnapshot(fileName):
+    '''Loads a snapshot saved by saveSnapshot
+    fileName - the file location for the snapshot
+
+    returns the dictionary of {seq: hash}
+    '''
+    _, snapshot = util_parse.readVersioned(fileName, SNAPSHOT_VERSION)
+    return snapshot
+
+def diffSnapshots(old, new):
+    '''Compares two snapshots
+    old - the snapshot of the previous release
+    new - the snapshot of the current release
+
+    returns sorted lists of the added, removed, and modified sequence numbers
+    '''
+    added = sorted(new.keys() - old.keys())
+    removed = sorted(old.keys() - new.keys())
+    modified = sorted(seq for seq in new.keys() & old.keys() if new[seq] != old[seq])
+    return added, removed, modified
+
+def diffEntries(old, xlmFile, remove_archaic=False, filter=False, records=False, snapshot=None):
+    '''Finds the entries of a JMdict that changed since a previous release, parsing only those entries
+    old - the snapshot of the previous release, or the file path (plain, gzip, or zip) of the previous release
+    xlmFile - the file path (plain, gzip, or zip) or file object for the current JMdict file
+    remove_archaic - boolean to remove archaic entries (True) or not (False) (default False)
+    filter - boolean to remove inappropriate entries (True) or not (False) (default False)
+    records - boolean to store each reading as a compact recordJMdict.Reading (True) or a dictionary (False) (default False)
+    snapshot - a dictionary that is filled with the snapshot of the current release, to save for the next diff (optional)
+
+    yields the change (ADDED, REMOVED, or MODIFIED)
+    yields the sequence number of the entry as an int
+    yields boolean determine if word is only Kana (True) or not (False) (None if removed)
+    yields dictionary for either Kana of non-Kana words (None if removed)
+    changed entries come in file order, followed by the removed entries in sequence order
+    a modified entry that is now empty after remove_archaic or filter is yielded as removed
+    '''
+    if not isinstance(old, Mapping):
+        old = makeSnapshot(old)
+    if snapshot is None:
+        snapshot = {}
+
+    parse = None
+    for header, seq, digest, raw in iterRawEntries(xlmFile):
+        snapshot[seq] = digest
+        previous = old.get(seq)
+        if previous == digest:
+            continue
+
+        # Only the changed entries are parsed
+        if parse is None:
+            parse = util_parse.makeElementParser(header)
+        kana, resultDic = parseJMdict.parseEntry(parse(raw), remove_archaic, filter, records)
+        if resultDic:
+            yield (ADDED if previous is None else MODIFIED), seq, kana, resultDic
+        elif previous is not None:
+            yield REMOVED, seq, None, None
+
+    for seq in sorted(old.keys() - snapshot.keys()):
+        yield REMOVED, seq, None, None
+
+
+if __name__ == '__main__':
+    main()
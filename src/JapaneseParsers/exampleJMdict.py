@@ -0,0 +1,175 @@
+import os
+
+try:
+    from . import parseJMdict, util_parse
+except ImportError:
+    import parseJMdict
+    import util_parse
+
+
+''' Structure
+The example sentences of a JMdict are kept once, apart from the parsed entries:
+    sentences # {source id: (source type, japanese sentence, english sentence)}, each Tatoeba pair once
+    entries   # {seq: list of (sense number, source id, ex_text)}, the examples of each entry in order
+    byWord    # {word: list of source ids}, for the ex_text (the word as used in the sentence)
+              # and every keb and reb of the entries using the sentence
+The same pair is often given for several senses or entries, and parseEntries copies the examples of a sense
+into every reading it applies to, so parse with keys that leave out 'examples' and look them up here instead.
+'''
+
+CORPUS_VERSION = 1
+
+
+def main():
+    '''Example function for using the functions in this form
+    '''
+    corpus = ExampleCorpus.fromFile(os.path.join('data', 'JMdict_e_examp.xml'))
+    print(len(corpus), 'sentences,', corpus.memoryUsage() / 2**20, 'MiB')
+    for sourceId, japanese, english in corpus.lookupWord('食べる'):
+        print(sourceId, japanese, english)
+
+def iterExamples(xlmFile):
+    '''Iterates over the examples of every entry in a JMdict, without parsing the rest of the entries
+    xlmFile - the file path (plain, gzip, or zip) or file object for the JMdict file
+
+    yields the sequence number of the entry, the list of its kebs and rebs,
+        and the list of (sense number, example) where example is as returned by parseJMdict.getExample
+    '''
+    for entry in parseJMdict.iterEntries(xlmFile, True):
+        if entry.find('sense/example') is None:
+            continue
+        words = [keb.text for keb in entry.iterfind('k_ele/keb')] + [reb.text for reb in entry.iterfind('r_ele/reb')]
+        examples = []
+        for senseNumber, sense in enumerate(entry.iterfind('sense'), 1):
+            for example in sense.iterfind('example'):
+                examples.append((senseNumber, parseJMdict.getExample(example)))
+        yield int(parseJMdict.getSeqNum(entry)), words, examples
+
+def getSourceId(source):
+    '''Gets the key of an example sentence from its source
+    source - the [source type, source number] of the example (ex. ['tat', '77654'])
+
+    returns the source number as an int, or as a string if it is not a number
+    '''
+    number = source[1]
+    return int(number) if number.isdigit() else number
+
+
+class ExampleCorpus:
+    '''The example sentences of a JMdict, stored once by their source id, with lookups by entry and by word
+    '''
+
+    def __init__(self, examples=()):
+        '''Builds the corpus
+        examples - an iterable of (seq, words, examples), as yielded by iterExamples
+        '''
+        self.sentences = {}
+        self.entries = {}
+        self.byWord = {}
+        for seq, words, entryExamples in examples:
+            self.add(seq, words, entryExamples)
+
+    @classmethod
+    def fromFile(cls, xlmFile):
+        '''Builds the corpus from a JMdict file
+        xlmFile - the file path (plain, gzip, or zip) or file object for the JMdict file
+
+        returns the ExampleCorpus
+        '''
+        return cls(iterExamples(xlmFile))
+
+    def add(self, seq, words, examples):
+        '''Adds the examples of an entry
+        seq - the sequence number of the entry
+        words - the kebs and rebs of the entry
+        examples - the list of (sense number, example), where example is as returned by parseJMdict.getExample
+        '''
+        uses = self.entries.setdefault(seq, [])
+        sourceIds = []
+        for senseNumber, (source, text, eExample, jExample) in examples:
+            sourceId = getSourceId(source)
+            if sourceId not in self.sentences:
+                self.sentences[sourceId] = (source[0], jExample, eExample)
+            uses.append((senseNumber, sourceId, text))
+            sourceIds.append(sourceId)
+            self.addWord(text, sourceId)
+
+        for word in words:
+            for sourceId in sourceIds:
+                self.addWord(word, sourceId)
+
+    def addWord(self, word, sourceId):
+        '''Adds a sentence to the inverted index of a word, once
+        '''
+        sourceIds = self.byWord.get(word)
+        if sourceIds is None:
+            self.byWord[word] = [sourceId]
+        elif sourceId not in sourceIds:
+            sourceIds.append(sourceId)
+
+    def __len__(self):
+        return len(self.sentences)
+
+    def getSentence(self, sourceId):
+        '''Gets an example sentence by its source id
+        sourceId - the Tatoeba source number (ex. 77654)
+
+        returns (source type, japanese sentence, english sentence), or None if there is no sentence
+        '''
+        return self.sentences.get(sourceId)
+
+    def lookupEntry(self, seq, sense=None):
+        '''Finds the examples of an entry
+        seq - the sequence number of the entry
+        sense - the sense number, counting from 1, to keep only its examples (default None for every sense)
+
+        returns a list of (sense number, source id, ex_text, japanese sentence, english sentence) in entry order
+        '''
+        sentences = self.sentences
+        return [(senseNumber, sourceId, text) + sentences[sourceId][1:]
+                for senseNumber, sourceId, text in self.entries.get(int(seq), ())
+                if sense is None or senseNumber == sense]
+
+    def lookupWord(self, word):
+        '''Finds the example sentences of a word
+        word - a keb or reb, or the word as used in a sentence (ex. '食べ')
+
+        returns a list of (source id, japanese sentence, english sentence)
+        '''
+        sentences = self.sentences
+        return [(sourceId,) + sentences[sourceId][1:] for sourceId in self.byWord.get(word, ())]
+
+    def memoryUsage(self):
+        '''Estimates the memory held by the corpus
+
+        returns the number of bytes
+        '''
+        return util_parse.deepSizeOf([self.sentences, self.entries, self.byWord])
+
+    # Saving and Loading
+    def save(self, fileName):
+        '''Saves the corpus
+        fileName - the file location for the corpus
+        '''
+        header = {'version': CORPUS_VERSION, 'count': len(self.sentences)}
+        body = {'sentences': self.sentences, 'entries': self.entries, 'byWord': self.byWord}
+        util_parse.writeVersioned(fileName, header, body)
+
+    @classmethod
+    def load(cls, fileName):
+        '''Loads a corpus saved by save
+        fileName - the file location for the corpus
+
+        returns the ExampleCorpus
+        '''
+        _, body = util_parse.readVersioned(fileName, CORPUS_VERSION)
+
+        corpus = cls()
+        corpus.sentences = body['sentences']
+        corpus.entries = body['entries']
+        corpus.byWord = body['byWord']
+        return corpus
+
+
+if __name__ == '__main__':
+    main()
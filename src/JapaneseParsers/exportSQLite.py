@@ -0,0 +1,646 @@
+import os
+import sqlite3
+
+try:
+    from . import parseJMdict, parseKANJIDIC, parseKRADFILE, parseRADKFILE
+except ImportError:
+    import parseJMdict
+    import parseKANJIDIC
+    import parseKRADFILE
+    import parseRADKFILE
+
+
+''' Structure
+entry # One row per JMdict entry
+    ent_seq # The sequence number of the entry
+    kana # 1 if the entry only has Kana elements
+reading # One row per (kanji, reading) of an entry, as yielded by parseEntries
+    reading_id
+    ent_seq
+    keb # The non-kana word (NULL for Kana only entries)
+    reb # The reading
+Every list of a reading dictionary has its own table, keyed by reading_id, with the position of each row in the list:
+    reading_pos # 'part_of_speech' (tag)
+    reading_field # 'fields' (tag)
+    reading_misc # 'info_def' (tag)
+    reading_dial # 'dialects' (tag)
+    reading_pri # 'association', from the sense <pri> (tag)
+    reading_s_inf # 'sensory' (tag)
+    reading_inf # 'info_word', from <ke_inf> and <re_inf> (tag)
+    reading_ele_pri # 'record', from <ke_pri> and <re_pri> (tag)
+    reading_xref # 'synonyms' (word, reading, sense), split from keb・reb・sense number
+    reading_ant # 'antonyms' (word, reading, sense)
+    reading_source # 'source' (source, lang, type, wasei)
+    gloss # 'phrases' (gloss, lang, gender)
+    reading_example # 'examples' (source_type, source_id, text), the sentences are in example
+example # The example sentences, once per source
+    source_type, source_id # The <ex_srce> of the example (ex. 'tat', '77654')
+    english, japanese
+character # One row per KANJIDIC character
+    literal # The Kanji
+    grade, stroke, freq, jlpt # NULL when missing
+Every list of parseCharacter has its own table, keyed by literal, with the position of each row in the list:
+    character_code # (code, standard)
+    character_radical # (radical, rad_type)
+    character_variant # (var_type, variant)
+    character_dic_number # (number)
+    character_dic_ref # (dr_type, m_vol, m_page)
+    character_query # (q_code, qc_type, skip_misclass)
+    character_reading # (r_type, reading), with r_type 'ja_on', 'ja_kun' or 'nanori'
+    character_meaning # (meaning)
+radical # The radicals of the RADKFILE
+    radical
+    strokes
+radical_kanji # The Kanji using each radical, from the RADKFILE
+    radical
+    literal
+kanji_radical # The radicals of each Kanji, from the KRADFILE
+    literal
+    radical
+    position # Order of the radical in the KRADFILE line
+'''
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS entry (ent_seq INTEGER PRIMARY KEY, kana INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS reading (
+    reading_id INTEGER PRIMARY KEY, ent_seq INTEGER NOT NULL REFERENCES entry(ent_seq), keb TEXT, reb TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS reading_pos (
+    reading_id INTEGER NOT NULL REFERENCES reading(reading_id), position INTEGER NOT NULL, tag TEXT,
+    PRIMARY KEY (reading_id, position)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS reading_field (
+    reading_id INTEGER NOT NULL REFERENCES reading(reading_id), position INTEGER NOT NULL, tag TEXT,
+    PRIMARY KEY (reading_id, position)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS reading_misc (
+    reading_id INTEGER NOT NULL REFERENCES reading(reading_id), position INTEGER NOT NULL, tag TEXT,
+    PRIMARY KEY (reading_id, position)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS reading_dial (
+    reading_id INTEGER NOT NULL REFERENCES reading(reading_id), position INTEGER NOT NULL, tag TEXT,
+    PRIMARY KEY (reading_id, position)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS reading_pri (
+    reading_id INTEGER NOT NULL REFERENCES reading(reading_id), position INTEGER NOT NULL, tag TEXT,
+    PRIMARY KEY (reading_id, position)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS reading_s_inf (
+    reading_id INTEGER NOT NULL REFERENCES reading(reading_id), position INTEGER NOT NULL, tag TEXT,
+    PRIMARY KEY (reading_id, position)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS reading_inf (
+    reading_id INTEGER NOT NULL REFERENCES reading(reading_id), position INTEGER NOT NULL, tag TEXT,
+    PRIMARY KEY (reading_id, position)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS reading_ele_pri (
+    reading_id INTEGER NOT NULL REFERENCES reading(reading_id), position INTEGER NOT NULL, tag TEXT,
+    PRIMARY KEY (reading_id, position)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS reading_xref (
+    reading_id INTEGER NOT NULL REFERENCES reading(reading_id), position INTEGER NOT NULL,
+    word TEXT NOT NULL, reading TEXT, sense INTEGER, PRIMARY KEY (reading_id, position)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS reading_ant (
+    reading_id INTEGER NOT NULL REFERENCES reading(reading_id), position INTEGER NOT NULL,
+    word TEXT NOT NULL, reading TEXT, sense INTEGER, PRIMARY KEY (reading_id, position)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS reading_source (
+    reading_id INTEGER NOT NULL REFERENCES reading(reading_id), position INTEGER NOT NULL,
+    source TEXT, lang TEXT, type TEXT, wasei TEXT, PRIMARY KEY (reading_id, position)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS gloss (
+    reading_id INTEGER NOT NULL REFERENCES reading(reading_id), position INTEGER NOT NULL,
+    gloss TEXT NOT NULL, lang TEXT, gender TEXT, PRIMARY KEY (reading_id, position)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS example (
+    source_type TEXT NOT NULL, source_id TEXT NOT NULL, english TEXT, japanese TEXT,
+    PRIMARY KEY (source_type, source_id)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS reading_example (
+    reading_id INTEGER NOT NULL REFERENCES reading(reading_id), position INTEGER NOT NULL,
+    source_type TEXT NOT NULL, source_id TEXT NOT NULL, text TEXT, PRIMARY KEY (reading_id, position)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS character (literal TEXT PRIMARY KEY, grade INTEGER, stroke INTEGER, freq INTEGER, jlpt INTEGER);
+CREATE TABLE IF NOT EXISTS character_code (
+    literal TEXT NOT NULL REFERENCES character(literal), position INTEGER NOT NULL, code TEXT, standard TEXT,
+    PRIMARY KEY (literal, position)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS character_radical (
+    literal TEXT NOT NULL REFERENCES character(literal), position INTEGER NOT NULL, radical TEXT, rad_type TEXT,
+    PRIMARY KEY (literal, position)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS character_variant (
+    literal TEXT NOT NULL REFERENCES character(literal), position INTEGER NOT NULL, var_type TEXT, variant TEXT,
+    PRIMARY KEY (literal, position)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS character_dic_number (
+    literal TEXT NOT NULL REFERENCES character(literal), position INTEGER NOT NULL, number TEXT,
+    PRIMARY KEY (literal, position)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS character_dic_ref (
+    literal TEXT NOT NULL REFERENCES character(literal), position INTEGER NOT NULL, dr_type TEXT, m_vol TEXT, m_page TEXT,
+    PRIMARY KEY (literal, position)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS character_query (
+    literal TEXT NOT NULL REFERENCES character(literal), position INTEGER NOT NULL,
+    q_code TEXT, qc_type TEXT, skip_misclass TEXT, PRIMARY KEY (literal, position)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS character_reading (
+    literal TEXT NOT NULL REFERENCES character(literal), position INTEGER NOT NULL, r_type TEXT NOT NULL, reading TEXT,
+    PRIMARY KEY (literal, position)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS character_meaning (
+    literal TEXT NOT NULL REFERENCES character(literal), position INTEGER NOT NULL, meaning TEXT,
+    PRIMARY KEY (literal, position)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS radical (radical TEXT PRIMARY KEY, strokes INTEGER);
+CREATE TABLE IF NOT EXISTS radical_kanji (radical TEXT NOT NULL, literal TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS kanji_radical (literal TEXT NOT NULL, radical TEXT NOT NULL, position INTEGER NOT NULL);
+'''
+
+# Created after loading, since building an index once is faster than updating it for every row
+INDEXES = '''
+CREATE INDEX IF NOT EXISTS reading_seq ON reading(ent_seq);
+CREATE INDEX IF NOT EXISTS reading_keb ON reading(keb);
+CREATE INDEX IF NOT EXISTS reading_reb ON reading(reb);
+CREATE INDEX IF NOT EXISTS reading_pos_tag ON reading_pos(tag);
+CREATE INDEX IF NOT EXISTS reading_field_tag ON reading_field(tag);
+CREATE INDEX IF NOT EXISTS reading_misc_tag ON reading_misc(tag);
+CREATE INDEX IF NOT EXISTS reading_dial_tag ON reading_dial(tag);
+CREATE INDEX IF NOT EXISTS reading_pri_tag ON reading_pri(tag);
+CREATE INDEX IF NOT EXISTS reading_inf_tag ON reading_inf(tag);
+CREATE INDEX IF NOT EXISTS reading_ele_pri_tag ON reading_ele_pri(tag);
+CREATE INDEX IF NOT EXISTS reading_xref_word ON reading_xref(word);
+CREATE INDEX IF NOT EXISTS reading_ant_word ON reading_ant(word);
+CREATE INDEX IF NOT EXISTS gloss_text ON gloss(gloss COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS reading_example_source ON reading_example(source_type, source_id);
+CREATE INDEX IF NOT EXISTS character_reading_reading ON character_reading(reading);
+CREATE INDEX IF NOT EXISTS character_meaning_meaning ON character_meaning(meaning COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS radical_kanji_radical ON radical_kanji(radical);
+CREATE INDEX IF NOT EXISTS radical_kanji_literal ON radical_kanji(literal);
+CREATE INDEX IF NOT EXISTS kanji_radical_literal ON kanji_radical(literal);
+CREATE INDEX IF NOT EXISTS kanji_radical_radical ON kanji_radical(radical);
+'''
+
+# The tables holding the tag lists of a reading, by key of the reading dictionary
+TAG_TABLES = {
+    'part_of_speech': 'reading_pos', 'fields': 'reading_field', 'info_def': 'reading_misc', 'dialects': 'reading_dial',
+    'association': 'reading_pri', 'sensory': 'reading_s_inf', 'info_word': 'reading_inf', 'record': 'reading_ele_pri'
+}
+
+# The tables holding the cross-references of a reading, by key of the reading dictionary
+REF_TABLES = {'synonyms': 'reading_xref', 'antonyms': 'reading_ant'}
+
+# Every table keyed by reading_id
+READING_TABLES = tuple(TAG_TABLES.values()) + tuple(REF_TABLES.values()) + ('reading_source', 'gloss', 'reading_example')
+
+# The insert statement of each table loaded from the JMdict and the KANJIDIC
+INSERTS = {
+    'entry': 'INSERT INTO entry VALUES (?, ?)',
+    'reading': 'INSERT INTO reading VALUES (?, ?, ?, ?)',
+    'reading_xref': 'INSERT INTO reading_xref VALUES (?, ?, ?, ?, ?)',
+    'reading_ant': 'INSERT INTO reading_ant VALUES (?, ?, ?, ?, ?)',
+    'reading_source': 'INSERT INTO reading_source VALUES (?, ?, ?, ?, ?, ?)',
+    'gloss': 'INSERT INTO gloss VALUES (?, ?, ?, ?, ?)',
+    'example': 'INSERT OR IGNORE INTO example VALUES (?, ?, ?, ?)',
+    'reading_example': 'INSERT INTO reading_example VALUES (?, ?, ?, ?, ?)',
+    'character': 'INSERT INTO character VALUES (?, ?, ?, ?, ?)',
+    'character_code': 'INSERT INTO character_code VALUES (?, ?, ?, ?)',
+    'character_radical': 'INSERT INTO character_radical VALUES (?, ?, ?, ?)',
+    'character_variant': 'INSERT INTO character_variant VALUES (?, ?, ?, ?)',
+    'character_dic_number': 'INSERT INTO character_dic_number VALUES (?, ?, ?)',
+    'character_dic_ref': 'INSERT INTO character_dic_ref VALUES (?, ?, ?, ?, ?)',
+    'character_query': 'INSERT INTO character_query VALUES (?, ?, ?, ?, ?)',
+    'character_reading': 'INSERT INTO character_reading VALUES (?, ?, ?, ?)',
+    'character_meaning': 'INSERT INTO character_meaning VALUES (?, ?, ?)'
+}
+INSERTS.update((table, 'INSERT INTO {} VALUES (?, ?, ?)'.format(table)) for table in TAG_TABLES.values())
+
+
+def main():
+    '''Example function for using the functions in this form
+    '''
+    dbFile = os.path.join('data', 'japanese.sqlite')
+    exportDatabase(dbFile,
+                   xlmFile=os.path.join('data', 'JMdict_e_examp.xml'),
+                   kanjiFile=os.path.join('data', 'kanjidic2.xml'),
+                   kradFile=os.path.join('data', 'kradzip', 'kradfile'),
+                   radkFile=os.path.join('data', 'kradzip', 'radkfilex'))
+
+    conn = connect(dbFile)
+    for seq, kana, item in findByGloss(conn, 'to eat'):
+        print(seq, list(item.keys()))
+    print(findCharacter(conn, '食'))
+    print(findKanjiByRadicals(conn, ['口', '一']))
+
+# Utility functions
+def toInt(value):
+    '''Converts a number from the datasets to an int
+    value - the string value (or None)
+
+    returns the int, or None if missing
+    '''
+    return None if value is None else int(value)
+
+def toText(value):
+    '''Converts a number read from the database back to the string of the datasets
+    value - the int value (or None)
+
+    returns the string, or None if missing
+    '''
+    return None if value is None else str(value)
+
+def splitRef(ref):
+    '''Splits a cross-reference into the columns of reading_xref and reading_ant
+    ref - the split reference (ex. ['明白', 'めいはく', '1'])
+
+    returns (word, reading, sense number), with None for the missing parts
+    '''
+    reading = None
+    sense = None
+    for part in ref[1:]:
+        if part.isdigit():
+            sense = int(part)
+        else:
+            reading = part
+    return ref[0], reading, sense
+
+def joinRef(word, reading, sense):
+    '''Rebuilds a cross-reference from the columns of reading_xref and reading_ant
+
+    returns the split reference, as in the reading dictionaries
+    '''
+    ref = [word]
+    if reading is not None:
+        ref.append(reading)
+    if sense is not None:
+        ref.append(str(sense))
+    return ref
+
+def getCells(kana, item):
+    '''Iterates over every reading of a parsed entry
+    kana - boolean determine if word is only Kana (True) or not (False)
+    item - the dictionary yielded by parseEntries
+
+    returns an iterator of (keb, reb, reading dictionary), where keb is None for Kana only entries
+    '''
+    if kana:
+        return ((None, reb, data) for reb, data in item.items())
+    return ((keb, reb, data) for keb, readings in item.items() for reb, data in readings.items())
+
+def newBatches():
+    '''Creates the pending rows of every table loaded from the JMdict and the KANJIDIC
+
+    returns a dictionary of {insert statement: empty list}
+    '''
+    return {sql: [] for sql in INSERTS.values()}
+
+def addRows(batches, table, key, values):
+    '''Adds the rows of a child table to the pending rows, numbering them in order
+    batches - dictionary of {insert statement: list of rows}
+    table - the name of the table
+    key - the reading_id or literal the rows belong to
+    values - an iterable with the other columns of each row
+    '''
+    batches[INSERTS[table]].extend((key, position) + tuple(value) for position, value in enumerate(values))
+
+def addReadingRows(batches, readingId, data):
+    '''Adds the rows of every child table of a reading to the pending rows
+    batches - dictionary of {insert statement: list of rows}
+    readingId - the reading_id of the reading
+    data - the reading dictionary yielded by parseEntries
+    '''
+    for key, table in TAG_TABLES.items():
+        addRows(batches, table, readingId, ((tag,) for tag in data[key]))
+    for key, table in REF_TABLES.items():
+        addRows(batches, table, readingId, (splitRef(ref) for ref in data[key]))
+    addRows(batches, 'reading_source', readingId, ((source, attributes['lang'], attributes['type'], attributes['wasei'])
+                                                   for source, attributes in data['source'].items()))
+    addRows(batches, 'gloss', readingId, ((gloss, attributes['lang'], attributes['gender'])
+                                          for gloss, attributes in data['phrases'].items()))
+
+    # Each sentence is kept once, however many readings use it
+    examples = batches[INSERTS['example']]
+    for (sourceType, sourceId), _, eExample, jExample in data['examples']:
+        examples.append((sourceType, sourceId, eExample, jExample))
+    addRows(batches, 'reading_example', readingId, ((sourceType, sourceId, text)
+                                                    for (sourceType, sourceId), text, _, _ in data['examples']))
+
+def addCharacterRows(batches, kanjiItem):
+    '''Adds the rows of a character and of its child tables to the pending rows
+    batches - dictionary of {insert statement: list of rows}
+    kanjiItem - the 19 values yielded by parseCharacter
+    '''
+    literal, codeList, standList, radList, typeList, grade, stroke, variants, frequency, jlpt, refList, indList, \
+        qCodes, qTypes, qMiscl, onList, kunList, meanList, nanoriList = kanjiItem
+    batches[INSERTS['character']].append((literal, toInt(grade), toInt(stroke), toInt(frequency), toInt(jlpt)))
+    addRows(batches, 'character_code', literal, zip(codeList, standList))
+    addRows(batches, 'character_radical', literal, zip(radList, typeList))
+    addRows(batches, 'character_variant', literal, variants)
+    addRows(batches, 'character_dic_number', literal, ((ref,) for ref in refList))
+    # Only moro references have a volume and a page
+    addRows(batches, 'character_dic_ref', literal, ((index + [None, None])[:3] for index in indList))
+    addRows(batches, 'character_query', literal, zip(qCodes, qTypes, qMiscl))
+    readings = [(rType, reading) for rType, readingList in [('ja_on', onList), ('ja_kun', kunList), ('nanori', nanoriList)]
+                for reading in readingList]
+    addRows(batches, 'character_reading', literal, readings)
+    addRows(batches, 'character_meaning', literal, ((meaning,) for meaning in meanList))
+
+def insertBatches(conn, batches, batchSize, force=False):
+    '''Inserts the pending rows of each table with executemany
+    conn - the sqlite connection
+    batches - dictionary of {insert statement: list of rows}
+    batchSize - the number of rows to collect before inserting
+    force - boolean to insert every pending row (True) or only full batches (False) (default False)
+    '''
+    for sql, rows in batches.items():
+        if rows and (force or len(rows) >= batchSize):
+            conn.executemany(sql, rows)
+            rows.clear()
+
+# Export Functions
+def exportEntries(conn, xlmFile, remove_archaic=False, filter=False, batchSize=10000):
+    '''Loads the entries of a JMdict into the entry and reading tables, and the child tables of the readings
+    conn - the sqlite connection
+    xlmFile - the file path for the JMdict file
+    remove_archaic - boolean to remove archaic entries (True) or not (False) (default False)
+    filter - boolean to remove inappropriate entries (True) or not (False) (default False)
+    batchSize - the number of rows inserted at a time (default 10000)
+    '''
+    batches = newBatches()
+    entryRows = batches[INSERTS['entry']]
+    readingRows = batches[INSERTS['reading']]
+
+    readingId = 0
+    for seq, kana, item in parseJMdict.parseEntries(xlmFile, remove_archaic, filter, True, sequence=True):
+        entryRows.append((seq, int(kana)))
+        for keb, reb, data in getCells(kana, item):
+            readingId += 1
+            readingRows.append((readingId, seq, keb, reb))
+            addReadingRows(batches, readingId, data)
+
+        insertBatches(conn, batches, batchSize)
+    insertBatches(conn, batches, batchSize, True)
+
+def updateEntries(conn, changes):
+    '''Applies the changes between two JMdict releases to the entry and reading tables in a single transaction
+    conn - the sqlite connection
+    changes - an iterable of (change, seq, kana, dictionary), as yielded by diffJMdict.diffEntries (without records)
+
+    returns the number of changes applied
+    '''
+    count = 0
+    batches = newBatches()
+    with conn:
+        for change, seq, kana, item in changes:
+            for table in READING_TABLES:
+                conn.execute('DELETE FROM {} WHERE reading_id IN (SELECT reading_id FROM reading WHERE ent_seq = ?)'.format(table),
+                             (seq,))
+            conn.execute('DELETE FROM reading WHERE ent_seq = ?', (seq,))
+            conn.execute('DELETE FROM entry WHERE ent_seq = ?', (seq,))
+            if item is not None:
+                conn.execute(INSERTS['entry'], (seq, int(kana)))
+                for keb, reb, data in getCells(kana, item):
+                    cursor = conn.execute('INSERT INTO reading VALUES (NULL, ?, ?, ?)', (seq, keb, reb))
+                    addReadingRows(batches, cursor.lastrowid, data)
+                insertBatches(conn, batches, 0, True)
+            count += 1
+    return count
+
+def exportCharacters(conn, xmlFile, batchSize=10000):
+    '''Loads the characters of a KANJIDIC into the character table and its child tables
+    conn - the sqlite connection
+    xmlFile - the file location for the KANJIDIC dataset
+    batchSize - the number of rows inserted at a time (default 10000)
+    '''
+    batches = newBatches()
+    for kanjiItem in parseKANJIDIC.parseCharacter(xmlFile, True):
+        addCharacterRows(batches, kanjiItem)
+        insertBatches(conn, batches, batchSize)
+    insertBatches(conn, batches, batchSize, True)
+
+def exportKRad(conn, fileName, batchSize=10000):
+    '''Loads the KRADFILE into the kanji_radical table
+    conn - the sqlite connection
+    fileName - file location for the KRAD dataset
+    batchSize - the number of rows inserted at a time (default 10000)
+    '''
+    rows = []
+    batches = {'INSERT INTO kanji_radical VALUES (?, ?, ?)': rows}
+    for kanji, radicals in parseKRADFILE.parseKRad(fileName):
+        rows.extend((kanji, radical, position) for position, radical in enumerate(radicals))
+        insertBatches(conn, batches, batchSize)
+    insertBatches(conn, batches, batchSize, True)
+
+def exportRadK(conn, fileName, batchSize=10000):
+    '''Loads the RADKFILE into the radical and radical_kanji tables
+    conn - the sqlite connection
+    fileName - file location for the RADK dataset
+    batchSize - the number of rows inserted at a time (default 10000)
+    '''
+    radicalRows = []
+    kanjiRows = []
+    batches = {
+        'INSERT OR REPLACE INTO radical VALUES (?, ?)': radicalRows,
+        'INSERT INTO radical_kanji VALUES (?, ?)': kanjiRows
+    }
+    for radical, strokes, kanji in parseRADKFILE.parseRadK(fileName):
+        radicalRows.append((radical, toInt(strokes)))
+        kanjiRows.extend((radical, literal) for literal in kanji)
+        insertBatches(conn, batches, batchSize)
+    insertBatches(conn, batches, batchSize, True)
+
+def exportDatabase(dbFile, xlmFile=None, kanjiFile=None, kradFile=None, radkFile=None,
+                   remove_archaic=False, filter=False, batchSize=10000):
+    '''Exports the parsed datasets into a new SQLite database in a single transaction
+    dbFile - the file location for the database (replaced once the export is finished)
+    xlmFile - the file path for the JMdict file (skipped if None)
+    kanjiFile - the file location for the KANJIDIC dataset (skipped if None)
+    kradFile - file location for the KRAD dataset (skipped if None)
+    radkFile - file location for the RADK dataset (skipped if None)
+    remove_archaic - boolean to remove archaic entries (True) or not (False) (default False)
+    filter - boolean to remove inappropriate entries (True) or not (False) (default False)
+    batchSize - the number of rows inserted at a time (default 10000)
+    '''
+    # Build next to the database, so readers keep the old one until the new one is complete
+    tempName = dbFile + '.tmp'
+    if os.path.exists(tempName):
+        os.remove(tempName)
+
+    conn = sqlite3.connect(tempName)
+    try:
+        # Nothing reads the file until the export is finished, so skip syncing each page to disk
+        conn.execute('PRAGMA synchronous = OFF')
+        conn.execute('PRAGMA journal_mode = MEMORY')
+        conn.executescript(SCHEMA)
+        with conn:
+            if xlmFile is not None:
+                exportEntries(conn, xlmFile, remove_archaic, filter, batchSize)
+            if kanjiFile is not None:
+                exportCharacters(conn, kanjiFile, batchSize)
+            if kradFile is not None:
+                exportKRad(conn, kradFile, batchSize)
+            if radkFile is not None:
+                exportRadK(conn, radkFile, batchSize)
+        conn.executescript(INDEXES)
+        conn.execute('ANALYZE')
+        conn.commit()
+    except BaseException:
+        conn.close()
+        if os.path.exists(tempName):
+            os.remove(tempName)
+        raise
+    conn.close()
+
+    # The pages were written without syncing, so flush the finished file before it replaces the database
+    with open(tempName, 'r+b') as file:
+        os.fsync(file.fileno())
+    os.replace(tempName, dbFile)
+
+# Query Functions
+def connect(dbFile):
+    '''Opens an exported database for lookups
+    dbFile - the file location for the database
+
+    returns the sqlite connection
+    '''
+    return sqlite3.connect(dbFile)
+
+def selectChildren(conn, table, columns, marks, seqs):
+    '''Reads a child table of the readings of some entries
+    conn - the sqlite connection
+    table - the table, or the join of the table with others
+    columns - the columns to read after the reading_id
+    marks - the placeholders for the sequence numbers
+    seqs - the sequence numbers of the entries
+
+    returns a cursor over (reading_id, columns...) in reading and list order
+    '''
+    return conn.execute('SELECT reading_id, {} FROM {} JOIN reading USING (reading_id) WHERE ent_seq IN ({}) '
+                        'ORDER BY reading_id, position'.format(columns, table, marks), seqs)
+
+def getEntries(conn, seqs, chunkSize=500):
+    '''Rebuilds entries from their readings
+    conn - the sqlite connection
+    seqs - the sequence numbers of the entries
+    chunkSize - the number of entries fetched per query, below the SQLite variable limit (default 500)
+
+    returns a list of (seq, kana, dictionary) in the layout yielded by parseEntries
+    '''
+    seqs = sorted(set(seqs))
+    entries = {}
+    for start in range(0, len(seqs), chunkSize):
+        chunk = seqs[start:start + chunkSize]
+        marks = ','.join('?' * len(chunk))
+        for seq, kana in conn.execute('SELECT ent_seq, kana FROM entry WHERE ent_seq IN ({})'.format(marks), chunk):
+            entries[seq] = (seq, bool(kana), {})
+
+        cells = {}
+        query = 'SELECT reading_id, ent_seq, keb, reb FROM reading WHERE ent_seq IN ({}) ORDER BY reading_id'.format(marks)
+        for readingId, seq, keb, reb in conn.execute(query, chunk):
+            data = cells[readingId] = parseJMdict.newCell([], [])
+            item = entries[seq][2]
+            if keb is None:
+                item[reb] = data
+            else:
+                item.setdefault(keb, {})[reb] = data
+
+        for key, table in TAG_TABLES.items():
+            for readingId, tag in selectChildren(conn, table, 'tag', marks, chunk):
+                cells[readingId][key].append(tag)
+        for key, table in REF_TABLES.items():
+            for readingId, word, reading, sense in selectChildren(conn, table, 'word, reading, sense', marks, chunk):
+                cells[readingId][key].append(joinRef(word, reading, sense))
+        for readingId, source, lang, sourceType, wasei in selectChildren(conn, 'reading_source', 'source, lang, type, wasei',
+                                                                         marks, chunk):
+            cells[readingId]['source'][source] = {'lang': lang, 'type': sourceType, 'wasei': wasei}
+        for readingId, gloss, lang, gender in selectChildren(conn, 'gloss', 'gloss, lang, gender', marks, chunk):
+            cells[readingId]['phrases'][gloss] = {'lang': lang, 'gender': gender}
+        examples = selectChildren(conn, 'reading_example JOIN example USING (source_type, source_id)',
+                                  'source_type, source_id, text, english, japanese', marks, chunk)
+        for readingId, sourceType, sourceId, text, eExample, jExample in examples:
+            cells[readingId]['examples'].append(([sourceType, sourceId], text, eExample, jExample))
+    return [entries[seq] for seq in seqs if seq in entries]
+
+def findBySeq(conn, seq):
+    '''Finds an entry by its sequence number
+    conn - the sqlite connection
+    seq - the sequence number
+
+    returns (seq, kana, dictionary), or None if there is no entry
+    '''
+    entries = getEntries(conn, [int(seq)])
+    return entries[0] if entries else None
+
+def findByKanji(conn, keb):
+    '''Finds the entries with a non-kana word
+    conn - the sqlite connection
+    keb - the word
+
+    returns a list of (seq, kana, dictionary)
+    '''
+    rows = conn.execute('SELECT DISTINCT ent_seq FROM reading WHERE keb = ?', (keb,))
+    return getEntries(conn, [row[0] for row in rows])
+
+def findByReading(conn, reb):
+    '''Finds the entries with a reading
+    conn - the sqlite connection
+    reb - the reading
+
+    returns a list of (seq, kana, dictionary)
+    '''
+    rows = conn.execute('SELECT DISTINCT ent_seq FROM reading WHERE reb = ?', (reb,))
+    return getEntries(conn, [row[0] for row in rows])
+
+def findByGloss(conn, gloss):
+    '''Finds the entries with an english phrase (ignoring case)
+    conn - the sqlite connection
+    gloss - the english phrase
+
+    returns a list of (seq, kana, dictionary)
+    '''
+    rows = conn.execute('SELECT DISTINCT reading.ent_seq FROM gloss JOIN reading USING (reading_id) '
+                        'WHERE gloss.gloss = ? COLLATE NOCASE', (gloss,))
+    return getEntries(conn, [row[0] for row in rows])
+
+def findCharacter(conn, literal):
+    '''Finds a Kanji of the KANJIDIC
+    conn - the sqlite connection
+    literal - the Kanji
+
+    returns the 19 values yielded by parseCharacter, or None if there is no character
+    '''
+    row = conn.execute('SELECT grade, stroke, freq, jlpt FROM character WHERE literal = ?', (literal,)).fetchone()
+    if row is None:
+        return None
+    grade, stroke, frequency, jlpt = row
+
+    def select(table, columns):
+        return conn.execute('SELECT {} FROM {} WHERE literal = ? ORDER BY position'.format(columns, table), (literal,)).fetchall()
+
+    codes = select('character_code', 'code, standard')
+    radicals = select('character_radical', 'radical, rad_type')
+    variants = [list(variant) for variant in select('character_variant', 'var_type, variant')]
+    refList = [number for number, in select('character_dic_number', 'number')]
+    indList = [[drType, volume, page] if drType == 'moro' else [drType]
+               for drType, volume, page in select('character_dic_ref', 'dr_type, m_vol, m_page')]
+    queries = select('character_query', 'q_code, qc_type, skip_misclass')
+    readings = select('character_reading', 'r_type, reading')
+    meanList = [meaning for meaning, in select('character_meaning', 'meaning')]
+
+    return literal, \
+        [code for code, _ in codes], [standard for _, standard in codes], \
+        [radical for radical, _ in radicals], [radType for _, radType in radicals], \
+        toText(grade), toText(stroke), variants, toText(frequency), toText(jlpt), \
+        refList, indList, \
+        [query[0] for query in queries], [query[1] for query in queries], [query[2] for query in queries], \
+        [reading for rType, reading in readings if rType == 'ja_on'], \
+        [reading for rType, reading in readings if rType == 'ja_kun'], \
+        meanList, [reading for rType, reading in readings if rType == 'nanori']
+
+def findRadicals(conn, literal):
+    '''Finds the radicals of a Kanji from the KRADFILE
+    conn - the sqlite connection
+    literal - the Kanji
+
+    returns a list of radicals
+    '''
+    rows = conn.execute('SELECT radical FROM kanji_radical WHERE literal = ? ORDER BY position', (literal,))
+    return [row[0] for row in rows]
+
+def findKanjiByRadicals(conn, radicals):
+    '''Finds the Kanji using all of the given radicals from the RADKFILE
+    conn - the sqlite connection
+    radicals - a list of radicals
+
+    returns a list of Kanji
+    '''
+    radicals = sorted(set(radicals))
+    if not radicals:
+        return []
+    rows = conn.execute('SELECT literal FROM radical_kanji WHERE radical IN ({}) GROUP BY literal '
+                        'HAVING COUNT(DISTINCT radical) = ? ORDER BY literal'.format(','.join('?' * len(radicals))),
+                        radicals + [len(radicals)])
+    return [row[0] for row in rows]
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+import os
+
+try:
+    from . import parseJMdict
+except ImportError:
+    import parseJMdict
+
+
+''' Entry filters
+An EntryFilter is checked against the xml of an entry before parseKana/parseNKana build it,
+so parseEntries(where=...) skips the entries it rejects without decoding them.
+Each check looks at the text of one kind of tag anywhere in the entry:
+    pos, misc, field # Entity codes of the <pos>, <misc>, and <field> of the senses (ex. 'v1', 'uk', 'comp')
+    priority # Tags of the <ke_pri> and <re_pri> of the word (ex. 'ichi1', 'news1', 'nf01')
+An entry passes a check when any of its tags is in the wanted set, and fails it when any
+of its tags is in the excluded set. Entity codes are turned into their DTD descriptions by
+resolve, unless the entries are parsed with codes=True.
+'''
+
+# The path of the tags of each check, from the entry
+CHECK_PATHS = {'pos': ('sense/pos',), 'misc': ('sense/misc',), 'field': ('sense/field',),
+               'priority': ('k_ele/ke_pri', 'r_ele/re_pri')}
+
+# Checks whose values are entity codes
+ENTITY_CHECKS = ('pos', 'misc', 'field')
+
+
+def main():
+    '''Example function for using the functions in this form
+    '''
+    where = EntryFilter(pos=['v1'], priority=['ichi1'], excludeMisc=['arch'])
+    xlmFile = os.path.join('data', 'JMdict_e_examp.xml')
+    for kana, item in parseJMdict.parseEntries(xlmFile, stream=True, where=where, keys=['phrases']):
+        for word in item.keys():
+            print(word)
+
+def toSet(values):
+    '''Converts the values of a check into a frozenset
+    values - an iterable of strings, or a single string
+
+    returns the frozenset
+    '''
+    if isinstance(values, str):
+        values = [values]
+    return frozenset(values)
+
+class EntryFilter:
+    '''A predicate over the xml of a JMdict entry, to skip entries before they are decoded
+    '''
+
+    def __init__(self, pos=None, misc=None, field=None, priority=None, kanaOnly=None,
+                 excludePos=None, excludeMisc=None, excludeField=None, excludePriority=None):
+        '''Creates the filter, where every check given must pass
+        pos - the part-of-speech codes of which the entry needs at least one (optional)
+        misc - the misc codes of which the entry needs at least one (optional)
+        field - the field codes of which the entry needs at least one (optional)
+        priority - the priority tags of which the entry needs at least one (optional)
+        kanaOnly - boolean to keep only the entries without kanji (True) or with kanji (False) (default None for both)
+        excludePos, excludeMisc, excludeField, excludePriority - the codes or tags that reject the entry (optional)
+        '''
+        self.kanaOnly = kanaOnly
+        self.wanted = {}
+        self.excluded = {}
+        for name, values in [('pos', pos), ('misc', misc), ('field', field), ('priority', priority)]:
+            if values is not None:
+                self.wanted[name] = toSet(values)
+        for name, values in [('pos', excludePos), ('misc', excludeMisc), ('field', excludeField),
+                             ('priority', excludePriority)]:
+            if values is not None:
+                self.excluded[name] = toSet(values)
+
+    def __repr__(self):
+        return 'EntryFilter(kanaOnly={!r}, wanted={!r}, excluded={!r})'.format(self.kanaOnly, self.wanted, self.excluded)
+
+    def needsEntities(self):
+        '''Determines if the filter has entity codes to turn into descriptions
+
+        returns True if a pos, misc, or field check is given
+        '''
+        return any(name in checks for checks in (self.wanted, self.excluded) for name in ENTITY_CHECKS)
+
+    def resolve(self, table):
+        '''Turns the entity codes of the filter into their descriptions, for entries parsed without codes=True
+        table - the util_parse.EntityTable of the JMdict
+
+        returns the new EntryFilter
+        '''
+        resolved = EntryFilter(kanaOnly=self.kanaOnly)
+        for checks, resolvedChecks in [(self.wanted, resolved.wanted), (self.excluded, resolved.excluded)]:
+            for name, values in checks.items():
+                resolvedChecks[name] = frozenset(table.describe(values)) if name in ENTITY_CHECKS else values
+        return resolved
+
+    def compile(self):
+        '''Turns the filter into the function that checks an entry
+
+        returns a function taking an entry from the xml and returning True to keep it
+        '''
+        kanaOnly = self.kanaOnly
+        wanted = [(CHECK_PATHS[name], values) for name, values in self.wanted.items()]
+        excluded = [(CHECK_PATHS[name], values) for name, values in self.excluded.items()]
+
+        def check(entry):
+            if kanaOnly is not None and (entry.find('k_ele') is None) != kanaOnly:
+                return False
+            for paths, values in wanted:
+                if not anyText(entry, paths, values):
+                    return False
+            for paths, values in excluded:
+                if anyText(entry, paths, values):
+                    return False
+            return True
+
+        return check
+
+def anyText(entry, paths, values):
+    '''Determines if any tag of an entry holds one of the values
+    entry - an entry from the xml
+    paths - the paths of the tags from the entry (ex. ('sense/pos',))
+    values - the set of values
+
+    returns True if a tag holds one of the values
+    '''
+    for path in paths:
+        for item in entry.iterfind(path):
+            if item.text in values:
+                return True
+    return False
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,205 @@
+import hashlib
+import os
+from array import array
+from bisect import bisect_left
+
+try:
+    from . import parseJMdict, util_kana, util_parse
+except ImportError:
+    import parseJMdict
+    import util_kana
+    import util_parse
+
+
+''' Structure
+keys     # Every distinct normalized reading (util_kana.normalizeReading of a reb)
+readings # The (reb, seq) of the readings with each key
+ranks    # The commonness of each key (util_parse.priorityRank of its re_pri, lower is more common)
+byKey    # {key: key id}
+byFolded # {util_kana.foldLongVowels of a key: key ids}, so long and short vowels match
+hashes, ids # The deletion neighbourhood: every string made by deleting up to maxDistance characters
+            # of a key, as a 64 bit hash sorted with the key id, so a typo is found by deleting
+            # characters of the query and looking the hashes up instead of comparing every key
+'''
+
+
+def main():
+    '''Example function for using the functions in this form
+    '''
+    index = ReadingIndex.fromFile(os.path.join('data', 'JMdict_e_examp.xml'))
+    for text in ['タベル', 'taberu', 'tabelu', 'toukyou', 'tokyo']:
+        print(text, index.lookup(text), index.search(text)[:5])
+
+def iterReadings(xlmFile):
+    '''Iterates over every reb of a JMdict with its record information
+    xlmFile - the file path (plain, gzip, or zip) or file object for the JMdict file
+
+    yields the reading, the sequence number of the entry, and the list of record information
+    '''
+    for entry in parseJMdict.iterEntries(xlmFile, True):
+        seq = int(parseJMdict.getSeqNum(entry))
+        for r_ele in entry.iterfind('r_ele'):
+            reb, _, _, _, priList = parseJMdict.getREle(r_ele)
+            yield reb, seq, priList
+
+def hashKey(text):
+    '''Hashes a string to a 64 bit integer that is the same in every process
+    text - the string
+
+    returns the signed integer
+    '''
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'little', signed=True)
+
+def getDeletions(text, maxDistance):
+    '''Finds every string made by deleting up to maxDistance characters of a string
+    text - the string
+    maxDistance - the number of characters that can be deleted
+
+    returns the set of strings, including the string itself
+    '''
+    deletions = {text}
+    current = {text}
+    for _ in range(maxDistance):
+        current = {word[:i] + word[i + 1:] for word in current for i in range(len(word))}
+        deletions.update(current)
+    return deletions
+
+def editDistance(first, second, maxDistance):
+    '''Counts the insertions, deletions, substitutions, and swaps of neighbours between two strings
+    first - the first string
+    second - the second string
+    maxDistance - the distance after which counting stops
+
+    returns the distance, or maxDistance + 1 if it is larger than maxDistance
+    '''
+    if abs(len(first) - len(second)) > maxDistance:
+        return maxDistance + 1
+
+    previous = None
+    current = list(range(len(second) + 1))
+    for i in range(1, len(first) + 1):
+        before, previous, current = previous, current, [i] + [0] * len(second)
+        for j in range(1, len(second) + 1):
+            cost = first[i - 1] != second[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and first[i - 1] == second[j - 2] and first[i - 2] == second[j - 1]:
+                current[j] = min(current[j], before[j - 2] + 1)
+        if min(current) > maxDistance:
+            return maxDistance + 1
+    return min(current[-1], maxDistance + 1)
+
+
+class ReadingIndex:
+    '''Lookups by reading that accept katakana, hiragana, or romaji, and tolerate typos
+    '''
+
+    def __init__(self, words, maxDistance=1):
+        '''Builds the index
+        words - an iterable of (reb, seq, priList), as yielded by iterReadings
+        maxDistance - the largest number of typos search accepts, where each one costs a larger index (default 1)
+        '''
+        self.maxDistance = maxDistance
+        self.keys = []
+        self.readings = []
+        self.ranks = array('b')
+        self.byKey = {}
+        self.byFolded = {}
+
+        for reb, seq, priList in words:
+            key = util_kana.normalizeReading(reb)
+            keyId = self.byKey.get(key)
+            if keyId is None:
+                keyId = self.byKey[key] = len(self.keys)
+                self.keys.append(key)
+                self.readings.append([])
+                self.ranks.append(99)
+                self.byFolded.setdefault(util_kana.foldLongVowels(key), []).append(keyId)
+            self.readings[keyId].append((reb, seq))
+            self.ranks[keyId] = min(self.ranks[keyId], util_parse.priorityRank(priList))
+
+        pairs = sorted((hashKey(deletion), keyId) for keyId, key in enumerate(self.keys)
+                       for deletion in getDeletions(key, maxDistance))
+        self.hashes = array('q', (hashed for hashed, _ in pairs))
+        self.ids = array('l', (keyId for _, keyId in pairs))
+
+    @classmethod
+    def fromFile(cls, xlmFile, maxDistance=1):
+        '''Builds the index from a JMdict file
+        xlmFile - the file path (plain, gzip, or zip) or file object for the JMdict file
+        maxDistance - the largest number of typos search accepts (default 1)
+
+        returns the ReadingIndex
+        '''
+        return cls(iterReadings(xlmFile), maxDistance)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def getReadings(self, keyIds):
+        '''Gets the readings of keys, most common first
+        keyIds - the key ids
+
+        returns a list of (reb, seq)
+        '''
+        keyIds = sorted(keyIds, key=lambda keyId: (self.ranks[keyId], keyId))
+        return [reading for keyId in keyIds for reading in self.readings[keyId]]
+
+    def lookup(self, text, folded=True):
+        '''Finds the readings written like the text, ignoring the script and long vowel marks
+        text - the reading as katakana, hiragana, or romaji (ex. 'タベル' or 'taberu')
+        folded - boolean to also match long and short vowels with each other, if nothing else matches (default True)
+
+        returns a list of (reb, seq), most common first
+        '''
+        key = util_kana.normalizeReading(text)
+        keyId = self.byKey.get(key)
+        if keyId is not None:
+            return self.getReadings([keyId])
+        if folded:
+            return self.getReadings(self.byFolded.get(util_kana.foldLongVowels(key), ()))
+        return []
+
+    def search(self, text, maxDistance=None, k=None):
+        '''Finds the readings within a number of typos of the text
+        text - the reading as katakana, hiragana, or romaji
+        maxDistance - the number of typos accepted, at most the maxDistance of the index (default the index maxDistance)
+        k - the number of readings wanted (default None for all)
+
+        returns a list of (distance, reb, seq), closest and then most common first
+        '''
+        if maxDistance is None:
+            maxDistance = self.maxDistance
+        if maxDistance > self.maxDistance:
+            raise ValueError("The index was built for at most {} typos".format(self.maxDistance))
+
+        key = util_kana.normalizeReading(text)
+        candidates = set()
+        for deletion in getDeletions(key, maxDistance):
+            hashed = hashKey(deletion)
+            position = bisect_left(self.hashes, hashed)
+            while position < len(self.hashes) and self.hashes[position] == hashed:
+                candidates.add(self.ids[position])
+                position += 1
+
+        # Sharing a deletion does not always mean being close, and hashes can collide, so each candidate is checked
+        matches = []
+        for keyId in candidates:
+            distance = editDistance(key, self.keys[keyId], maxDistance)
+            if distance <= maxDistance:
+                matches.append((distance, self.ranks[keyId], keyId))
+        matches.sort()
+
+        results = [(distance, reb, seq) for distance, _, keyId in matches for reb, seq in self.readings[keyId]]
+        return results if k is None else results[:k]
+
+    def memoryUsage(self):
+        '''Estimates the memory held by the index
+
+        returns the number of bytes
+        '''
+        return util_parse.deepSizeOf([self.keys, self.readings, self.ranks, self.byKey, self.byFolded,
+                                      self.hashes, self.ids])
+
+
+if __name__ == '__main__':
+    main()
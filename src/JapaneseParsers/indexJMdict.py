@@ -0,0 +1,210 @@
+import os
+import re
+
+try:
+    from . import parseJMdict, util_parse
+except ImportError:
+    import parseJMdict
+    import util_parse
+
+
+TOKEN = re.compile(r'[a-z0-9]+')
+
+
+def main():
+    '''Example function for using the functions in this form
+    '''
+    index = JMdictIndex.fromFile(os.path.join('data', 'JMdict_e_examp.xml'))
+    print(index.memoryUsage() / 2**20, 'MiB')
+    for seq, kana, item in index.lookupGloss('eat'):
+        print(seq, list(item.keys()))
+
+def tokenize(text):
+    '''Splits english text into lowercase word tokens
+    text - the english text
+
+    returns a list of tokens
+    '''
+    return TOKEN.findall(text.lower())
+
+def iterCells(kana, resultDic):
+    '''Iterates over every reading of a parsed entry
+    kana - boolean determine if word is only Kana (True) or not (False)
+    resultDic - the dictionary yielded by parseEntries
+
+    yields the non-kana word (None if kana), the reading, and the reading dictionary
+    '''
+    if kana:
+        for reb, data in resultDic.items():
+            yield None, reb, data
+    else:
+        for keb, readings in resultDic.items():
+            for reb, data in readings.items():
+                yield keb, reb, data
+
+
+class JMdictIndex:
+    '''Hash lookups over the parsed entries of a JMdict
+
+    Entries are stored once, keyed by their sequence number, and the kanji, reading,
+    and gloss token maps only hold sequence numbers
+    '''
+
+    def __init__(self, entries=()):
+        '''Builds the index in one pass
+        entries - an iterable of (seq, kana, dictionary), as yielded by parseEntries(..., sequence=True)
+        '''
+        self.entries = {}
+        self.byKanji = {}
+        self.byReading = {}
+        self.byGloss = {}
+        for seq, kana, resultDic in entries:
+            self.add(seq, kana, resultDic)
+
+    @classmethod
+    def fromFile(cls, xlmFile, remove_archaic=False, filter=False, records=False):
+        '''Builds the index from a JMdict file
+        xlmFile - the file path for the JMdict file
+        remove_archaic - boolean to remove archaic entries (True) or not (False) (default False)
+        filter - boolean to remove inappropriate entries (True) or not (False) (default False)
+        records - boolean to store each reading as a compact recordJMdict.Reading (True) or a dictionary (False) (default False)
+
+        returns the JMdictIndex
+        '''
+        return cls(parseJMdict.parseEntries(xlmFile, remove_archaic, filter, True, records, True))
+
+    def add(self, seq, kana, resultDic):
+        '''Adds an entry to the index
+        seq - the sequence number of the entry
+        kana - boolean determine if word is only Kana (True) or not (False)
+        resultDic - the dictionary yielded by parseEntries
+        '''
+        self.entries[seq] = (kana, resultDic)
+
+        for keys, table in self.getKeys(kana, resultDic):
+            for key in keys:
+                seqs = table.get(key)
+                if seqs is None:
+                    table[key] = [seq]
+                else:
+                    seqs.append(seq)
+
+    def remove(self, seq):
+        '''Removes an entry from the index
+        seq - the sequence number of the entry
+
+        returns True if the entry was in the index
+        '''
+        entry = self.entries.pop(seq, None)
+        if entry is None:
+            return False
+
+        for keys, table in self.getKeys(*entry):
+            for key in keys:
+                seqs = table[key]
+                seqs.remove(seq)
+                if not seqs:
+                    del table[key]
+        return True
+
+    def applyChanges(self, changes):
+        '''Updates the index with the changes between two JMdict releases
+        changes - an iterable of (change, seq, kana, dictionary), as yielded by diffJMdict.diffEntries
+
+        returns the number of changes applied
+        '''
+        count = 0
+        for change, seq, kana, resultDic in changes:
+            self.remove(seq)
+            if resultDic is not None:
+                self.add(seq, kana, resultDic)
+            count += 1
+        return count
+
+    def getKeys(self, kana, resultDic):
+        '''Gets the lookup keys of an entry
+        kana - boolean determine if word is only Kana (True) or not (False)
+        resultDic - the dictionary yielded by parseEntries
+
+        returns a list of (set of keys, lookup table) for the kanji, reading, and gloss tables
+        '''
+        kebs = set()
+        rebs = set()
+        tokens = set()
+        for keb, reb, data in iterCells(kana, resultDic):
+            if keb is not None:
+                kebs.add(keb)
+            rebs.add(reb)
+            for phrase in data['phrases']:
+                tokens.update(tokenize(phrase))
+        return [(kebs, self.byKanji), (rebs, self.byReading), (tokens, self.byGloss)]
+
+    def __len__(self):
+        return len(self.entries)
+
+    def getEntries(self, seqs):
+        '''Gets the entries for sequence numbers
+        seqs - the sequence numbers
+
+        returns a list of (seq, kana, dictionary)
+        '''
+        return [(seq,) + self.entries[seq] for seq in seqs]
+
+    def lookupSeq(self, seq):
+        '''Finds an entry by its sequence number
+        seq - the sequence number
+
+        returns (seq, kana, dictionary), or None if there is no entry
+        '''
+        entry = self.entries.get(int(seq))
+        return None if entry is None else (int(seq),) + entry
+
+    def lookupKanji(self, keb):
+        '''Finds the entries with a non-kana word
+        keb - the word
+
+        returns a list of (seq, kana, dictionary)
+        '''
+        return self.getEntries(self.byKanji.get(keb, ()))
+
+    def lookupReading(self, reb):
+        '''Finds the entries with a reading
+        reb - the reading
+
+        returns a list of (seq, kana, dictionary)
+        '''
+        return self.getEntries(self.byReading.get(reb, ()))
+
+    def lookupGloss(self, text):
+        '''Finds the entries whose english phrases contain every word of the text
+        text - the english text (ex. 'to eat')
+
+        returns a list of (seq, kana, dictionary) in sequence order
+        '''
+        postings = [self.byGloss.get(token, ()) for token in set(tokenize(text))]
+        if not postings:
+            return []
+
+        # Intersect starting from the rarest token
+        postings.sort(key=len)
+        seqs = set(postings[0])
+        for posting in postings[1:]:
+            seqs.intersection_update(posting)
+            if not seqs:
+                break
+        return self.getEntries(sorted(seqs))
+
+    def memoryUsage(self, entries=True):
+        '''Estimates the memory held by the index
+        entries - boolean to include the parsed entries (True) or only the lookup tables (False) (default True)
+
+        returns the number of bytes
+        '''
+        tables = [self.byKanji, self.byReading, self.byGloss]
+        if entries:
+            tables.append(self.entries)
+        return util_parse.deepSizeOf(tables)
+
+
+if __name__ == '__main__':
+    main()
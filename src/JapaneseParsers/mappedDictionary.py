@@ -0,0 +1,426 @@
+import io
+import mmap
+import os
+import pickle
+import struct
+from array import array
+
+try:
+    from . import indexJMdict, parseJMdict, parseKANJIDIC, recordJMdict
+except ImportError:
+    import indexJMdict
+    import parseJMdict
+    import parseKANJIDIC
+    import recordJMdict
+
+
+''' File layout
+magic # MAGIC, 8 bytes
+directory offset # uint64, where the directory starts
+sections # each starting on an 8 byte boundary
+directory # pickle of {section name: (offset, byte length, array typecode)}
+
+Sections
+strings # pickle of the list of shared strings
+entries.records # every entry pickled on its own as (seq, kana, dictionary), in file order
+entries.offsets # int64, record i is records[offsets[i]:offsets[i+1]]
+entries.seqs # int64, the sorted sequence numbers
+entries.order # int32, the record of each sequence number
+entries.XXX.keys.data, entries.XXX.keys.offsets # the sorted keys as utf-8 bytes
+entries.XXX.postings, entries.XXX.postings.offsets # int32, the records of key i are postings[offsets[i]:offsets[i+1]]
+    where XXX is kanji, reading, or gloss (the gloss tokens from indexJMdict.tokenize)
+characters.records, characters.offsets # every character pickled as the 19 values of parseCharacter
+characters.literal.* # the key index of the Kanji, in the same layout as the entry keys
+
+Tag strings (part-of-speech, misc, field descriptions...) and the keys of the reading dictionaries
+are repeated in most records, so they are pickled as an index into the shared strings instead.
+'''
+
+MAGIC = b'JDCMAP\x01\x00'
+
+ENTRY_KEYS = ('kanji', 'reading', 'gloss')
+
+
+def main():
+    '''Example function for using the functions in this form
+    '''
+    fileName = os.path.join('data', 'japanese.jdcmap')
+    compileDictionary(fileName, os.path.join('data', 'JMdict_e_examp.xml'), os.path.join('data', 'kanjidic2.xml'))
+
+    with MappedDictionary(fileName) as dictionary:
+        for seq, kana, item in dictionary.lookupGloss('eat'):
+            print(seq, list(item.keys()))
+        print(dictionary.findCharacter('食'))
+
+class StringPickler(pickle.Pickler):
+    '''Pickles records, replacing the shared strings with their index
+    '''
+
+    def __init__(self, file, strings):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.strings = strings
+
+    def persistent_id(self, obj):
+        if type(obj) is str:
+            return self.strings.get(obj)
+        return None
+
+class StringUnpickler(pickle.Unpickler):
+    '''Unpickles records made by StringPickler
+    '''
+
+    def __init__(self, file, strings):
+        super().__init__(file)
+        self.strings = strings
+
+    def persistent_load(self, pid):
+        return self.strings[pid]
+
+# Compiling
+def shareStrings(strings, values):
+    '''Adds strings to the shared strings
+    strings - the dictionary of {string: index}
+    values - the strings to share (None is skipped)
+    '''
+    for value in values:
+        if value is not None and value not in strings:
+            strings[value] = len(strings)
+
+def entryStrings(kana, resultDic):
+    '''Gets the strings of an entry worth sharing between records
+    kana - boolean determine if word is only Kana (True) or not (False)
+    resultDic - the dictionary yielded by parseEntries
+
+    yields the tag strings of every reading
+    '''
+    for _, _, data in indexJMdict.iterCells(kana, resultDic):
+        for key in recordJMdict.TAG_FIELDS:
+            yield from data[key]
+
+def characterStrings(kanjiItem):
+    '''Gets the strings of a character worth sharing between records
+    kanjiItem - the 19 values yielded by parseCharacter
+
+    yields the type names of the codes, radicals, references, and query codes
+    '''
+    yield from kanjiItem[2]
+    yield from kanjiItem[4]
+    for variant in kanjiItem[7]:
+        yield variant[0]
+    for index in kanjiItem[11]:
+        yield index[0]
+    yield from kanjiItem[13]
+
+def addKey(table, key, record):
+    '''Adds a record to the postings of a key
+    table - the dictionary of {key: list of records}
+    key - the key
+    record - the index of the record
+    '''
+    records = table.get(key)
+    if records is None:
+        table[key] = [record]
+    elif records[-1] != record:
+        records.append(record)
+
+def writeSection(file, directory, name, data):
+    '''Writes a section on an 8 byte boundary
+    file - the open output file
+    directory - the dictionary of sections to record the section in
+    name - the section name
+    data - an array or bytes
+    '''
+    file.write(b'\0' * (-file.tell() % 8))
+    typecode = data.typecode if isinstance(data, array) else 'B'
+    raw = data.tobytes() if isinstance(data, array) else bytes(data)
+    directory[name] = (file.tell(), len(raw), typecode)
+    file.write(raw)
+
+def writeKeys(file, directory, name, table):
+    '''Writes the sorted keys and postings of a key index
+    file - the open output file
+    directory - the dictionary of sections
+    name - the name of the key index (ex. 'entries.kanji')
+    table - the dictionary of {key: list of records}
+    '''
+    # Python orders strings by code point, which is also the order of their utf-8 bytes
+    keys = sorted(table)
+    keyData = bytearray()
+    keyOffsets = array('q', [0])
+    postings = array('i')
+    postingOffsets = array('q', [0])
+    for key in keys:
+        keyData += key.encode('utf-8')
+        keyOffsets.append(len(keyData))
+        postings.extend(table[key])
+        postingOffsets.append(len(postings))
+
+    writeSection(file, directory, name + '.keys.data', keyData)
+    writeSection(file, directory, name + '.keys.offsets', keyOffsets)
+    writeSection(file, directory, name + '.postings', postings)
+    writeSection(file, directory, name + '.postings.offsets', postingOffsets)
+
+def writeRecords(file, directory, name, records, strings, getStrings):
+    '''Pickles records one after another
+    file - the open output file
+    directory - the dictionary of sections
+    name - the name of the records (ex. 'entries')
+    records - an iterable of records
+    strings - the dictionary of shared strings, extended with the strings of each record
+    getStrings - function giving the strings of a record to share
+
+    yields the index of each record once it is written
+    '''
+    file.write(b'\0' * (-file.tell() % 8))
+    start = file.tell()
+    offsets = array('q', [0])
+    buffer = io.BytesIO()
+    for index, record in enumerate(records):
+        shareStrings(strings, getStrings(record))
+        buffer.seek(0)
+        buffer.truncate()
+        StringPickler(buffer, strings).dump(record)
+        file.write(buffer.getvalue())
+        offsets.append(file.tell() - start)
+        yield index, record
+
+    directory[name + '.records'] = (start, offsets[-1], 'B')
+    writeSection(file, directory, name + '.offsets', offsets)
+
+def compileDictionary(fileName, xlmFile=None, kanjiFile=None, remove_archaic=False, filter=False):
+    '''Compiles the parsed datasets into a read-only dictionary file for MappedDictionary
+    fileName - the file location for the dictionary (replaced once it is finished)
+    xlmFile - the file path (plain, gzip, or zip) for the JMdict file (skipped if None)
+    kanjiFile - the file location (plain, gzip, or zip) for the KANJIDIC dataset (skipped if None)
+    remove_archaic - boolean to remove archaic entries (True) or not (False) (default False)
+    filter - boolean to remove inappropriate entries (True) or not (False) (default False)
+    '''
+    strings = {key: index for index, key in enumerate(recordJMdict.FIELDS + ('lang', 'gender', 'type', 'wasei'))}
+    directory = {}
+
+    tempName = fileName + '.tmp'
+    with open(tempName, 'wb') as file:
+        file.write(MAGIC + struct.pack('<Q', 0))
+
+        if xlmFile is not None:
+            seqs = array('q')
+            tables = {name: {} for name in ENTRY_KEYS}
+            entries = parseJMdict.parseEntries(xlmFile, remove_archaic, filter, True, sequence=True)
+            for index, (seq, kana, resultDic) in writeRecords(file, directory, 'entries', entries, strings,
+                                                              lambda entry: entryStrings(entry[1], entry[2])):
+                seqs.append(seq)
+                for keb, reb, data in indexJMdict.iterCells(kana, resultDic):
+                    if keb is not None:
+                        addKey(tables['kanji'], keb, index)
+                    addKey(tables['reading'], reb, index)
+                    for phrase in data['phrases']:
+                        for token in indexJMdict.tokenize(phrase):
+                            addKey(tables['gloss'], token, index)
+
+            order = sorted(range(len(seqs)), key=seqs.__getitem__)
+            writeSection(file, directory, 'entries.seqs', array('q', (seqs[index] for index in order)))
+            writeSection(file, directory, 'entries.order', array('i', order))
+            for name, table in tables.items():
+                for records in table.values():
+                    records.sort()
+                writeKeys(file, directory, 'entries.' + name, table)
+
+        if kanjiFile is not None:
+            literals = {}
+            for index, kanjiItem in writeRecords(file, directory, 'characters', parseKANJIDIC.parseCharacter(kanjiFile, True),
+                                                 strings, characterStrings):
+                addKey(literals, kanjiItem[0], index)
+            writeKeys(file, directory, 'characters.literal', literals)
+
+        writeSection(file, directory, 'strings', pickle.dumps(list(strings), protocol=pickle.HIGHEST_PROTOCOL))
+
+        directoryOffset = file.tell()
+        pickle.dump(directory, file, protocol=pickle.HIGHEST_PROTOCOL)
+        file.seek(len(MAGIC))
+        file.write(struct.pack('<Q', directoryOffset))
+    os.replace(tempName, fileName)
+
+# Reading
+class MappedDictionary:
+    '''Read-only lookups over a dictionary file made by compileDictionary
+
+    The file is memory mapped, so processes opening the same file share its pages,
+    and records are only unpickled when they are looked up
+    '''
+
+    def __init__(self, fileName):
+        '''Opens the dictionary
+        fileName - the file location for the dictionary
+        '''
+        with open(fileName, 'rb') as file:
+            self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.data[:len(MAGIC)] != MAGIC:
+            self.data.close()
+            raise ValueError("{} is not a compiled dictionary".format(fileName))
+
+        directoryOffset = struct.unpack_from('<Q', self.data, len(MAGIC))[0]
+        self.directory = pickle.loads(self.data[directoryOffset:])
+        self.view = memoryview(self.data)
+        self.strings = pickle.loads(self._getView('strings'))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        '''Releases the mapping of the file
+        the lookups only return copies, so nothing outside the dictionary holds on to the mapping
+        '''
+        self.view.release()
+        self.data.close()
+
+    def __len__(self):
+        return self.sectionLength('entries.seqs')
+
+    def getSection(self, name):
+        '''Gets a copy of a section of the file
+        name - the section name
+
+        returns an array of the section
+        '''
+        offset, length, typecode = self.directory[name]
+        values = array(typecode)
+        values.frombytes(self.data[offset:offset + length])
+        return values
+
+    def _getView(self, name):
+        '''Gets a section of the file without copying it, for lookups that do not keep it
+        name - the section name
+
+        returns a memoryview of the section, cast to its array type (close fails while it is alive)
+        '''
+        offset, length, typecode = self.directory[name]
+        return self.view[offset:offset + length].cast(typecode)
+
+    def sectionLength(self, name):
+        '''Gets the number of items in a section
+        name - the section name
+
+        returns the number of items, or 0 if the section is missing
+        '''
+        if name not in self.directory:
+            return 0
+        offset, length, typecode = self.directory[name]
+        return length // array(typecode).itemsize
+
+    def getRecord(self, name, index):
+        '''Unpickles a record
+        name - the name of the records (ex. 'entries')
+        index - the index of the record
+
+        returns the record
+        '''
+        offsets = self._getView(name + '.offsets')
+        start = self.directory[name + '.records'][0]
+        data = self.data[start + offsets[index]:start + offsets[index + 1]]
+        return StringUnpickler(io.BytesIO(data), self.strings).load()
+
+    def findKey(self, name, key):
+        '''Finds the records of a key by binary search over the sorted keys
+        name - the name of the key index (ex. 'entries.kanji')
+        key - the key
+
+        returns a list of the record indexes (empty if the key is missing)
+        '''
+        if name + '.keys.offsets' not in self.directory:
+            return []
+        keyOffsets = self._getView(name + '.keys.offsets')
+        base = self.directory[name + '.keys.data'][0]
+        target = key.encode('utf-8')
+
+        low, high = 0, len(keyOffsets) - 1
+        while low < high:
+            middle = (low + high) // 2
+            if self.data[base + keyOffsets[middle]:base + keyOffsets[middle + 1]] < target:
+                low = middle + 1
+            else:
+                high = middle
+        if low == len(keyOffsets) - 1 or self.data[base + keyOffsets[low]:base + keyOffsets[low + 1]] != target:
+            return []
+
+        postingOffsets = self._getView(name + '.postings.offsets')
+        return self._getView(name + '.postings')[postingOffsets[low]:postingOffsets[low + 1]].tolist()
+
+    def getEntries(self, records):
+        '''Unpickles entries
+        records - the indexes of the entry records
+
+        returns a list of (seq, kana, dictionary)
+        '''
+        return [self.getRecord('entries', index) for index in records]
+
+    def lookupSeq(self, seq):
+        '''Finds an entry by its sequence number
+        seq - the sequence number
+
+        returns (seq, kana, dictionary), or None if there is no entry
+        '''
+        if 'entries.seqs' not in self.directory:
+            return None
+        seqs = self._getView('entries.seqs')
+        seq = int(seq)
+        low, high = 0, len(seqs)
+        while low < high:
+            middle = (low + high) // 2
+            if seqs[middle] < seq:
+                low = middle + 1
+            else:
+                high = middle
+        if low == len(seqs) or seqs[low] != seq:
+            return None
+        return self.getRecord('entries', self._getView('entries.order')[low])
+
+    def lookupKanji(self, keb):
+        '''Finds the entries with a non-kana word
+        keb - the word
+
+        returns a list of (seq, kana, dictionary)
+        '''
+        return self.getEntries(self.findKey('entries.kanji', keb))
+
+    def lookupReading(self, reb):
+        '''Finds the entries with a reading
+        reb - the reading
+
+        returns a list of (seq, kana, dictionary)
+        '''
+        return self.getEntries(self.findKey('entries.reading', reb))
+
+    def lookupGloss(self, text):
+        '''Finds the entries whose english phrases contain every word of the text
+        text - the english text (ex. 'to eat')
+
+        returns a list of (seq, kana, dictionary) in sequence order
+        '''
+        postings = [self.findKey('entries.gloss', token) for token in set(indexJMdict.tokenize(text))]
+        if not postings:
+            return []
+
+        # Intersect starting from the rarest token
+        postings.sort(key=len)
+        records = set(postings[0])
+        for posting in postings[1:]:
+            records.intersection_update(posting)
+            if not records:
+                break
+        return sorted(self.getEntries(records), key=lambda entry: entry[0])
+
+    def findCharacter(self, literal):
+        '''Finds a Kanji of the KANJIDIC
+        literal - the Kanji
+
+        returns the 19 values yielded by parseCharacter, or None if there is no character
+        '''
+        records = self.findKey('characters.literal', literal)
+        return self.getRecord('characters', records[0]) if records else None
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,12 @@
+import functools
+import multiprocessing
 import os
-import xml.etree.ElementTree as ET
-import util_parse
+
+try:
+    from . import recordJMdict, util_parse
+except ImportError:
+    import recordJMdict
+    import util_parse
 
 
 ''' Structure
@@ -110,9 +116,18 @@ def getKEle(k_ele):
 
     returns the reading, list of reading information, and list of record information
     '''
-    infList = [item.text for item in k_ele.findall('ke_inf')]
-    priList = [item.text for item in k_ele.findall('ke_pri')]
-    return k_ele.find('keb').text, infList, priList
+    keb = None
+    infList = []
+    priList = []
+    for item in k_ele:
+        tag = item.tag
+        if tag == 'ke_pri':
+            priList.append(item.text)
+        elif tag == 'ke_inf':
+            infList.append(item.text)
+        elif tag == 'keb' and keb is None:
+            keb = item.text
+    return keb, infList, priList
 
 def getREle(r_ele):
     '''Parses everything in the r_ele entry
@@ -121,17 +136,70 @@ def getREle(r_ele):
     returns the reading, if it is the true reading of a kanji, list of nonKana elements it apply to (empty if all),
         list of reading information, list of record information
     '''
-    trueKanji = not r_ele.find('re_nokanji')
-
-    restrict = [item.text for item in r_ele.findall('re_restr')]
-    infList = [item.text for item in r_ele.findall('re_inf')]
-    priList = [item.text for item in r_ele.findall('re_pri')]
-
-    return r_ele.find('reb').text, trueKanji, restrict, infList, priList
+    reb = None
+    nokanji = None
+    restrict = []
+    infList = []
+    priList = []
+    for item in r_ele:
+        tag = item.tag
+        if tag == 're_pri':
+            priList.append(item.text)
+        elif tag == 're_restr':
+            restrict.append(item.text)
+        elif tag == 're_inf':
+            infList.append(item.text)
+        elif tag == 'reb':
+            if reb is None:
+                reb = item.text
+        elif tag == 're_nokanji' and nokanji is None:
+            nokanji = item
+    trueKanji = not nokanji
+
+    return reb, trueKanji, restrict, infList, priList
+
+
+# The child tags of a sense that only hold text, and their position in the values of getSense
+SENSE_TEXT = {'stagk': 0, 'stagr': 1, 'pos': 4, 'field': 5, 'misc': 6, 'dial': 8, 'pri': 10, 's_inf': 11}
+
+# The keys of a reading dictionary that come from a sense, with the sense tag and position in the values of getSense
+SENSE_KEYS = {
+    'synonyms': ('xref', 2), 'antonyms': ('ant', 3), 'part_of_speech': ('pos', 4), 'fields': ('field', 5),
+    'info_def': ('misc', 6), 'source': ('lsource', 7), 'dialects': ('dial', 8), 'phrases': ('gloss', 9),
+    'association': ('pri', 10), 'sensory': ('s_inf', 11), 'examples': ('example', 12)
+}
+
+# Every key of a reading dictionary, in order
+READING_KEYS = ('synonyms', 'antonyms', 'part_of_speech', 'fields', 'info_def', 'source', 'dialects', 'phrases',
+                'association', 'sensory', 'examples', 'info_word', 'record')
+
+def getProjection(keys):
+    '''Checks the keys wanted in each reading dictionary
+    keys - an iterable of the keys (ex. ['phrases', 'part_of_speech']), or None for every key
+
+    returns the frozenset of keys, or None for every key
+    '''
+    if keys is None:
+        return None
+    keys = frozenset(keys)
+    unknown = keys.difference(READING_KEYS)
+    if unknown:
+        raise ValueError("Unknown reading keys: {}".format(', '.join(sorted(unknown))))
+    return keys
+
+@functools.lru_cache(maxsize=None)
+def getSenseTags(keys):
+    '''Finds the sense tags needed to build some keys of a reading dictionary
+    keys - the frozenset of keys from getProjection
+
+    returns the frozenset of tags (the stagk and stagr restrictions are always needed)
+    '''
+    return frozenset(['stagk', 'stagr']).union(SENSE_KEYS[key][0] for key in keys if key in SENSE_KEYS)
 
-def getSense(sense):
+def getSense(sense, tags=None):
     '''Parses everything in the sense entry
     sense - a sense element from the xml
+    tags - the set of child tags to decode, skipping the others (default None for every tag)
 
     returns the following:
     list of nonKana elements sense applies to [empty if applied to all in entry]
@@ -148,36 +216,31 @@ def getSense(sense):
     list of sensory information associated with the entry
     list of examples
     '''
-
-    kRestrict = [item.text for item in sense.findall('stagk')]
-    rRestrict = [item.text for item in sense.findall('stagr')]
-    xref = [item.text.split('・') for item in sense.findall('xref')]
-    ant = [item.text.split('・') for item in sense.findall('ant')]
-    posList = [item.text for item in sense.findall('pos')]
-    fieldList = [item.text for item in sense.findall('field')]
-    mscList = [item.text for item in sense.findall('misc')]
-    dialList = [item.text for item in sense.findall('dial')]
-    priList = [item.text for item in sense.findall('pri')]
-    infList = [item.text for item in sense.findall('s_inf')]
-
-    lsourceList = {}
-    for item in sense.findall('lsource'):
-        lsource = item.text
-        lang = item.get('xlm:lang')
-        lstype = item.get('ls_type')
-        wasei = item.get('ls_wasei')
-        lsourceList[lsource] = {'lang': lang, 'type': lstype, 'wasei': wasei}
-
-    glossList = {}
-    for item in sense.findall('gloss'):
-        gloss = item.text
-        lang = item.get('xml:lang')
-        gend = item.get('g_gend')
-        glossList[gloss] = {'lang': lang, 'gender': gend}
-
-    exampleList = [getExample(item) for item in sense.findall('example')]
-
-    return kRestrict, rRestrict, xref, ant, posList, fieldList, mscList, lsourceList, dialList, glossList, priList, infList, exampleList
+    # A single pass over the children, dispatching on the tag
+    values = [[], [], [], [], [], [], [], {}, [], {}, [], [], []]
+    for item in sense:
+        tag = item.tag
+        if tags is not None and tag not in tags:
+            continue
+        position = SENSE_TEXT.get(tag)
+        if position is not None:
+            values[position].append(item.text)
+        elif tag == 'gloss':
+            values[9][item.text] = {'lang': item.get('xml:lang'), 'gender': item.get('g_gend')}
+        elif tag == 'xref':
+            values[2].append(item.text.split('・'))
+        elif tag == 'ant':
+            values[3].append(item.text.split('・'))
+        elif tag == 'lsource':
+            values[7][item.text] = {'lang': item.get('xlm:lang'), 'type': item.get('ls_type'), 'wasei': item.get('ls_wasei')}
+        elif tag == 'example':
+            values[12].append(getExample(item))
+
+    return tuple(values)
+
+
+# ElementTree gives xml:lang under the namespace that the xml prefix is bound to
+XML_LANG = '{http://www.w3.org/XML/1998/namespace}lang'
 
 def getExample(example):
     '''Parses everything in a sentence example entry
@@ -190,10 +253,11 @@ def getExample(example):
 
     eExample = None
     jExample = None
-    for item in example.findall('ex_send'):
-        if item.get('xml:lang') == 'jpn':
+    for item in example.findall('ex_sent'):
+        lang = item.get(XML_LANG)
+        if lang == 'jpn':
             jExample = item.text
-        elif item.get('xml:lang') == 'eng':
+        elif lang == 'eng':
             eExample = item.text
 
     return source, example.find('ex_text').text, eExample, jExample
@@ -207,70 +271,368 @@ def isKana(entry):
     return entry.find("k_ele") is None
 
 # Parsing Functions
-def parseEntries(xlmFile, remove_archaic = False, filter = False):
+def compileWhere(where, xlmFile, codes=None):
+    '''Gets the function that checks whether an entry is kept
+    where - a filterJMdict.EntryFilter, or a function taking an entry from the xml and returning True to keep it
+    xlmFile - the file path (plain, gzip, or zip) or file object for the JMdict file, to read its entities from
+    codes - the util_parse.EntityTable when the entries are parsed with their entity codes kept (default None)
+
+    returns the function
+    '''
+    if not hasattr(where, 'compile'):
+        return where
+    if codes is not None or not where.needsEntities():
+        return where.compile()
+    if hasattr(xlmFile, 'read'):
+        raise ValueError("Filtering by entity codes needs the file path of the JMdict, or codes=True")
+    return where.resolve(util_parse.EntityTable(xlmFile)).compile()
+
+def iterEntries(xlmFile, stream=False, codes=None):
+    '''Iterates over the entry elements in a JMdict
+    xlmFile - the file path (plain, gzip, or zip) or file object for the JMdict file
+    stream - boolean to parse incrementally with constant memory (True) or load the whole tree (False) (default False)
+    codes - a util_parse.EntityTable to keep the entity codes (ex. 'v5r') in place of their descriptions (default None)
+
+    returns the iterator of entries for the xml
+    '''
+    if stream:
+        return util_parse.iterElements(xlmFile, 'entry', codes)
+
+    return getEntryIter(util_parse.parseTree(xlmFile, codes))
+
+def getEntityTable(xlmFile):
+    '''Gets the descriptions of the entity codes of a JMdict, for entries parsed with codes=True
+    xlmFile - the file path (plain, gzip, or zip) for the JMdict file
+
+    returns the util_parse.EntityTable, which only reads the DTD when it is first used
+    '''
+    return util_parse.EntityTable(xlmFile)
+
+def parseEntries(xlmFile, remove_archaic=False, filter=False, stream=False, records=False, sequence=False,
+                 codes=False, where=None, keys=None):
     '''Parses all the entries in a JMdict
-    xlmFile - the file path for the JMdict file
+    xlmFile - the file path (plain, gzip, or zip) or file object for the JMdict file
     remove_archaic - boolean to remove archaic entries (True) or not (False) (default False)
     filter - boolean to remove inappropriate entries (True) or not (False) (default False)
-
+    stream - boolean to parse incrementally, releasing each entry once it is yielded (True) or not (False) (default False)
+    records - boolean to store each reading as a compact recordJMdict.Reading (True) or a dictionary (False) (default False)
+    sequence - boolean to also yield the sequence number of each entry (True) or not (False) (default False)
+    codes - boolean to keep the entity codes of part_of_speech, info_def, fields, dialects, info_word
+        (ex. 'v5r' in place of "Godan verb with `ru' ending") (True) or expand them (False) (default False)
+        the descriptions are available from getEntityTable
+    where - a filterJMdict.EntryFilter, or a function taking an entry from the xml and returning True to keep it,
+        checked before the entry is decoded (default None to keep every entry)
+    keys - the keys to build in each reading dictionary (ex. ['phrases', 'part_of_speech']),
+        skipping the tags of the others (default None for every key)
+
+    yields the sequence number of the entry as an int (only if sequence is True)
     yields boolean determine if word is only Kana (True) or not (False)
     yields dictionary for either Kana of non-Kana words
     '''
-    # Load in data and enter the main xml
-    tree = ET.parse(xlmFile)
-    root = tree.getroot()
+    table = util_parse.EntityTable() if codes else None
+    if where is not None:
+        where = compileWhere(where, xlmFile, table)
+    keys = getProjection(keys)
 
     # Iterate over each root
-    for item in getEntryIter(root):
-        if isKana(item):
-            kana = True
-            resultDic = parseKana(item)
-        else:
-            kana = False
-            resultDic = parseNKana(item)
-
-        # Remove archaic
-        if remove_archaic:
-            badword = []
-            for word in resultDic.keys():
-                if kana:
-                    for pos in resultDic[word]['part_of_speech']:
-                        if 'archaic' in pos:
-                            badword.append(word)
-                            break
-                else:
-                    badpro = []
-                    for pronounce in resultDic[word].keys():
-                        for pos in resultDic[word][pronounce]['part_of_speech']:
-                            print(pos)
-                            if 'archaic' in pos:
-                                badpro.append(pronounce)
-                                break
-                    util_parse.deleteFromDictionary(resultDic[word], badpro)
-            util_parse.deleteFromDictionary(resultDic, badword)
-
-        # Filter entries
-        if filter:
-            badword = []
-            for word in resultDic.keys():
-                if kana:
-                    if 'rude or X-rated term (not displayed in educational software)' in resultDic[word]['info_def']:
-                        badword.append(word)
-                else:
-                    badpro = []
-                    for pronounce in resultDic[word].keys():
-                        if 'rude or X-rated term (not displayed in educational software)' in resultDic[word][pronounce]['info_def']:        
-                            badpro.append(pronounce)
-                    util_parse.deleteFromDictionary(resultDic[word], badpro)
-            util_parse.deleteFromDictionary(resultDic, badword)
+    for item in iterEntries(xlmFile, stream, table):
+        if where is not None and not where(item):
+            continue
+        kana, resultDic = parseEntry(item, remove_archaic, filter, records, table, keys)
 
         # Check if empty
         if resultDic:
-            yield kana, resultDic
+            if sequence:
+                yield int(getSeqNum(item)), kana, resultDic
+            else:
+                yield kana, resultDic
+
+def parseEntriesParallel(xlmFile, remove_archaic=False, filter=False, records=False, sequence=False,
+                         processes=None, ordered=True, chunksPerProcess=4, codes=False,
+                         where=None, keys=None):
+    '''Parses all the entries in a JMdict using a pool of processes
+    xlmFile - the file path for the JMdict file
+    remove_archaic - boolean to remove archaic entries (True) or not (False) (default False)
+    filter - boolean to remove inappropriate entries (True) or not (False) (default False)
+    records - boolean to store each reading as a compact recordJMdict.Reading (True) or a dictionary (False) (default False)
+    sequence - boolean to also yield the sequence number of each entry (True) or not (False) (default False)
+    processes - the number of worker processes (default the number of CPUs)
+    ordered - boolean to yield entries in the order of the file, which is ent_seq order (True)
+        or as soon as each chunk is finished (False) (default True)
+    chunksPerProcess - the number of byte ranges given to each process, to balance the load (default 4)
+    codes - boolean to keep the entity codes (True) or expand them (False), as in parseEntries (default False)
+    where - the filter checked before each entry is decoded, as in parseEntries (default None)
+        a function given as the filter has to be defined at the top level of a module to reach the processes
+    keys - the keys to build in each reading dictionary, as in parseEntries (default None for every key)
+
+    yields the sequence number of the entry as an int (only if sequence is True)
+    yields boolean determine if word is only Kana (True) or not (False)
+    yields dictionary for either Kana of non-Kana words
+    archives and file objects cannot be split into byte ranges, so they are streamed in this process instead
+    '''
+    if not util_parse.isPlainFile(xlmFile):
+        yield from parseEntries(xlmFile, remove_archaic, filter, True, records, sequence, codes, where, keys)
+        return
+
+    if processes is None:
+        processes = os.cpu_count() or 1
+
+    header, ranges = util_parse.splitElementRanges(xlmFile, 'JMdict', 'entry', processes * chunksPerProcess)
+    table = None
+    if codes:
+        table = util_parse.EntityTable(header=header)
+        header = util_parse.keepEntityCodes(header)
+
+    # Codes are turned into descriptions once here, so the workers get a ready filter
+    if hasattr(where, 'compile'):
+        where = where if codes else where.resolve(util_parse.EntityTable(header=header))
+    keys = getProjection(keys)
+
+    # Records are interned and shared again as they are unpickled in this process (see recordJMdict.loadReading)
+    settings = (xlmFile, header, remove_archaic, filter, records, table, where, keys)
+    with multiprocessing.Pool(processes, _initChunkWorker, settings) as pool:
+        mapper = pool.imap if ordered else pool.imap_unordered
+        for chunk in mapper(_parseChunk, ranges):
+            for seq, kana, resultDic in chunk:
+                if sequence:
+                    yield seq, kana, resultDic
+                else:
+                    yield kana, resultDic
+
+
+_chunkWorker = {}
+
+def _initChunkWorker(xlmFile, header, remove_archaic, filter, records, codes, where, keys):
+    '''Stores the settings shared by every chunk of a worker process
+    '''
+    if hasattr(where, 'compile'):
+        where = where.compile()
+    _chunkWorker.update(xlmFile=xlmFile, header=header, remove_archaic=remove_archaic, filter=filter, records=records,
+                        codes=codes, where=where, keys=keys)
+
+def _parseChunk(byteRange):
+    '''Parses the entries in a byte range of the JMdict in a worker process
+    byteRange - the (start, end) bytes of the range
+
+    returns a list of (seq, kana, resultDic) for the non-empty entries
+    '''
+    start, end = byteRange
+    root = util_parse.parseElementRange(_chunkWorker['xlmFile'], _chunkWorker['header'], start, end, 'JMdict')
+
+    where = _chunkWorker['where']
+    chunk = []
+    for item in getEntryIter(root):
+        if where is not None and not where(item):
+            continue
+        kana, resultDic = parseEntry(item, _chunkWorker['remove_archaic'], _chunkWorker['filter'], _chunkWorker['records'],
+                                     _chunkWorker['codes'], _chunkWorker['keys'])
+        if resultDic:
+            chunk.append((int(getSeqNum(item)), kana, resultDic))
+    return chunk
+
+def isArchaicDescription(pos):
+    '''Checks whether an expanded part-of-speech is archaic
+    pos - the part-of-speech description (ex. 'Nidan verb (archaic)')
+
+    returns True if the part-of-speech is archaic
+    '''
+    return 'archaic' in pos
 
-def parseNKana(entry):
+def parseEntry(entry, remove_archaic=False, filter=False, records=False, codes=None, keys=None):
+    '''Parses a single entry of the JMdict
+    entry - an entry from the xml
+    remove_archaic - boolean to remove archaic entries (True) or not (False) (default False)
+    filter - boolean to remove inappropriate entries (True) or not (False) (default False)
+    records - boolean to store each reading as a compact recordJMdict.Reading (True) or a dictionary (False) (default False)
+    codes - the util_parse.EntityTable when the entry was parsed with its entity codes kept (default None)
+    keys - the frozenset of keys to build in each reading dictionary, from getProjection (default None for every key)
+
+    returns boolean determine if word is only Kana (True) or not (False)
+    returns dictionary for either Kana of non-Kana words (empty if everything was removed)
+    '''
+    # With entity codes, archaic is found from the descriptions once and each pos is a set lookup
+    if codes is None:
+        isArchaic = isArchaicDescription
+        rude = 'rude or X-rated term (not displayed in educational software)'
+    else:
+        isArchaic = codes.matching('archaic').__contains__
+        rude = 'X'
+
+    # Most entries have nothing to remove, which is seen from the tags before the entry is built
+    if remove_archaic:
+        remove_archaic = any(isArchaic(item.text) for item in entry.iterfind('sense/pos'))
+    if filter:
+        filter = any(item.text == rude for item in entry.iterfind('sense/misc'))
+
+    # The removals need their keys, which are dropped again afterwards
+    buildKeys = keys
+    if keys is not None and (remove_archaic or filter):
+        buildKeys = keys.union(['part_of_speech'] if remove_archaic else [], ['info_def'] if filter else [])
+
+    if isKana(entry):
+        kana = True
+        resultDic = parseKana(entry, buildKeys, records)
+    else:
+        kana = False
+        resultDic = parseNKana(entry, buildKeys, records)
+
+    # Remove archaic
+    if remove_archaic:
+        badword = []
+        for word in resultDic.keys():
+            if kana:
+                for pos in resultDic[word]['part_of_speech']:
+                    if isArchaic(pos):
+                        badword.append(word)
+                        break
+            else:
+                badpro = []
+                for pronounce in resultDic[word].keys():
+                    for pos in resultDic[word][pronounce]['part_of_speech']:
+                        if isArchaic(pos):
+                            badpro.append(pronounce)
+                            break
+                util_parse.deleteFromDictionary(resultDic[word], badpro)
+        util_parse.deleteFromDictionary(resultDic, badword)
+
+    # Filter entries
+    if filter:
+        badword = []
+        for word in resultDic.keys():
+            if kana:
+                if rude in resultDic[word]['info_def']:
+                    badword.append(word)
+            else:
+                badpro = []
+                for pronounce in resultDic[word].keys():
+                    if rude in resultDic[word][pronounce]['info_def']:
+                        badpro.append(pronounce)
+                util_parse.deleteFromDictionary(resultDic[word], badpro)
+        util_parse.deleteFromDictionary(resultDic, badword)
+
+    if buildKeys is not keys:
+        dropKeys(kana, resultDic, buildKeys - keys)
+
+    return kana, resultDic
+
+def dropKeys(kana, resultDic, keys):
+    '''Removes keys from every reading dictionary of an entry
+    kana - boolean determine if word is only Kana (True) or not (False)
+    resultDic - the dictionary from parseKana (kana) or parseNKana (non-kana)
+    keys - the keys to remove (records keep every field, so the field is emptied instead)
+    '''
+    cells = resultDic.values() if kana else [cell for readings in resultDic.values() for cell in readings.values()]
+    # Readings can share a dictionary, so each is only changed once
+    for cell in {id(cell): cell for cell in cells}.values():
+        for key in keys:
+            if isinstance(cell, dict):
+                del cell[key]
+            else:
+                setattr(cell, key, ())
+
+def newCell(infList, priList, keys=None):
+    '''Creates the dictionary of a single reading
+    infList - the list of reading information
+    priList - the list of record information
+    keys - the frozenset of keys to create (default None for every key)
+
+    returns the dictionary without any sense
+    '''
+    cell = {
+        'synonyms': [], 'antonyms': [], 'part_of_speech': [], 'fields': [], 'info_def': [],
+        'source': {}, 'dialects': [], 'phrases': {}, 'association': [], 'sensory': [], 'examples': [],
+        'info_word': infList, 'record': priList
+    }
+    if keys is not None:
+        return {key: value for key, value in cell.items() if key in keys}
+    return cell
+
+def addSense(cell, sense, keys=None):
+    '''Adds the values of a sense to the dictionary of a reading
+    cell - the dictionary of the reading
+    sense - the values returned by getSense
+    keys - the frozenset of keys in the dictionary (default None for every key)
+    '''
+    if keys is not None:
+        for key in keys:
+            position = SENSE_KEYS.get(key)
+            if position is None:
+                continue
+            if isinstance(cell[key], dict):
+                cell[key].update(sense[position[1]])
+            else:
+                cell[key].extend(sense[position[1]])
+        return
+
+    _, _, xref, ant, posList, fieldList, mscList, lsourceList, \
+        dialList, glossList, priList, infList, exampleList = sense
+    cell['synonyms'].extend(xref)
+    cell['antonyms'].extend(ant)
+    cell['part_of_speech'].extend(posList)
+    cell['fields'].extend(fieldList)
+    cell['info_def'].extend(mscList)
+    cell['source'].update(lsourceList)
+    cell['dialects'].extend(dialList)
+    cell['phrases'].update(glossList)
+    cell['association'].extend(priList)
+    cell['sensory'].extend(infList)
+    cell['examples'].extend(exampleList)
+
+def newReading(infList, priList, senses, keys=None):
+    '''Creates the compact record of a single reading
+    infList - the list of reading information
+    priList - the list of record information
+    senses - the values returned by getSense for every sense that applies, in order
+    keys - the frozenset of keys to fill, leaving the others empty (default None for every key)
+
+    returns the recordJMdict.Reading
+    '''
+    reading = recordJMdict.Reading()
+    if keys is None or 'info_word' in keys:
+        reading.info_word = recordJMdict.internTags(infList)
+    if keys is None or 'record' in keys:
+        reading.record = recordJMdict.internTags(priList)
+    if not senses:
+        return reading
+
+    for key, (_, position) in SENSE_KEYS.items():
+        if keys is not None and key not in keys:
+            continue
+        if len(senses) == 1:
+            values = senses[0][position]
+        elif key in recordJMdict.MAPPING_FIELDS:
+            values = {}
+            for sense in senses:
+                values.update(sense[position])
+        else:
+            values = [value for sense in senses for value in sense[position]]
+        # Empty fields keep the shared empty tuple or mapping of the Reading
+        if values:
+            setattr(reading, key, recordJMdict.CONVERTERS[key](values))
+    return reading
+
+def buildCell(infList, priList, senses, keys=None, records=False):
+    '''Creates the dictionary or record of a single reading with its senses
+    infList - the list of reading information
+    priList - the list of record information
+    senses - the values returned by getSense for every sense that applies, in order
+    keys - the frozenset of keys to build (default None for every key)
+    records - boolean to build a recordJMdict.Reading (True) or a dictionary (False) (default False)
+
+    returns the dictionary or Reading
+    '''
+    if records:
+        return newReading(infList, priList, senses, keys)
+    cell = newCell(infList, priList, keys)
+    for sense in senses:
+        addSense(cell, sense, keys)
+    return cell
+
+def parseNKana(entry, keys=None, records=False):
     '''Parses an entry that has non-Kana elements
     entry - an entry from the xml
+    keys - the frozenset of keys to build in each reading dictionary, from getProjection (default None for every key)
+    records - boolean to build each reading as a recordJMdict.Reading (True) or a dictionary (False) (default False)
 
     returns a dictionary in the form
         {word: {pronounce: {
@@ -278,63 +640,62 @@ def parseNKana(entry):
             'source', 'dialects', 'phrases', 'association', 'sensory', 'examples',
             'info_word', 'record'
         }}}
+        readings that get the same senses from the same r_ele share one dictionary (or Reading)
     '''
-    wordDict = {}
-
-    # Iterate over non-kana
-    # Need to get kanji reading
-    for item in entry.findall('k_ele'):
-        word_jp, infList, priList = getKEle(item)
-        wordDict[word_jp] = {}
-
-    # Iterate over readable
-    # Need to get reading
-    for item in entry.findall('r_ele'):
-        word_jp, trueKanji, restrict, infList, priList = getREle(item)
-
-        if not restrict:
-            restrict = list(wordDict.keys())
-
-        for r in restrict:
-            wordDict[r][word_jp] = {
-                'synonyms': [], 'antonyms': [], 'part_of_speech': [], 'fields': [], 'info_def': [],
-                'source': {}, 'dialects': [], 'phrases': {}, 'association': [], 'sensory': [], 'examples': [],
-                'info_word': infList, 'record': priList
-            }
-
-    # Iterate over sense
-    # Need to get definition, part-of-speech
-    for item in entry.findall('sense'):
-        kRestrict, rRestrict, xref, ant, posList, fieldList, mscList, lsourceList, \
-            dialList, glossList, priList, infList, exampleList = getSense(item)
-
-        if not kRestrict:
-            kRestrict = list(wordDict.keys())
-        if not rRestrict:
-            rRestrict = []
-            for stag in kRestrict:
-                rRestrict.extend(pro for pro in list(wordDict[stag].keys()) if pro not in rRestrict)
-
-        for kstag in kRestrict:
+    tags = None if keys is None else getSenseTags(keys)
+    kanjiList = []
+    readingList = []
+    senseList = []
+    for item in entry:
+        tag = item.tag
+        if tag == 'sense':
+            senseList.append(getSense(item, tags))
+        elif tag == 'r_ele':
+            readingList.append(getREle(item))
+        elif tag == 'k_ele':
+            kanjiList.append(getKEle(item)[0])
+
+    # Each (word, pronounce) cell first holds the index of its r_ele, followed by the index of every sense that applies
+    wordDict = {word_jp: {} for word_jp in kanjiList}
+    for index, (word_jp, trueKanji, restrict, infList, priList) in enumerate(readingList):
+        for r in restrict or wordDict:
+            wordDict[r][word_jp] = [index]
+
+    for index, sense in enumerate(senseList):
+        kRestrict = sense[0] or wordDict
+        rRestrict = sense[1]
+        if rRestrict:
+            rCounts = {}
             for rstag in rRestrict:
-                if rstag in wordDict[kstag].keys():
-                    wordDict[kstag][rstag]['synonyms'].extend(xref)
-                    wordDict[kstag][rstag]['antonyms'].extend(ant)
-                    wordDict[kstag][rstag]['part_of_speech'].extend(posList)
-                    wordDict[kstag][rstag]['fields'].extend(fieldList)
-                    wordDict[kstag][rstag]['info_def'].extend(mscList)
-                    wordDict[kstag][rstag]['source'].update(lsourceList)
-                    wordDict[kstag][rstag]['dialects'].extend(dialList)
-                    wordDict[kstag][rstag]['phrases'].update(glossList)
-                    wordDict[kstag][rstag]['association'].extend(priList)
-                    wordDict[kstag][rstag]['sensory'].extend(infList)
-                    wordDict[kstag][rstag]['examples'].extend(exampleList)
+                rCounts[rstag] = rCounts.get(rstag, 0) + 1
+            for kstag in kRestrict:
+                for pronounce, cell in wordDict[kstag].items():
+                    if pronounce in rCounts:
+                        cell.extend([index] * rCounts[pronounce])
+        else:
+            # Without stagr, every reading of the restricted words applies
+            for kstag in kRestrict:
+                for cell in wordDict[kstag].values():
+                    cell.append(index)
+
+    # Build each distinct reading once and share it between the words
+    built = {}
+    for readings in wordDict.values():
+        for pronounce, cell in readings.items():
+            key = tuple(cell)
+            wordCell = built.get(key)
+            if wordCell is None:
+                _, _, _, infList, priList = readingList[cell[0]]
+                wordCell = built[key] = buildCell(infList, priList, [senseList[index] for index in cell[1:]], keys, records)
+            readings[pronounce] = wordCell
 
     return wordDict
 
-def parseKana(entry):
+def parseKana(entry, keys=None, records=False):
     '''Parses an entry that has only Kana elements
     entry - an entry from the xml
+    keys - the frozenset of keys to build in each reading dictionary, from getProjection (default None for every key)
+    records - boolean to build each reading as a recordJMdict.Reading (True) or a dictionary (False) (default False)
 
     returns a dictionary in the form
         {word: {
@@ -343,40 +704,24 @@ def parseKana(entry):
             'info_word', 'record'
         }}}
     '''
+    # Each word first holds its reading information, followed by every sense that applies
     wordDict = {}
 
     # Iterate over kana
     # Only contains readable
     for item in entry.findall('r_ele'):
         word_jp, _, _, infList, priList = getREle(item)
-        wordDict[word_jp] = {
-            'synonyms': [], 'antonyms': [], 'part_of_speech': [], 'fields': [], 'info_def': [],
-            'source': {}, 'dialects': [], 'phrases': {}, 'association': [], 'sensory': [], 'examples': [],
-            'info_word': infList, 'record': priList
-        }
+        wordDict[word_jp] = (infList, priList, [])
 
     # Iterate over sense
+    tags = None if keys is None else getSenseTags(keys)
     for item in entry.findall('sense'):
-        _, rRestrict, xref, ant, posList, fieldList, mscList, lsourceList, \
-            dialList, glossList, priList, infList, exampleList = getSense(item)
-
-        if not rRestrict:
-            rRestrict = list(wordDict.keys())
-
-        for rstag in rRestrict:
-            wordDict[rstag]['synonyms'].extend(xref)
-            wordDict[rstag]['antonyms'].extend(ant)
-            wordDict[rstag]['part_of_speech'].extend(posList)
-            wordDict[rstag]['fields'].extend(fieldList)
-            wordDict[rstag]['info_def'].extend(mscList)
-            wordDict[rstag]['source'].update(lsourceList)
-            wordDict[rstag]['dialects'].extend(dialList)
-            wordDict[rstag]['phrases'].update(glossList)
-            wordDict[rstag]['association'].extend(priList)
-            wordDict[rstag]['sensory'].extend(infList)
-            wordDict[rstag]['examples'].extend(exampleList)
+        sense = getSense(item, tags)
+        for rstag in sense[1] or wordDict:
+            wordDict[rstag][2].append(sense)
 
-    return wordDict
+    return {word_jp: buildCell(infList, priList, senses, keys, records)
+            for word_jp, (infList, priList, senses) in wordDict.items()}
 
 
 if __name__ == '__main__':
@@ -1,5 +1,9 @@
 import os
-import xml.etree.ElementTree as ET
+
+try:
+    from . import util_parse
+except ImportError:
+    import util_parse
 
 
 '''
@@ -157,16 +161,30 @@ def getRM(reading_meaning):
         elif item.get("r_type") == 'ja_kun':
             kunList.append(item.text)
 
+    # English meanings have no m_lang
     for item in rmgroup.findall("meaning"):
-        if item.get("m_lang") == 'en':
+        if item.get("m_lang", 'en') == 'en':
             meanList.append(item.text)
 
     return onList, kunList, meanList, nanoriList
 
 # Parsing Functions
-def parseCharacter(xmlFile):
+def iterCharacters(xmlFile, stream=False):
+    '''Iterates over the character elements in a KANJIDIC
+    xmlFile - the file location (plain, gzip, or zip) or file object for the KANJIDIC dataset
+    stream - boolean to parse incrementally with constant memory (True) or load the whole tree (False) (default False)
+
+    returns the iterator of characters for the xml
+    '''
+    if stream:
+        return util_parse.iterElements(xmlFile, 'character')
+
+    return getEntryIter(util_parse.parseTree(xmlFile))
+
+def parseCharacter(xmlFile, stream=False):
     '''Parse a character from the KANJIDIC dataset
-    xmlFile - the file location for the KANJIDIC dataset
+    xmlFile - the file location (plain, gzip, or zip) or file object for the KANJIDIC dataset
+    stream - boolean to parse incrementally, releasing each character once it is yielded (True) or not (False) (default False)
 
     yields the following:
     The Kanji
@@ -190,12 +208,8 @@ def parseCharacter(xmlFile):
     List of meanings in english
     List of nanori
 '''
-    # Load in data and enter the main xml
-    tree = ET.parse(xmlFile)
-    root = tree.getroot()
-
     # Iterate over each root
-    for item in getEntryIter(root):
+    for item in iterCharacters(xmlFile, stream):
         kanji = getKanji(item)
 
         codepoint = item.find("codepoint")
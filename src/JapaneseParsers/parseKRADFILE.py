@@ -1,5 +1,10 @@
 import os
 
+try:
+    from . import util_parse
+except ImportError:
+    import util_parse
+
 
 def main():
     '''Example function for using the functions in this form
@@ -9,13 +14,14 @@ def main():
         print(radical)
         print()
 
-def parseKRad(fileName):
+def parseKRad(fileName, member=None):
     '''Parses all Kanjis and their radicals in the file
-    fileName - file location for the KRAD dataset
+    fileName - file location (plain, gzip, or zip) or file object for the KRAD dataset
+    member - the file to read when fileName is a zip archive (ex. 'kradfile') (default the only file in the archive)
 
     yields the Kanji character
     yields a list of radical characters for the Kanji character'''
-    with open(fileName, 'r', encoding='euc-jp') as file:
+    with util_parse.openSource(fileName, member, 'euc-jp') as file:
         for line in file:
             if line[0] != '#':
                 kradArray = line.split()
@@ -1,5 +1,10 @@
 import os
 
+try:
+    from . import util_parse
+except ImportError:
+    import util_parse
+
 
 def main():
     '''Example function for using the functions in this form
@@ -9,9 +14,10 @@ def main():
         print(kanji)
         print()
 
-def parseRadK(fileName):
+def parseRadK(fileName, member=None):
     '''Parses all radicals and Kanji using the radicals in the file
-    fileName - file location for the KRAD dataset
+    fileName - file location (plain, gzip, or zip) or file object for the KRAD dataset
+    member - the file to read when fileName is a zip archive (ex. 'radkfilex') (default the only file in the archive)
 
     yields the radical character
     yields the stroke count for the radical
@@ -19,7 +25,7 @@ def parseRadK(fileName):
     currentRadical = ''
     currentStrokes = ''
     currentKanji = ''
-    with open(fileName, 'r', encoding='euc-jp') as file:
+    with util_parse.openSource(fileName, member, 'euc-jp') as file:
         for line in file:
             line = line[:-1]
             if line[0] == '#':
@@ -34,6 +40,9 @@ def parseRadK(fileName):
             else:
                 currentKanji = currentKanji + line
 
+    if currentRadical:
+        yield currentRadical, currentStrokes, currentKanji
+
 
 if __name__ == '__main__':
     main()
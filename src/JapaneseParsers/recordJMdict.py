@@ -0,0 +1,191 @@
+import sys
+from types import MappingProxyType
+
+
+''' Compact records for the parsed JMdict
+A Reading replaces the per-reading dictionary built by parseKana/parseNKana when they are asked for records.
+Lists are stored as tuples (empty lists all share the empty tuple), tag strings
+such as the part-of-speech and misc expansions are interned, and the attribute
+dictionaries of glosses and sources are shared between records.
+A pickled Reading is rebuilt through loadReading, so records sent from worker processes or read from a cache
+are interned and shared again in the process that loads them.
+'''
+
+FIELDS = ('synonyms', 'antonyms', 'part_of_speech', 'fields', 'info_def',
+          'source', 'dialects', 'phrases', 'association', 'sensory', 'examples',
+          'info_word', 'record')
+
+# Fields that only hold short, repeated tags
+TAG_FIELDS = ('part_of_speech', 'fields', 'info_def', 'dialects', 'info_word', 'record')
+
+# Fields that hold a dictionary of attribute dictionaries
+MAPPING_FIELDS = ('source', 'phrases')
+
+EMPTY_MAP = MappingProxyType({})
+
+_sharedAttributes = {}
+
+
+class Reading:
+    '''A single reading of a JMdict word
+
+    Fields are the same as the keys of the dictionaries made by parseKana/parseNKana,
+    and can be accessed either as attributes or with reading['part_of_speech']
+    '''
+    __slots__ = FIELDS
+
+    def __init__(self, synonyms=(), antonyms=(), part_of_speech=(), fields=(), info_def=(),
+                 source=EMPTY_MAP, dialects=(), phrases=EMPTY_MAP, association=(), sensory=(), examples=(),
+                 info_word=(), record=()):
+        self.synonyms = synonyms
+        self.antonyms = antonyms
+        self.part_of_speech = part_of_speech
+        self.fields = fields
+        self.info_def = info_def
+        self.source = source
+        self.dialects = dialects
+        self.phrases = phrases
+        self.association = association
+        self.sensory = sensory
+        self.examples = examples
+        self.info_word = info_word
+        self.record = record
+
+    def __getitem__(self, key):
+        if key not in FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key):
+        return key in FIELDS
+
+    def __eq__(self, other):
+        if not isinstance(other, Reading):
+            return NotImplemented
+        return all(getattr(self, key) == getattr(other, key) for key in FIELDS)
+
+    def __repr__(self):
+        return 'Reading(' + ', '.join('{}={!r}'.format(key, getattr(self, key)) for key in FIELDS) + ')'
+
+    def __reduce__(self):
+        # The shared attribute mappings cannot be pickled, so they are sent as dictionaries
+        return (loadReading, tuple({key: dict(value) for key, value in getattr(self, field).items()}
+                                   if field in MAPPING_FIELDS else getattr(self, field) for field in FIELDS))
+
+    def keys(self):
+        return FIELDS
+
+    def asDict(self):
+        '''Converts the record back to the dictionary made by parseKana/parseNKana
+
+        returns a dictionary with lists and dictionaries in place of tuples and mappings
+        '''
+        return {
+            'synonyms': [list(ref) for ref in self.synonyms],
+            'antonyms': [list(ref) for ref in self.antonyms],
+            'part_of_speech': list(self.part_of_speech),
+            'fields': list(self.fields),
+            'info_def': list(self.info_def),
+            'source': {key: dict(value) for key, value in self.source.items()},
+            'dialects': list(self.dialects),
+            'phrases': {key: dict(value) for key, value in self.phrases.items()},
+            'association': list(self.association),
+            'sensory': list(self.sensory),
+            'examples': [(list(source), text, eExample, jExample) for source, text, eExample, jExample in self.examples],
+            'info_word': list(self.info_word),
+            'record': list(self.record)
+        }
+
+
+def internTags(tags):
+    '''Interns a list of tag strings
+    tags - a list of strings (None is kept as is)
+
+    returns a tuple of the interned strings
+    '''
+    return tuple(tag if tag is None else sys.intern(tag) for tag in tags)
+
+def shareAttributes(attributes):
+    '''Gets a shared read-only copy of an attribute dictionary
+    attributes - a dictionary such as {'lang': lang, 'gender': g_gend}
+
+    returns the mapping shared by every equal attribute dictionary
+    '''
+    key = tuple(attributes.items())
+    shared = _sharedAttributes.get(key)
+    if shared is None:
+        shared = _sharedAttributes[key] = MappingProxyType(dict(attributes))
+    return shared
+
+def shareMapping(mapping):
+    '''Converts a dictionary of attribute dictionaries into a compact mapping
+    mapping - a dictionary such as the phrases or source of a reading
+
+    returns the shared empty mapping or a dictionary with shared attributes
+    '''
+    if not mapping:
+        return EMPTY_MAP
+    return {key: shareAttributes(value) for key, value in mapping.items()}
+
+def toRefs(refs):
+    '''Converts a list of cross-references into tuples
+    refs - a list of split references (ex. [['明白', 'めいはく']])
+
+    returns a tuple of tuples
+    '''
+    return tuple(tuple(ref) for ref in refs)
+
+def toExamples(examples):
+    '''Converts a list of examples into tuples
+    examples - a list of examples as returned by parseJMdict.getExample
+
+    returns a tuple of (source tuple, ex_text, english sentence, japanese sentence)
+    '''
+    return tuple((tuple(source), text, eExample, jExample) for source, text, eExample, jExample in examples)
+
+
+# The function giving the compact form of the values of each field
+CONVERTERS = {field: internTags for field in TAG_FIELDS}
+CONVERTERS.update(synonyms=toRefs, antonyms=toRefs, source=shareMapping, phrases=shareMapping,
+                  association=tuple, sensory=tuple, examples=toExamples)
+
+def loadReading(*values):
+    '''Rebuilds a pickled Reading, interning its tags and sharing its attributes in this process
+    values - the values of every field, in the order of FIELDS
+
+    returns the Reading
+    '''
+    reading = Reading()
+    for field, value in zip(FIELDS, values):
+        if value:
+            setattr(reading, field, CONVERTERS[field](value))
+    return reading
+
+def toReading(wordDict):
+    '''Converts a reading dictionary from parseKana/parseNKana into a Reading
+    wordDict - the dictionary of a single reading (keys left out by a projection stay empty)
+
+    returns the Reading
+    '''
+    return loadReading(*(wordDict.get(field) for field in FIELDS))
+
+def toRecords(kana, resultDic):
+    '''Converts the dictionary of an entry into Reading records
+    kana - boolean determine if word is only Kana (True) or not (False)
+    resultDic - the dictionary from parseKana (kana) or parseNKana (non-kana)
+
+    returns the same dictionary layout with a Reading in place of each reading dictionary
+        (reading dictionaries that are the same object share the same Reading)
+    '''
+    converted = {}
+
+    def convert(item):
+        reading = converted.get(id(item))
+        if reading is None:
+            reading = converted[id(item)] = toReading(item)
+        return reading
+
+    if kana:
+        return {word: convert(item) for word, item in resultDic.items()}
+    return {word: {pronounce: convert(item) for pronounce, item in readings.items()}
+            for word, readings in resultDic.items()}
@@ -0,0 +1,490 @@
+import heapq
+import math
+import os
+from array import array
+
+try:
+    from . import parseJMdict, parseKANJIDIC, util_parse
+    from .indexJMdict import tokenize
+except ImportError:
+    import parseJMdict
+    import parseKANJIDIC
+    import util_parse
+    from indexJMdict import tokenize
+
+
+''' Structure
+Every JMdict entry and KANJIDIC character is a document, made of its english glosses or meanings.
+    kinds # ENTRY or KANJI for each document
+    keys # The sequence number of each entry, or the literal of each character
+    lengths # The number of terms in each document
+    boosts # How much to raise the score of each document for being common
+    terms # {stemmed term: term id}
+    frequencies # The number of documents holding each term
+    offsets # Term i has the postings postings[offsets[i]:offsets[i+1]]
+    postings # For each document with the term, the gap from the previous document and the count
+             # of the term, both as variable length integers (7 bits per byte, high bit set when more follow)
+Documents are numbered in the order they are read, so the gaps are small and mostly take one byte.
+'''
+
+INDEX_VERSION = 1
+
+ENTRY = 'entry'
+KANJI = 'kanji'
+
+# Words that are in too many glosses to say anything about them
+STOPWORDS = frozenset(['a', 'an', 'the', 'to', 'of', 'or', 'and', 'be', 'is', 'in', 'on', 'as'])
+
+# The KANJIDIC frequency ranking only covers the most used characters
+KANJI_FREQUENCIES = 2500
+
+# The suffixes of steps 2 to 4 of the Porter stemmer, longest first since only the longest matching suffix is tried
+STEP2 = sorted([('ational', 'ate'), ('tional', 'tion'), ('enci', 'ence'), ('anci', 'ance'), ('izer', 'ize'),
+                ('bli', 'ble'), ('alli', 'al'), ('entli', 'ent'), ('eli', 'e'), ('ousli', 'ous'), ('ization', 'ize'),
+                ('ation', 'ate'), ('ator', 'ate'), ('alism', 'al'), ('iveness', 'ive'), ('fulness', 'ful'),
+                ('ousness', 'ous'), ('aliti', 'al'), ('iviti', 'ive'), ('biliti', 'ble'), ('logi', 'log')],
+               key=lambda pair: -len(pair[0]))
+STEP3 = sorted([('icate', 'ic'), ('ative', ''), ('alize', 'al'), ('iciti', 'ic'), ('ical', 'ic'), ('ful', ''), ('ness', '')],
+               key=lambda pair: -len(pair[0]))
+STEP4 = sorted(['al', 'ance', 'ence', 'er', 'ic', 'able', 'ible', 'ant', 'ement', 'ment', 'ent', 'ion', 'ou', 'ism',
+                'ate', 'iti', 'ous', 'ive', 'ize'], key=lambda suffix: -len(suffix))
+
+
+def main():
+    '''Example function for using the functions in this form
+    '''
+    fileName = os.path.join('data', 'english.index')
+    index = EnglishIndex.fromFiles(os.path.join('data', 'JMdict_e_examp.xml'), os.path.join('data', 'kanjidic2.xml'))
+    index.save(fileName)
+
+    index = EnglishIndex.load(fileName)
+    for kind, key, score in index.search('eat rice'):
+        print(kind, key, round(score, 2))
+
+# Stemming
+def isConsonant(word, i):
+    '''Determines if a letter of a word is a consonant, for the Porter stemmer
+    word - the lowercase word
+    i - the position of the letter
+
+    returns True if the letter is a consonant ('y' is one at the start or after a vowel)
+    '''
+    letter = word[i]
+    if letter in 'aeiou':
+        return False
+    if letter == 'y':
+        return i == 0 or not isConsonant(word, i - 1)
+    return True
+
+def measure(stem):
+    '''Counts the vowel-consonant sequences of a stem, which is m in the Porter stemmer
+
+    returns the count
+    '''
+    count = 0
+    previousVowel = False
+    for i in range(len(stem)):
+        vowel = not isConsonant(stem, i)
+        if previousVowel and not vowel:
+            count += 1
+        previousVowel = vowel
+    return count
+
+def hasVowel(stem):
+    '''Determines if a stem has a vowel
+    '''
+    return any(not isConsonant(stem, i) for i in range(len(stem)))
+
+def endsDoubleConsonant(stem):
+    '''Determines if a stem ends with a doubled consonant (ex. 'hopp')
+    '''
+    return len(stem) > 1 and stem[-1] == stem[-2] and isConsonant(stem, len(stem) - 1)
+
+def endsCVC(stem):
+    '''Determines if a stem ends with consonant, vowel, consonant, where the last is not w, x, or y
+    '''
+    return (len(stem) > 2 and isConsonant(stem, len(stem) - 1) and not isConsonant(stem, len(stem) - 2)
+            and isConsonant(stem, len(stem) - 3) and stem[-1] not in 'wxy')
+
+def replaceSuffix(word, rules, minMeasure):
+    '''Replaces the longest matching suffix of a word, if what is left is long enough
+    word - the word
+    rules - the list of (suffix, replacement)
+    minMeasure - the measure the stem has to be larger than
+
+    returns the word
+    '''
+    for suffix, replacement in rules:
+        if word.endswith(suffix):
+            base = word[:-len(suffix)]
+            if measure(base) > minMeasure:
+                return base + replacement
+            return word
+    return word
+
+def stem(word):
+    '''Reduces an english word to its stem with the Porter stemmer (ex. 'eating' to 'eat')
+    word - the lowercase word
+
+    returns the stem
+    '''
+    if len(word) <= 2:
+        return word
+
+    # Step 1a, plurals
+    if word.endswith('sses') or word.endswith('ies'):
+        word = word[:-2]
+    elif word.endswith('s') and not word.endswith('ss'):
+        word = word[:-1]
+
+    # Step 1b, past tense and progressive
+    if word.endswith('eed'):
+        if measure(word[:-3]) > 0:
+            word = word[:-1]
+    else:
+        for suffix in ('ed', 'ing'):
+            if word.endswith(suffix) and hasVowel(word[:-len(suffix)]):
+                word = word[:-len(suffix)]
+                if word.endswith(('at', 'bl', 'iz')):
+                    word += 'e'
+                elif endsDoubleConsonant(word) and word[-1] not in 'lsz':
+                    word = word[:-1]
+                elif measure(word) == 1 and endsCVC(word):
+                    word += 'e'
+                break
+
+    # Step 1c
+    if word.endswith('y') and hasVowel(word[:-1]):
+        word = word[:-1] + 'i'
+
+    # Steps 2 and 3, derivational suffixes
+    word = replaceSuffix(word, STEP2, 0)
+    word = replaceSuffix(word, STEP3, 0)
+
+    # Step 4
+    for suffix in STEP4:
+        if word.endswith(suffix):
+            base = word[:-len(suffix)]
+            if measure(base) > 1 and (suffix != 'ion' or base.endswith(('s', 't'))):
+                word = base
+            break
+
+    # Step 5
+    if word.endswith('e'):
+        base = word[:-1]
+        if measure(base) > 1 or (measure(base) == 1 and not endsCVC(base)):
+            word = base
+    if word.endswith('ll') and measure(word) > 1:
+        word = word[:-1]
+    return word
+
+def getTerms(text, cache=None):
+    '''Splits english text into stemmed terms, leaving out stop words
+    text - the english text
+    cache - a dictionary of {word: stem} to reuse stems (optional)
+
+    returns a list of terms
+    '''
+    terms = []
+    for word in tokenize(text):
+        if word in STOPWORDS:
+            continue
+        if cache is None:
+            terms.append(stem(word))
+        else:
+            term = cache.get(word)
+            if term is None:
+                term = cache[word] = stem(word)
+            terms.append(term)
+    return terms
+
+# Posting lists
+def encodeVarint(value, out):
+    '''Appends a non-negative integer to a bytearray, 7 bits at a time
+    value - the integer
+    out - the bytearray
+    '''
+    while value > 0x7f:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def decodePostings(data, start, end):
+    '''Decodes a posting list
+    data - the postings bytes
+    start - the first byte of the list
+    end - the byte after the list
+
+    returns a list of documents and a list of term counts
+    '''
+    docs = []
+    counts = []
+    doc = 0
+    value = 0
+    shift = 0
+    gap = True
+    for position in range(start, end):
+        byte = data[position]
+        value |= (byte & 0x7f) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        if gap:
+            doc += value
+            docs.append(doc)
+        else:
+            counts.append(value)
+        gap = not gap
+        value = 0
+        shift = 0
+    return docs, counts
+
+# Documents
+def iterEntryDocuments(xlmFile):
+    '''Iterates over the english glosses of every JMdict entry
+    xlmFile - the file path (plain, gzip, or zip) or file object for the JMdict file
+
+    yields the sequence number of the entry, the list of glosses, and the list of ke_pri/re_pri record information
+    '''
+    tags = parseJMdict.getSenseTags(frozenset(['phrases']))
+    for entry in parseJMdict.iterEntries(xlmFile, True):
+        glosses = []
+        priList = []
+        for item in entry:
+            tag = item.tag
+            if tag == 'sense':
+                glosses.extend(gloss for gloss, attributes in parseJMdict.getSense(item, tags)[9].items()
+                               if attributes['lang'] in (None, 'eng'))
+            elif tag == 'k_ele':
+                priList.extend(parseJMdict.getKEle(item)[2])
+            elif tag == 'r_ele':
+                priList.extend(parseJMdict.getREle(item)[4])
+        yield int(parseJMdict.getSeqNum(entry)), glosses, priList
+
+def iterKanjiDocuments(kanjiFile):
+    '''Iterates over the english meanings of every KANJIDIC character
+    kanjiFile - the file location (plain, gzip, or zip) or file object for the KANJIDIC dataset
+
+    yields the literal of the character, the list of meanings, and the frequency ranking (None if not common)
+    '''
+    for kanjiItem in parseKANJIDIC.parseCharacter(kanjiFile, True):
+        yield kanjiItem[0], kanjiItem[17], None if kanjiItem[8] is None else int(kanjiItem[8])
+
+def entryBoost(priList, weight):
+    '''Gets how much to raise the score of a common entry
+    priList - the list of ke_pri/re_pri record information
+    weight - the boost of the most common entries
+
+    returns the factor, 1 for entries without record information
+    '''
+    return 1 + weight * (99 - util_parse.priorityRank(priList)) / 98
+
+def kanjiBoost(frequency, weight):
+    '''Gets how much to raise the score of a common character
+    frequency - the KANJIDIC frequency ranking (None if not common)
+    weight - the boost of the most common characters
+
+    returns the factor, 1 for characters without a ranking
+    '''
+    if frequency is None:
+        return 1
+    return 1 + weight * max(KANJI_FREQUENCIES - frequency, 0) / KANJI_FREQUENCIES
+
+
+class EnglishIndex:
+    '''BM25 ranked search of JMdict entries and KANJIDIC characters by their english meanings
+    '''
+
+    def __init__(self, k1=1.2, b=0.75):
+        '''Creates an empty index, which is filled by build or load
+        k1 - how quickly repeating a term stops raising the score (default 1.2)
+        b - how much longer documents are penalised (default 0.75)
+        '''
+        self.k1 = k1
+        self.b = b
+        self.kinds = bytearray()
+        self.keys = []
+        self.lengths = array('I')
+        self.boosts = array('f')
+        self.terms = {}
+        self.frequencies = array('I')
+        self.offsets = array('Q', [0])
+        self.postings = b''
+        self.norms = array('f')
+        self.cache = {}
+
+    @classmethod
+    def fromFiles(cls, xlmFile=None, kanjiFile=None, priorityWeight=0.5):
+        '''Builds the index from a JMdict and a KANJIDIC
+        xlmFile - the file path (plain, gzip, or zip) for the JMdict file (optional)
+        kanjiFile - the file path (plain, gzip, or zip) for the KANJIDIC file (optional)
+        priorityWeight - how much the most common words and characters are boosted, 0 for plain BM25 (default 0.5)
+
+        returns the EnglishIndex
+        '''
+        documents = []
+        if xlmFile is not None:
+            documents.extend((ENTRY, seq, glosses, entryBoost(priList, priorityWeight))
+                             for seq, glosses, priList in iterEntryDocuments(xlmFile))
+        if kanjiFile is not None:
+            documents.extend((KANJI, literal, meanings, kanjiBoost(frequency, priorityWeight))
+                             for literal, meanings, frequency in iterKanjiDocuments(kanjiFile))
+        index = cls()
+        index.build(documents)
+        return index
+
+    def build(self, documents):
+        '''Fills the index
+        documents - an iterable of (kind, key, list of english texts, boost)
+        '''
+        kinds = (ENTRY, KANJI)
+        stems = {}
+        termDocs = {}
+        for doc, (kind, key, texts, boost) in enumerate(documents):
+            self.kinds.append(kinds.index(kind))
+            self.keys.append(key)
+            self.boosts.append(boost)
+
+            counts = {}
+            length = 0
+            for text in texts:
+                for term in getTerms(text, stems):
+                    counts[term] = counts.get(term, 0) + 1
+                    length += 1
+            self.lengths.append(length)
+
+            for term, count in counts.items():
+                posting = termDocs.get(term)
+                if posting is None:
+                    posting = termDocs[term] = [bytearray(), 0, 0]
+                # The gap from the last document, and the count
+                encodeVarint(doc - posting[1], posting[0])
+                encodeVarint(count, posting[0])
+                posting[1] = doc
+                posting[2] += 1
+
+        postings = bytearray()
+        for termId, (term, (data, _, frequency)) in enumerate(sorted(termDocs.items())):
+            self.terms[term] = termId
+            self.frequencies.append(frequency)
+            postings += data
+            self.offsets.append(len(postings))
+        self.postings = bytes(postings)
+        self.setNorms()
+
+    def setNorms(self):
+        '''Computes the length normalisation of every document, which only changes when the index is built
+        '''
+        averageLength = sum(self.lengths) / len(self.lengths) if self.lengths else 1
+        scale = self.b / (averageLength or 1)
+        self.norms = array('f', (self.k1 * (1 - self.b + scale * length) for length in self.lengths))
+        self.cache = {}
+
+    def __len__(self):
+        return len(self.keys)
+
+    def getPostings(self, term, cacheSize=256):
+        '''Gets the decoded posting list of a term
+        term - the stemmed term
+        cacheSize - the number of decoded lists kept (default 256)
+
+        returns a list of documents and a list of term counts (empty if the term is not indexed)
+        '''
+        postings = self.cache.get(term)
+        if postings is None:
+            termId = self.terms.get(term)
+            if termId is None:
+                return [], []
+            postings = decodePostings(self.postings, self.offsets[termId], self.offsets[termId + 1])
+            if len(self.cache) >= cacheSize:
+                self.cache.pop(next(iter(self.cache)))
+            self.cache[term] = postings
+        return postings
+
+    def search(self, text, k=10, kind=None):
+        '''Finds the documents that best match english text
+        text - the english text (ex. 'to eat')
+        k - the number of matches wanted (default 10)
+        kind - ENTRY or KANJI to only find that kind of document (default None for both)
+
+        returns a list of (kind, key, score), best first, where the key is the sequence number of an entry
+            or the literal of a character
+        '''
+        if not self.keys:
+            return []
+        count = len(self.keys)
+        norms = self.norms
+        k1 = self.k1
+        wanted = None if kind is None else (ENTRY, KANJI).index(kind)
+
+        scores = {}
+        for term in set(getTerms(text)):
+            docs, counts = self.getPostings(term)
+            if not docs:
+                continue
+            idf = math.log(1 + (count - len(docs) + 0.5) / (len(docs) + 0.5))
+            for doc, termCount in zip(docs, counts):
+                scores[doc] = scores.get(doc, 0) + idf * termCount * (k1 + 1) / (termCount + norms[doc])
+
+        kinds = self.kinds
+        if wanted is not None:
+            scores = {doc: score for doc, score in scores.items() if kinds[doc] == wanted}
+        boosts = self.boosts
+        best = heapq.nlargest(k, scores.items(), key=lambda item: (item[1] * boosts[item[0]], -item[0]))
+        return [((ENTRY, KANJI)[kinds[doc]], self.keys[doc], score * boosts[doc]) for doc, score in best]
+
+    # Saving and Loading
+    def save(self, fileName):
+        '''Saves the index
+        fileName - the file location for the index
+        '''
+        header = {'version': INDEX_VERSION, 'count': len(self.keys), 'k1': self.k1, 'b': self.b}
+        seqs = array('q', (key if kind == 0 else -1 for kind, key in zip(self.kinds, self.keys)))
+        literals = '\n'.join(key for kind, key in zip(self.kinds, self.keys) if kind == 1)
+        body = {
+            'kinds': bytes(self.kinds), 'seqs': seqs.tobytes(), 'literals': literals,
+            'lengths': self.lengths.tobytes(), 'boosts': self.boosts.tobytes(),
+            'terms': '\n'.join(sorted(self.terms, key=self.terms.get)),
+            'frequencies': self.frequencies.tobytes(), 'offsets': self.offsets.tobytes(),
+            'postings': self.postings
+        }
+
+        util_parse.writeVersioned(fileName, header, body)
+
+    @classmethod
+    def load(cls, fileName):
+        '''Loads an index saved by save
+        fileName - the file location for the index
+
+        returns the EnglishIndex
+        '''
+        header, body = util_parse.readVersioned(fileName, INDEX_VERSION)
+
+        index = cls(header['k1'], header['b'])
+        index.kinds = bytearray(body['kinds'])
+        literals = iter(body['literals'].split('\n'))
+        index.keys = [seq if kind == 0 else next(literals) for kind, seq in zip(index.kinds, fromBytes('q', body['seqs']))]
+        index.lengths = fromBytes('I', body['lengths'])
+        index.boosts = fromBytes('f', body['boosts'])
+        terms = body['terms'].split('\n') if body['terms'] else []
+        index.terms = {term: termId for termId, term in enumerate(terms)}
+        index.frequencies = fromBytes('I', body['frequencies'])
+        index.offsets = fromBytes('Q', body['offsets'])
+        index.postings = body['postings']
+        index.setNorms()
+        return index
+
+def fromBytes(typecode, data):
+    '''Creates an array from its bytes
+    typecode - the array typecode
+    data - the bytes
+
+    returns the array
+    '''
+    values = array(typecode)
+    values.frombytes(data)
+    return values
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+import os
+
+try:
+    from . import parseKANJIDIC, parseRADKFILE
+except ImportError:
+    import parseKANJIDIC
+    import parseRADKFILE
+
+
+''' Structure
+kanji       # Every Kanji of the RADKFILE, numbered by stroke count (unknown counts last) then character
+radicalBits # {radical: int} with bit i set when kanji[i] uses the radical
+strokeStart # strokeStart[n] is the number of the first Kanji with n or more strokes
+A search ANDs the bits of the selected radicals. Since the Kanji are numbered by stroke count,
+a stroke range is a single contiguous mask, and the results come out sorted by stroke count.
+'''
+
+# The set bits of every byte, for decoding bitsets a byte at a time
+BYTE_BITS = [tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256)]
+
+
+def main():
+    '''Example function for using the functions in this form
+    '''
+    search = RadicalSearch.fromFiles(os.path.join('data', 'kradzip', 'radkfilex'), os.path.join('data', 'kanjidic2.xml'))
+    kanji, radicals = search.query(['口', '木'], maxStrokes=10)
+    print(''.join(kanji))
+    print(''.join(radicals))
+
+def getStrokes(xmlFile):
+    '''Gets the stroke count of every Kanji of a KANJIDIC (see parseKANJIDIC.getMisc)
+    xmlFile - the file location for the KANJIDIC dataset
+
+    returns a dictionary of {Kanji: stroke count}
+    '''
+    strokes = {}
+    for kanjiItem in parseKANJIDIC.parseCharacter(xmlFile, True):
+        if kanjiItem[6] is not None:
+            strokes[kanjiItem[0]] = int(kanjiItem[6])
+    return strokes
+
+def iterBits(bits):
+    '''Iterates over the set bits of a bitset
+    bits - the bitset as an int
+
+    yields the position of each set bit, lowest first
+    '''
+    for index, byte in enumerate(bits.to_bytes((bits.bit_length() + 7) // 8, 'little')):
+        if byte:
+            for bit in BYTE_BITS[byte]:
+                yield index * 8 + bit
+
+
+class RadicalSearch:
+    '''Multi-radical Kanji search over precomputed bitsets
+    '''
+
+    def __init__(self, radicals, strokes=None):
+        '''Builds the bitsets
+        radicals - an iterable of (radical, strokes, Kanji string), as yielded by parseRADKFILE.parseRadK
+        strokes - a dictionary of {Kanji: stroke count} (ex. from getStrokes) (default the count is unknown)
+        '''
+        strokes = strokes or {}
+        radicals = list(radicals)
+
+        kanjiSet = set()
+        for _, _, kanji in radicals:
+            kanjiSet.update(kanji)
+        unknown = max(strokes.values(), default=0) + 1
+        self.kanji = sorted(kanjiSet, key=lambda kanji: (strokes.get(kanji, unknown), kanji))
+        self.strokes = [strokes.get(kanji) for kanji in self.kanji]
+        number = {kanji: i for i, kanji in enumerate(self.kanji)}
+
+        self.radicalStrokes = {}
+        self.radicalBits = {}
+        for radical, radicalStrokes, kanji in radicals:
+            self.radicalStrokes[radical] = int(radicalStrokes)
+            bits = 0
+            for character in kanji:
+                bits |= 1 << number[character]
+            self.radicalBits[radical] = bits
+
+        # strokeStart[n] is the first Kanji with at least n strokes, and the last item is where the unknown counts start
+        self.strokeStart = []
+        position = 0
+        for count in range(unknown + 1):
+            while position < len(self.kanji) and self.strokes[position] is not None and self.strokes[position] < count:
+                position += 1
+            self.strokeStart.append(position)
+        self.allBits = (1 << len(self.kanji)) - 1
+
+    @classmethod
+    def fromFiles(cls, radkFile, kanjiFile=None):
+        '''Builds the search from a RADKFILE and optionally the stroke counts of a KANJIDIC
+        radkFile - file location for the RADK dataset
+        kanjiFile - the file location for the KANJIDIC dataset (default no stroke counts)
+
+        returns the RadicalSearch
+        '''
+        strokes = getStrokes(kanjiFile) if kanjiFile is not None else None
+        return cls(parseRADKFILE.parseRadK(radkFile), strokes)
+
+    def strokeMask(self, minStrokes=None, maxStrokes=None):
+        '''Gets the bitset of the Kanji within a stroke range
+        minStrokes - the fewest strokes allowed (default no minimum)
+        maxStrokes - the most strokes allowed (default no maximum)
+
+        returns the bitset as an int (Kanji with unknown counts are only included without a range)
+        '''
+        if minStrokes is None and maxStrokes is None:
+            return self.allBits
+        last = len(self.strokeStart) - 1
+        lo = self.strokeStart[min(max(minStrokes or 0, 0), last)]
+        hi = self.strokeStart[last] if maxStrokes is None else self.strokeStart[min(max(maxStrokes + 1, 0), last)]
+        if hi <= lo:
+            return 0
+        return ((1 << hi) - 1) ^ ((1 << lo) - 1)
+
+    def searchBits(self, radicals, minStrokes=None, maxStrokes=None):
+        '''Gets the bitset of the Kanji using every radical
+        radicals - a list of radicals
+        minStrokes - the fewest strokes allowed (default no minimum)
+        maxStrokes - the most strokes allowed (default no maximum)
+
+        returns the bitset as an int
+        '''
+        bits = self.strokeMask(minStrokes, maxStrokes)
+        for radical in radicals:
+            bits &= self.radicalBits.get(radical, 0)
+            if not bits:
+                break
+        return bits
+
+    def search(self, radicals, minStrokes=None, maxStrokes=None):
+        '''Finds the Kanji using every radical
+        radicals - a list of radicals
+        minStrokes - the fewest strokes allowed (default no minimum)
+        maxStrokes - the most strokes allowed (default no maximum)
+
+        returns a list of Kanji sorted by stroke count
+        '''
+        return [self.kanji[i] for i in iterBits(self.searchBits(radicals, minStrokes, maxStrokes))]
+
+    def nextRadicals(self, bits, selected=()):
+        '''Finds the radicals that still narrow down a search
+        bits - the bitset of the current results
+        selected - the radicals already selected, which are left out
+
+        returns a list of radicals sorted by stroke count
+        radicals used by none of the results, or by every one of them, would not narrow the search and are left out
+        '''
+        return sorted((radical for radical, radicalBits in self.radicalBits.items()
+                       if radical not in selected and radicalBits & bits not in (0, bits)),
+                      key=lambda radical: (self.radicalStrokes[radical], radical))
+
+    def query(self, radicals, minStrokes=None, maxStrokes=None):
+        '''Finds the Kanji using every radical, and the radicals still valid for narrowing the search
+        radicals - a list of radicals
+        minStrokes - the fewest strokes allowed (default no minimum)
+        maxStrokes - the most strokes allowed (default no maximum)
+
+        returns a list of Kanji sorted by stroke count
+        returns a list of the other radicals used by some but not all of those Kanji
+        '''
+        bits = self.searchBits(radicals, minStrokes, maxStrokes)
+        return [self.kanji[i] for i in iterBits(bits)], self.nextRadicals(bits, set(radicals))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,439 @@
+import multiprocessing
+import os
+from array import array
+from itertools import islice
+
+try:
+    from . import autocompleteJMdict, deinflectJMdict, parseJMdict, util_parse
+except ImportError:
+    import autocompleteJMdict
+    import deinflectJMdict
+    import parseJMdict
+    import util_parse
+
+
+''' Structure
+Every keb and reb is compiled into a double-array trie:
+    codes # {character: label}, the most frequent characters get the smallest labels, and 0 ends a word
+    base  # The child of node s by label c is t = base[s] + c, and it is a child only when check[t] == s
+    check # The parent of each node, or -1 for a free slot
+The child by label 0 is the end of a word, and its base is -(word id + 1).
+    costs   # The cost of each word, from util_parse.priorityRank so common words are preferred
+    offsets # Word i belongs to the entries seqs[offsets[i]:offsets[i+1]]
+    seqs
+Word ids are the positions of the words in sorted order, so the words themselves are not kept.
+
+A sentence is split by a lattice search. Every dictionary word starting at a position is an edge, found by
+walking the trie once, as is the run of unknown characters of the same script (ex. katakana) starting there.
+The cheapest path gives the words (cost mode), or the longest word is taken at each position (longest mode).
+'''
+
+SEGMENTER_VERSION = 1
+
+COST = 'cost'
+LONGEST = 'longest'
+
+# The cost of a word is WORD_COST plus its priorityRank (1-99), so fewer and more common words are preferred
+WORD_COST = 100
+UNKNOWN_COST = 1000
+
+# The number of free slots tried for a node before it is placed at the end of the arrays,
+# as nodes with many children rarely fit in the gaps left once the arrays are full
+SEARCH_LIMIT = 256
+# Nodes with several children search from this many times their largest label before the end of the used slots
+WIDE_WINDOW = 4
+
+
+def main():
+    '''Example function for using the functions in this form
+    '''
+    segmenter = Segmenter.fromFile(os.path.join('data', 'JMdict_e_examp.xml'))
+    for surface, seqs in segmenter.segment('私は毎朝ご飯を食べる'):
+        print(surface, seqs)
+
+def iterWords(xlmFile, depth=0):
+    '''Iterates over every keb and reb of a JMdict, and optionally their conjugated forms
+    xlmFile - the file path (plain, gzip, or zip) for the JMdict file
+    depth - the number of deinflectJMdict rules applied to the verbs and adjectives (default 0 for only the words)
+
+    yields the word, the sequence number of the entry, and the list of record information
+    '''
+    if not depth:
+        yield from autocompleteJMdict.iterWords(xlmFile)
+        return
+
+    for entry in parseJMdict.iterEntries(xlmFile, True, util_parse.EntityTable(xlmFile)):
+        seq = int(parseJMdict.getSeqNum(entry))
+        types = deinflectJMdict.getTypes(pos.text for pos in entry.iter('pos'))
+        words = [parseJMdict.getKEle(k_ele)[::2] for k_ele in entry.findall('k_ele')]
+        words += [parseJMdict.getREle(r_ele)[::4] for r_ele in entry.findall('r_ele')]
+        for word, priList in words:
+            yield word, seq, priList
+            for wordType in deinflectJMdict.splitTypes(types):
+                for form in deinflectJMdict.inflect(word, wordType, depth):
+                    yield form, seq, priList
+
+def charClass(character):
+    '''Gets the script of a character, to group unknown characters
+
+    returns 'katakana', 'latin', or None for characters that stand alone (kanji, hiragana, punctuation)
+    '''
+    if 'ァ' <= character <= 'ヺ' or character == 'ー' or 'ｦ' <= character <= 'ﾟ':
+        return 'katakana'
+    # str.isascii needs python 3.7
+    if character < '\x80' and character.isalnum() or 'Ａ' <= character <= 'ｚ' or '０' <= character <= '９':
+        return 'latin'
+    return None
+
+def unknownEnd(text, start):
+    '''Finds the end of the run of unknown characters starting at a position
+    text - the sentence
+    start - the position of the first character
+
+    returns the position after the run
+    '''
+    kind = charClass(text[start])
+    end = start + 1
+    if kind is not None:
+        while end < len(text) and charClass(text[end]) == kind:
+            end += 1
+    return end
+
+
+class Segmenter:
+    '''Splits unspaced Japanese text into JMdict words, through a double-array trie of every keb and reb
+    '''
+
+    def __init__(self, words=()):
+        '''Builds the trie
+        words - an iterable of (word, seq, priList), as yielded by iterWords
+        '''
+        entries = {}
+        for word, seq, priList in words:
+            if not word:
+                continue
+            rank, seqs = entries.get(word, (99, []))
+            if seq not in seqs:
+                seqs.append(seq)
+            entries[word] = (min(rank, util_parse.priorityRank(priList)), seqs)
+        keys = sorted(entries)
+
+        self.costs = array('H', (WORD_COST + entries[key][0] for key in keys))
+        self.offsets = array('I', [0])
+        self.seqs = array('l')
+        for key in keys:
+            self.seqs.extend(entries[key][1])
+            self.offsets.append(len(self.seqs))
+
+        frequencies = {}
+        for key in keys:
+            for character in key:
+                frequencies[character] = frequencies.get(character, 0) + 1
+        self.codes = {character: label for label, character in enumerate(sorted(frequencies, key=frequencies.get, reverse=True), 1)}
+
+        self.base, self.check = self.build(keys)
+
+    @classmethod
+    def fromFile(cls, xlmFile, depth=0):
+        '''Builds the trie from a JMdict file
+        xlmFile - the file path (plain, gzip, or zip) for the JMdict file
+        depth - the number of deinflectJMdict rules applied to the verbs and adjectives (default 0 for only the words)
+
+        returns the Segmenter
+        '''
+        return cls(iterWords(xlmFile, depth))
+
+    def build(self, keys):
+        '''Places the nodes of the trie of the sorted keys in the double array
+
+        returns the base and check arrays
+        '''
+        codes = self.codes
+        # The free slots are a circular list through slot 0, which holds the root
+        base = [0]
+        check = [0]
+        nextSlot = [0]
+        prevSlot = [0]
+
+        def grow(size):
+            old = len(check)
+            if size <= old:
+                return
+            size = max(size, 2 * old)
+            tail = prevSlot[0]
+            base.extend([0] * (size - old))
+            check.extend([-1] * (size - old))
+            nextSlot.extend(range(old + 1, size + 1))
+            prevSlot.extend(range(old - 1, size - 1))
+            nextSlot[size - 1] = 0
+            prevSlot[old] = tail
+            nextSlot[tail] = old
+            prevSlot[0] = size - 1
+
+        grow(1024)
+        used = 1
+        stack = [(0, 0, len(keys), 0)]
+        while stack:
+            node, lo, hi, depth = stack.pop()
+            if lo >= hi:
+                continue
+
+            # The children of the node, as the ranges of keys sharing the next character
+            labels = []
+            ranges = []
+            i = lo
+            while i < hi:
+                key = keys[i]
+                if len(key) == depth:
+                    labels.append(0)
+                    ranges.append((i, i + 1))
+                    i += 1
+                    continue
+                character = key[depth]
+                j = i + 1
+                while j < hi and len(keys[j]) > depth and keys[j][depth] == character:
+                    j += 1
+                labels.append(codes[character])
+                ranges.append((i, j))
+                i = j
+
+            # Find the first base where every child lands on a free slot, trying only free slots for the first child.
+            # Nodes with several children rarely fit in the filled start of the arrays, so they start near the end
+            first = labels[0]
+            largest = max(labels)
+            position = nextSlot[0]
+            if len(labels) > 1 and used - WIDE_WINDOW * largest > position:
+                position = used - WIDE_WINDOW * largest
+                while check[position] != -1:
+                    position += 1
+            tries = 0
+            while True:
+                if position == 0 or tries > SEARCH_LIMIT:
+                    offset = max(1, used - min(labels))
+                    grow(offset + largest + 1)
+                    break
+                offset = position - first
+                if offset >= 1:
+                    grow(offset + largest + 1)
+                    if all(check[offset + label] == -1 for label in labels):
+                        break
+                    tries += 1
+                position = nextSlot[position]
+
+            used = max(used, offset + largest + 1)
+
+            base[node] = offset
+            for label, (i, j) in zip(labels, ranges):
+                slot = offset + label
+                check[slot] = node
+                nextSlot[prevSlot[slot]] = nextSlot[slot]
+                prevSlot[nextSlot[slot]] = prevSlot[slot]
+                if label == 0:
+                    base[slot] = -(i + 1)
+                else:
+                    stack.append((slot, i, j, depth + 1))
+
+        size = len(check)
+        while size > 1 and check[size - 1] == -1:
+            size -= 1
+        return array('i', base[:size]), array('i', check[:size])
+
+    def __len__(self):
+        return len(self.costs)
+
+    def getSeqs(self, wordId):
+        '''Gets the entries of a word
+
+        returns the tuple of sequence numbers
+        '''
+        return tuple(self.seqs[self.offsets[wordId]:self.offsets[wordId + 1]])
+
+    def encode(self, text):
+        '''Gets the labels of the characters of a text, once for every walk of the trie over it
+        text - the text
+
+        returns the list of labels, where characters in no word get a label that leads nowhere
+        '''
+        codes = self.codes
+        unknown = len(self.check)
+        return [codes.get(character, unknown) for character in text]
+
+    def prefixes(self, labels, start=0):
+        '''Finds every dictionary word starting at a position, with a single walk of the trie
+        labels - the labels of the text, from encode
+        start - the position of the first character (default 0)
+
+        returns a list of (end position, word id), shortest first
+        '''
+        base = self.base
+        check = self.check
+        size = len(check)
+        matches = []
+        node = 0
+        for end in range(start, len(labels)):
+            child = base[node] + labels[end]
+            if child >= size or check[child] != node:
+                break
+            node = child
+            leaf = base[node]
+            if check[leaf] == node:
+                matches.append((end + 1, -base[leaf] - 1))
+        return matches
+
+    def __contains__(self, word):
+        matches = self.prefixes(self.encode(word))
+        return bool(matches) and matches[-1][0] == len(word)
+
+    def segment(self, text, mode=COST):
+        '''Splits a sentence into words
+        text - the sentence (ex. '私は毎朝ご飯を食べる')
+        mode - COST for the cheapest path through the lattice, or LONGEST for the longest word at each position (default COST)
+
+        returns a list of (surface, seqs), where seqs is empty for unknown characters
+        '''
+        if mode == LONGEST:
+            spans = self.longestSpans(text)
+        elif mode == COST:
+            spans = self.cheapestSpans(text)
+        else:
+            raise ValueError("Unknown segmentation mode: {}".format(mode))
+        return [(text[start:end], () if wordId < 0 else self.getSeqs(wordId)) for start, end, wordId in spans]
+
+    def longestSpans(self, text):
+        '''Takes the longest dictionary word at each position, or the run of unknown characters
+
+        returns a list of (start, end, word id), with -1 for unknown characters
+        '''
+        labels = self.encode(text)
+        spans = []
+        start = 0
+        while start < len(text):
+            matches = self.prefixes(labels, start)
+            if matches:
+                end, wordId = matches[-1]
+            else:
+                end, wordId = unknownEnd(text, start), -1
+            spans.append((start, end, wordId))
+            start = end
+        return spans
+
+    def cheapestSpans(self, text):
+        '''Finds the cheapest path through the lattice of dictionary words and unknown runs
+
+        returns a list of (start, end, word id), with -1 for unknown characters
+        '''
+        costs = self.costs
+        labels = self.encode(text)
+        length = len(text)
+        best = [0] + [None] * length
+        back = [None] * (length + 1)
+        for start in range(length):
+            cost = best[start]
+            if cost is None:
+                continue
+            for end, wordId in self.prefixes(labels, start):
+                total = cost + costs[wordId]
+                if best[end] is None or total < best[end]:
+                    best[end] = total
+                    back[end] = (start, wordId)
+            end = unknownEnd(text, start)
+            total = cost + UNKNOWN_COST
+            if best[end] is None or total < best[end]:
+                best[end] = total
+                back[end] = (start, -1)
+
+        spans = []
+        end = length
+        while end > 0:
+            start, wordId = back[end]
+            spans.append((start, end, wordId))
+            end = start
+        spans.reverse()
+        return spans
+
+    def segmentBatch(self, sentences, mode=COST):
+        '''Splits many sentences in this process
+        sentences - an iterable of sentences
+        mode - COST or LONGEST, as in segment (default COST)
+
+        returns a list with the words of each sentence
+        '''
+        return [self.segment(text, mode) for text in sentences]
+
+    # Saving and Loading
+    def save(self, fileName):
+        '''Saves the trie
+        fileName - the file location for the trie
+        '''
+        header = {'version': SEGMENTER_VERSION, 'count': len(self.costs)}
+        body = {
+            'characters': ''.join(sorted(self.codes, key=self.codes.get)), 'base': self.base.tobytes(),
+            'check': self.check.tobytes(), 'costs': self.costs.tobytes(), 'offsets': self.offsets.tobytes(),
+            'seqs': self.seqs.tobytes()
+        }
+
+        util_parse.writeVersioned(fileName, header, body)
+
+    @classmethod
+    def load(cls, fileName):
+        '''Loads a trie saved by save
+        fileName - the file location for the trie
+
+        returns the Segmenter
+        '''
+        _, body = util_parse.readVersioned(fileName, SEGMENTER_VERSION)
+
+        segmenter = cls()
+        segmenter.codes = {character: label for label, character in enumerate(body['characters'], 1)}
+        for name, typecode in [('base', 'i'), ('check', 'i'), ('costs', 'H'), ('offsets', 'I'), ('seqs', 'l')]:
+            values = array(typecode)
+            values.frombytes(body[name])
+            setattr(segmenter, name, values)
+        return segmenter
+
+def segmentCorpus(fileName, sentences, processes=None, mode=COST, chunkSize=1000, ordered=True):
+    '''Splits a corpus of sentences using a pool of processes
+    fileName - the file location of a trie saved by Segmenter.save, loaded once by each process
+    sentences - an iterable of sentences, read lazily in chunks
+    processes - the number of worker processes (default the number of CPUs)
+    mode - COST or LONGEST, as in Segmenter.segment (default COST)
+    chunkSize - the number of sentences sent to a process at a time (default 1000)
+    ordered - boolean to yield the sentences in order (True) or as soon as each chunk is finished (False) (default True)
+
+    yields the list of (surface, seqs) of each sentence, with the sentence itself if ordered is False
+    '''
+    if processes is None:
+        processes = os.cpu_count() or 1
+
+    sentences = iter(sentences)
+    chunks = iter(lambda: list(islice(sentences, chunkSize)), [])
+    with multiprocessing.Pool(processes, _initSegmentWorker, (fileName, mode)) as pool:
+        if ordered:
+            for chunk in pool.imap(_segmentChunk, chunks):
+                for sentence, words in chunk:
+                    yield words
+        else:
+            for chunk in pool.imap_unordered(_segmentChunk, chunks):
+                yield from chunk
+
+
+_segmentWorker = {}
+
+def _initSegmentWorker(fileName, mode):
+    '''Loads the trie shared by every chunk of a worker process
+    '''
+    _segmentWorker.update(segmenter=Segmenter.load(fileName), mode=mode)
+
+def _segmentChunk(chunk):
+    '''Splits a chunk of sentences in a worker process
+    chunk - the list of sentences
+
+    returns a list of (sentence, words)
+    '''
+    segmenter = _segmentWorker['segmenter']
+    mode = _segmentWorker['mode']
+    return [(text, segmenter.segment(text, mode)) for text in chunk]
+
+
+if __name__ == '__main__':
+    main()
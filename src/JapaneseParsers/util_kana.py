@@ -0,0 +1,194 @@
+import unicodedata
+
+
+''' Normalization
+Readings are compared as hiragana:
+    toHiragana # Folds katakana (full and half width) into hiragana
+    romajiToKana # Converts Hepburn, Kunrei, and wapuro romaji into hiragana
+    expandLongVowels # Replaces the long vowel mark with the vowel it lengthens (ex. らーめん to らあめん)
+    foldLongVowels # Drops every lengthening vowel (ex. とうきょう and ときょ both give ときょ)
+normalizeReading applies the first three, so typed input can be looked up against the reb of an entry.
+'''
+
+LONG_VOWEL = 'ー'
+SMALL_TSU = 'っ'
+
+# The hiragana of each vowel, so the long vowel mark and lengthening vowels can be resolved
+VOWEL_ROWS = [('あ', 'ぁあかがさざただなはばぱまゃやらゎわ'), ('い', 'ぃいきぎしじちぢにひびぴみりゐ'),
+              ('う', 'ぅうくぐすずっつづぬふぶぷむゅゆるゔ'), ('え', 'ぇえけげせぜてでねへべぺめれゑ'),
+              ('お', 'ぉおこごそぞとどのほぼぽもょよろを')]
+
+# Romaji to hiragana, matched longest first (the youon are added from YOUON at the end of the module)
+ROMAJI = {
+    'a': 'あ', 'i': 'い', 'u': 'う', 'e': 'え', 'o': 'お',
+    'ka': 'か', 'ki': 'き', 'ku': 'く', 'ke': 'け', 'ko': 'こ',
+    'ga': 'が', 'gi': 'ぎ', 'gu': 'ぐ', 'ge': 'げ', 'go': 'ご',
+    'sa': 'さ', 'si': 'し', 'shi': 'し', 'su': 'す', 'se': 'せ', 'so': 'そ',
+    'za': 'ざ', 'zi': 'じ', 'ji': 'じ', 'zu': 'ず', 'ze': 'ぜ', 'zo': 'ぞ',
+    'ta': 'た', 'ti': 'ち', 'chi': 'ち', 'tu': 'つ', 'tsu': 'つ', 'te': 'て', 'to': 'と',
+    'da': 'だ', 'di': 'ぢ', 'du': 'づ', 'dzu': 'づ', 'de': 'で', 'do': 'ど',
+    'na': 'な', 'ni': 'に', 'nu': 'ぬ', 'ne': 'ね', 'no': 'の',
+    'ha': 'は', 'hi': 'ひ', 'hu': 'ふ', 'fu': 'ふ', 'he': 'へ', 'ho': 'ほ',
+    'ba': 'ば', 'bi': 'び', 'bu': 'ぶ', 'be': 'べ', 'bo': 'ぼ',
+    'pa': 'ぱ', 'pi': 'ぴ', 'pu': 'ぷ', 'pe': 'ぺ', 'po': 'ぽ',
+    'ma': 'ま', 'mi': 'み', 'mu': 'む', 'me': 'め', 'mo': 'も',
+    'ya': 'や', 'yu': 'ゆ', 'yo': 'よ',
+    'ra': 'ら', 'ri': 'り', 'ru': 'る', 're': 'れ', 'ro': 'ろ',
+    'la': 'ら', 'li': 'り', 'lu': 'る', 'le': 'れ', 'lo': 'ろ',
+    'wa': 'わ', 'wi': 'うぃ', 'we': 'うぇ', 'wo': 'を',
+    'n\'': 'ん',
+    'va': 'ゔぁ', 'vi': 'ゔぃ', 'vu': 'ゔ', 've': 'ゔぇ', 'vo': 'ゔぉ',
+    'fa': 'ふぁ', 'fi': 'ふぃ', 'fe': 'ふぇ', 'fo': 'ふぉ',
+    'je': 'じぇ', 'she': 'しぇ', 'che': 'ちぇ', 'tsa': 'つぁ',
+    'thi': 'てぃ', 'dhi': 'でぃ', 'twu': 'とぅ', 'dwu': 'どぅ',
+    'xa': 'ぁ', 'xi': 'ぃ', 'xu': 'ぅ', 'xe': 'ぇ', 'xo': 'ぉ', 'xya': 'ゃ', 'xyu': 'ゅ', 'xyo': 'ょ',
+    'xtu': 'っ', 'xtsu': 'っ', 'xwa': 'ゎ', 'xka': 'ゕ', 'xke': 'ゖ',
+    'ltu': 'っ', 'ltsu': 'っ', 'lya': 'ゃ', 'lyu': 'ゅ', 'lyo': 'ょ',
+    '-': LONG_VOWEL,
+}
+
+# Vowels with a macron or circumflex, written out as two vowels
+MACRONS = str.maketrans({'ā': 'aa', 'ī': 'ii', 'ū': 'uu', 'ē': 'ee', 'ō': 'ou',
+                         'â': 'aa', 'î': 'ii', 'û': 'uu', 'ê': 'ee', 'ô': 'ou'})
+
+# The youon (ex. kya) are the i kana of a consonant and a small ya, yu, or yo:
+# (romaji start, kana) for the consonants written with a y, then those written without one (ex. sha)
+YOUON = [('ky', 'き'), ('gy', 'ぎ'), ('ny', 'に'), ('hy', 'ひ'), ('by', 'び'), ('py', 'ぴ'), ('my', 'み'),
+         ('ry', 'り'), ('sy', 'し'), ('zy', 'じ'), ('ty', 'ち'), ('dy', 'ぢ'), ('cy', 'ち'), ('ly', 'り'),
+         ('sh', 'し'), ('ch', 'ち'), ('j', 'じ')]
+SMALL_Y = [('a', 'ゃ'), ('u', 'ゅ'), ('o', 'ょ')]
+
+# Consonants that are doubled with a small tsu (ex. kk in kitte)
+DOUBLING = frozenset('bcdfghjkmpqrstvwxyz')
+
+
+def main():
+    '''Example function for using the functions in this form
+    '''
+    for text in ['タベル', 'taberu', 'ラーメン', 'kitte', 'shinbun', 'toukyou', 'tōkyō']:
+        print(text, normalizeReading(text), foldLongVowels(normalizeReading(text)))
+
+def getVowels():
+    '''Builds the vowel of every hiragana from VOWEL_ROWS
+
+    returns the dictionary of {kana: vowel}
+    '''
+    return {kana: vowel for vowel, row in VOWEL_ROWS for kana in row}
+
+def getYouon():
+    '''Builds the romaji of every youon from YOUON
+
+    returns the dictionary of {romaji: kana}
+    '''
+    return {start + vowel: kana + small for start, kana in YOUON for vowel, small in SMALL_Y}
+
+def toHiragana(text):
+    '''Folds katakana into hiragana, including half width katakana
+    text - the text
+
+    returns the text with hiragana in place of katakana (other characters are kept)
+    '''
+    text = unicodedata.normalize('NFKC', text)
+    return ''.join(chr(ord(character) - 0x60) if 'ァ' <= character <= 'ヶ' else character for character in text)
+
+def romajiToKana(text):
+    '''Converts romaji into hiragana
+    text - the lowercase romaji (kana in the text is kept as is)
+
+    returns the hiragana
+    '''
+    text = text.translate(MACRONS)
+    result = []
+    position = 0
+    while position < len(text):
+        character = text[position]
+        following = text[position + 1:position + 2]
+
+        # A doubled consonant is a small tsu (ex. kitte), as is the t of tch (ex. matcha)
+        if character in DOUBLING and (following == character or (character == 't' and following == 'c')):
+            result.append(SMALL_TSU)
+            position += 1
+            continue
+
+        # n before a consonant or at the end, and m before b, m, or p (ex. shimbun)
+        if character == 'n' and (not following or following not in "aiueoy'"):
+            result.append('ん')
+            # nn is also typed for ん, unless the second n starts the next kana (ex. konnichiwa)
+            after = text[position + 2:position + 3]
+            position += 2 if following == 'n' and (not after or after not in 'aiueoy') else 1
+            continue
+        if character == 'm' and following and following in 'bmp':
+            result.append('ん')
+            position += 1
+            continue
+
+        for length in range(LONGEST_ROMAJI, 0, -1):
+            kana = ROMAJI.get(text[position:position + length])
+            if kana is not None:
+                result.append(kana)
+                position += length
+                break
+        else:
+            result.append(character)
+            position += 1
+    return ''.join(result)
+
+def expandLongVowels(text):
+    '''Replaces each long vowel mark with the vowel of the kana before it
+    text - the hiragana
+
+    returns the hiragana without long vowel marks (marks with no kana before them are kept)
+    '''
+    if LONG_VOWEL not in text:
+        return text
+    result = []
+    for character in text:
+        if character == LONG_VOWEL and result and result[-1] in VOWELS:
+            character = VOWELS[result[-1]]
+        result.append(character)
+    return ''.join(result)
+
+def foldLongVowels(text):
+    '''Drops the vowels that only lengthen the kana before them, so long and short vowels compare equal
+    text - the hiragana
+
+    returns the folded hiragana (ex. とうきょう to ときょ)
+    '''
+    result = []
+    for character in text:
+        if result:
+            vowel = VOWELS.get(result[-1])
+            if character == LONG_VOWEL or (vowel is not None and (
+                    character == vowel or (character == 'う' and vowel == 'お') or (character == 'い' and vowel == 'え'))):
+                continue
+        result.append(character)
+    return ''.join(result)
+
+def isRomaji(text):
+    '''Determines if text holds latin letters that should be converted to kana
+    text - the text
+
+    returns True if any character is a latin letter
+    '''
+    return any('a' <= character <= 'z' or character in 'āīūēōâîûêô' for character in text)
+
+def normalizeReading(text):
+    '''Normalizes a reading typed as katakana, hiragana, or romaji into hiragana
+    text - the reading
+
+    returns the hiragana with long vowel marks expanded
+    '''
+    text = toHiragana(text).lower().strip()
+    if isRomaji(text):
+        text = romajiToKana(text)
+    return expandLongVowels(text)
+
+
+VOWELS = getVowels()
+# A romaji written out above is kept over a youon
+ROMAJI = {**getYouon(), **ROMAJI}
+LONGEST_ROMAJI = max(len(romaji) for romaji in ROMAJI)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,491 @@
+import contextlib
+import gzip
+import hashlib
+import io
+import mmap
+import os
+import pickle
+import re
+import sys
+import xml.etree.ElementTree as ET
+import zipfile
+from collections.abc import Mapping
+
+
+GZIP_MAGIC = b'\x1f\x8b'
+ZIP_MAGIC = b'PK\x03\x04'
+
+ENTITY_DECLARATION = re.compile(rb'<!ENTITY\s+([\w.-]+)\s+"([^"]*)"\s*>')
+
+
 def deleteFromDictionary(dictionary, keys):
     '''Removes entries from a dictionary.
-    
+
     :param dictionary: the dictionary object
     :param keys: a list of key to remove from the dictionary
     '''
-    print(dictionary)
     for key in keys:
-        print(key)
         del dictionary[key]
+
+@contextlib.contextmanager
+def openSource(source, member=None, encoding=None, codes=None):
+    '''Opens a dataset, decompressing gzip and zip archives while it is read
+    source - the file path (plain, gzip, or zip) or an open file object
+    member - the file to read inside a zip archive (default the only file in the archive)
+    encoding - the encoding to read text with (default None, which reads bytes)
+    codes - an EntityTable to keep the DTD entities as their codes, which is given the original DTD (default None)
+
+    yields the file object to read from
+    archives are detected from their first bytes, and file objects given as the source are left open
+    '''
+    with contextlib.ExitStack() as stack:
+        if hasattr(source, 'read'):
+            file = source
+        else:
+            file = stack.enter_context(open(source, 'rb'))
+
+        if isinstance(file, io.TextIOBase):
+            yield file
+            return
+
+        magic = peekBytes(file, len(ZIP_MAGIC))
+        if magic.startswith(GZIP_MAGIC):
+            file = stack.enter_context(gzip.GzipFile(fileobj=file, mode='rb'))
+        elif magic == ZIP_MAGIC:
+            archive = stack.enter_context(zipfile.ZipFile(file))
+            file = stack.enter_context(archive.open(getMember(archive, member)))
+
+        if codes is not None:
+            file = io.BufferedReader(BlockReader(iterCodeBlocks(file, codes)))
+
+        if encoding is not None:
+            file = io.TextIOWrapper(file, encoding=encoding)
+            # Detach instead of closing so the underlying file is only closed by its owner
+            stack.callback(file.detach)
+        yield file
+
+def peekBytes(file, size):
+    '''Reads the first bytes of a binary file object without consuming them
+    file - the file object
+    size - the number of bytes wanted
+
+    returns the bytes (empty if the file can neither peek nor seek)
+    '''
+    if hasattr(file, 'peek'):
+        return file.peek(size)[:size]
+    if file.seekable():
+        position = file.tell()
+        data = file.read(size)
+        file.seek(position)
+        return data
+    return b''
+
+def getMember(archive, member=None):
+    '''Picks the file to read from a zip archive
+    archive - the zipfile.ZipFile
+    member - the name of the file (default the only file in the archive)
+
+    returns the name of the file
+    '''
+    if member is not None:
+        return member
+    names = [name for name in archive.namelist() if not name.endswith('/')]
+    if len(names) != 1:
+        raise ValueError("The zip archive holds {} files, so the member must be given".format(len(names)))
+    return names[0]
+
+def isPlainFile(source):
+    '''Determines if a dataset is an uncompressed file on disk
+    source - the file path or file object
+
+    returns True for the path of an uncompressed file, False for archives and file objects
+    '''
+    if hasattr(source, 'read'):
+        return False
+    with open(source, 'rb') as file:
+        magic = file.read(len(ZIP_MAGIC))
+    return not (magic.startswith(GZIP_MAGIC) or magic == ZIP_MAGIC)
+
+def parseTree(xmlFile, codes=None):
+    '''Loads the whole tree of an xml
+    xmlFile - the file path (plain, gzip, or zip) or file object for the xml file
+    codes - an EntityTable to keep the DTD entities as their codes (default None, which expands them)
+
+    returns the root element
+    '''
+    with openSource(xmlFile, codes=codes) as source:
+        return ET.parse(source).getroot()
+
+def iterElements(xmlFile, tag, codes=None):
+    '''Incrementally iterates over the elements of an xml without loading the whole tree
+    xmlFile - the file path (plain, gzip, or zip) or file object for the xml file
+    tag - the tag of the elements to iterate over
+    codes - an EntityTable to keep the DTD entities as their codes (default None, which expands them)
+
+    yields each element as soon as it is closed
+    the element is cleared once the next element is requested, so it should not be kept
+    '''
+    with openSource(xmlFile, codes=codes) as source:
+        context = ET.iterparse(source, events=('start', 'end'))
+        _, root = next(context)
+        for event, elem in context:
+            if event == 'end' and elem.tag == tag:
+                yield elem
+                # Release the processed element and drop it from the root
+                elem.clear()
+                root.clear()
+
+def splitElementRanges(xmlFile, rootTag, tag, parts):
+    '''Splits an xml file into byte ranges that each hold whole elements
+    xmlFile - the file path for the xml file
+    rootTag - the tag of the root element (ex. 'JMdict')
+    tag - the tag of the elements to split between (ex. 'entry'), which must not have attributes
+    parts - the number of ranges wanted
+
+    returns the header of the file (everything up to and including the root start tag)
+    returns a list of (start, end) byte ranges, in file order
+    '''
+    openTag = '<{}>'.format(tag).encode()
+    with open(xmlFile, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        rootStart = re.compile('<{}[\\s>]'.format(rootTag).encode()).search(data).start()
+        rootEnd = data.find(b'>', rootStart) + 1
+        header = data[:rootEnd]
+
+        first = data.find(openTag, rootEnd)
+        last = data.rfind('</{}>'.format(rootTag).encode())
+        if first == -1:
+            return header, []
+
+        bounds = [first]
+        step = max((last - first) // parts, 1)
+        for part in range(1, parts):
+            position = data.find(openTag, max(first + part * step, bounds[-1] + 1), last)
+            if position == -1:
+                break
+            bounds.append(position)
+        bounds.append(last)
+
+    return header, list(zip(bounds[:-1], bounds[1:]))
+
+def parseElementRange(xmlFile, header, start, end, rootTag):
+    '''Parses a byte range of an xml file made by splitElementRanges
+    xmlFile - the file path for the xml file
+    header - the header of the file, so the DTD entities are known
+    start - the first byte of the range
+    end - the byte after the range
+    rootTag - the tag of the root element
+
+    returns the root element holding the elements of the range
+    '''
+    with open(xmlFile, 'rb') as file:
+        file.seek(start)
+        chunk = file.read(end - start)
+
+    parser = ET.XMLParser()
+    parser.feed(header)
+    parser.feed(chunk)
+    parser.feed('</{}>'.format(rootTag).encode())
+    return parser.close()
+
+def iterRawElements(xmlFile, rootTag, tag, blockSize=2**20):
+    '''Splits an xml into the bytes of its elements without parsing them
+    xmlFile - the file path (plain, gzip, or zip) or file object for the xml file
+    rootTag - the tag of the root element (ex. 'JMdict')
+    tag - the tag of the elements to split (ex. 'entry'), which must not have attributes or nest
+    blockSize - the number of bytes read at a time (default 1 MiB)
+
+    yields the header of the file (everything up to and including the root start tag)
+    yields the bytes of the element, from its start tag to its end tag
+    '''
+    openTag = '<{}>'.format(tag).encode()
+    closeTag = '</{}>'.format(tag).encode()
+    rootStart = re.compile('<{}[\\s>]'.format(rootTag).encode())
+
+    with openSource(xmlFile) as source:
+        buffer = b''
+        header = None
+        while header is None:
+            block = source.read(blockSize)
+            if not block:
+                raise ValueError("No <{}> root element was found".format(rootTag))
+            buffer += block
+            match = rootStart.search(buffer)
+            rootEnd = -1 if match is None else buffer.find(b'>', match.start())
+            if rootEnd != -1:
+                header = buffer[:rootEnd + 1]
+                buffer = buffer[rootEnd + 1:]
+
+        position = 0
+        while True:
+            start = buffer.find(openTag, position)
+            end = -1 if start == -1 else buffer.find(closeTag, start)
+            if end != -1:
+                end += len(closeTag)
+                yield header, buffer[start:end]
+                position = end
+                continue
+
+            block = source.read(blockSize)
+            if not block:
+                return
+            # Keep the unfinished element, or the bytes that could be the start of a tag
+            keep = start if start != -1 else max(position, len(buffer) - len(openTag) + 1)
+            buffer = buffer[keep:] + block
+            position = 0
+
+def makeElementParser(header):
+    '''Creates a parser for the elements split by iterRawElements
+    header - the header of the file, so the DTD entities are known
+
+    returns a function taking the bytes of an element and returning the parsed element
+    the DTD is only parsed once, so parsing a few elements of a large file is cheap
+    '''
+    parser = ET.XMLPullParser(events=('start', 'end'))
+    parser.feed(header)
+    _, root = next(parser.read_events())
+
+    def parse(raw):
+        parser.feed(raw)
+        elem = None
+        for _, elem in parser.read_events():
+            pass
+        # The element is complete, so drop it from the root to keep memory constant
+        root.clear()
+        return elem
+
+    return parse
+
+def getEntities(header):
+    '''Reads the entities declared in the DTD of an xml
+    header - the header of the file
+
+    returns a dictionary of {name: value} as bytes
+    '''
+    return dict(ENTITY_DECLARATION.findall(header))
+
+# Entity codes
+def keepEntityCodes(header):
+    '''Rewrites the entity declarations of a DTD so every entity expands to its own name (ex. &v5r; to 'v5r')
+    header - the header of the file
+
+    returns the rewritten header
+    '''
+    return ENTITY_DECLARATION.sub(rb'<!ENTITY \1 "\1">', header)
+
+def readDoctype(file, blockSize=2**20):
+    '''Reads the start of an xml up to the end of its DTD
+    file - the binary file object, positioned at the start
+    blockSize - the number of bytes read at a time (default 1 MiB)
+
+    returns the header up to the end of the DTD (empty if there is none) and the bytes read after it
+    '''
+    buffer = file.read(blockSize)
+    if b'<!DOCTYPE' not in buffer:
+        return b'', buffer
+
+    while True:
+        end = buffer.find(b']>')
+        if end != -1:
+            return buffer[:end + 2], buffer[end + 2:]
+        block = file.read(blockSize)
+        if not block:
+            return buffer, b''
+        buffer += block
+
+def iterCodeBlocks(file, codes, blockSize=2**20):
+    '''Reads an xml with the entity declarations of its DTD rewritten by keepEntityCodes
+    file - the binary file object
+    codes - the EntityTable given the original DTD
+    blockSize - the number of bytes read at a time (default 1 MiB)
+
+    yields the bytes of the rewritten xml
+    '''
+    header, rest = readDoctype(file, blockSize)
+    codes.header = header
+    yield keepEntityCodes(header)
+    yield rest
+    yield from iter(lambda: file.read(blockSize), b'')
+
+
+class BlockReader(io.RawIOBase):
+    '''Reads an iterator of bytes as a binary file
+    '''
+
+    def __init__(self, blocks, onClose=None):
+        '''Creates the reader
+        blocks - an iterator of bytes
+        onClose - function called when the reader is closed (default None)
+        '''
+        super().__init__()
+        self.blocks = blocks
+        self.onClose = onClose
+        self.pending = memoryview(b'')
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self.pending:
+            block = next(self.blocks, None)
+            if block is None:
+                return 0
+            # A view so handing out the block a piece at a time does not copy the rest of it
+            self.pending = memoryview(block)
+        size = min(len(buffer), len(self.pending))
+        buffer[:size] = self.pending[:size]
+        self.pending = self.pending[size:]
+        return size
+
+    def close(self):
+        if not self.closed and self.onClose is not None:
+            self.onClose()
+        super().close()
+
+
+class EntityTable(Mapping):
+    '''The descriptions of the DTD entities of an xml, keyed by their code (ex. 'v5r')
+
+    The DTD is only decoded on the first lookup, and the descriptions are interned
+    '''
+
+    def __init__(self, xmlFile=None, header=None):
+        '''Creates the table
+        xmlFile - the file path (plain, gzip, or zip) to read the DTD from when it is first needed (optional)
+        header - the DTD, when it was already read (optional)
+        '''
+        self.xmlFile = xmlFile
+        self.header = header
+        self.table = None
+        self.matches = {}
+
+    def getTable(self):
+        '''Gets the dictionary of {code: description}, decoding the DTD on first use
+        '''
+        if self.table is None:
+            if self.header is None:
+                if self.xmlFile is None:
+                    raise ValueError("The DTD has not been read yet")
+                with openSource(self.xmlFile) as source:
+                    self.header = readDoctype(source)[0]
+            self.table = {sys.intern(code.decode('utf-8')): sys.intern(description.decode('utf-8'))
+                          for code, description in getEntities(self.header).items()}
+        return self.table
+
+    def __getitem__(self, code):
+        return self.getTable()[code]
+
+    def __iter__(self):
+        return iter(self.getTable())
+
+    def __len__(self):
+        return len(self.getTable())
+
+    def describe(self, codes):
+        '''Expands a list of codes into their descriptions
+        codes - the list of codes (unknown codes are kept as is)
+
+        returns the list of descriptions
+        '''
+        table = self.getTable()
+        return [table.get(code, code) for code in codes]
+
+    def matching(self, text):
+        '''Finds the codes whose description contains a text
+        text - the text to search for (ex. 'archaic')
+
+        returns the frozenset of codes, which is cached
+        '''
+        codes = self.matches.get(text)
+        if codes is None:
+            codes = self.matches[text] = frozenset(code for code, description in self.getTable().items()
+                                                   if text in description)
+        return codes
+
+def deepSizeOf(obj):
+    '''Estimates the memory held by an object and everything it references
+    obj - the object (containers, __slots__ objects, and mappings are followed)
+
+    returns the number of bytes, counting shared objects once
+    '''
+    seen = set()
+    total = 0
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+
+        if isinstance(item, (str, bytes, int, float, bool)) or item is None:
+            continue
+        if isinstance(item, Mapping):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+        else:
+            for slot in getattr(type(item), '__slots__', ()):
+                if hasattr(item, slot):
+                    stack.append(getattr(item, slot))
+            if hasattr(item, '__dict__'):
+                stack.append(item.__dict__)
+    return total
+
+def hashFile(fileName, blockSize=2**20):
+    '''Computes the content hash of a file
+    fileName - the file location
+    blockSize - the number of bytes read at a time (default 1 MiB)
+
+    returns the sha256 hex digest of the file
+    '''
+    digest = hashlib.sha256()
+    with open(fileName, 'rb') as file:
+        for block in iter(lambda: file.read(blockSize), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def writeVersioned(fileName, header, body):
+    '''Saves a header and a body as two pickles, replacing the file only once both are written
+    fileName - the file location
+    header - a small dictionary with the 'version' of the format, readable without loading the body
+    body - the data
+    '''
+    # Write to a temporary file first so an interrupted run keeps the previous file
+    tempName = fileName + '.tmp'
+    with open(tempName, 'wb') as file:
+        pickle.dump(header, file, protocol=pickle.HIGHEST_PROTOCOL)
+        pickle.dump(body, file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tempName, fileName)
+
+def readVersioned(fileName, version):
+    '''Loads a file saved by writeVersioned
+    fileName - the file location
+    version - the version of the format the caller reads
+
+    returns the header and the body
+    raises ValueError if the file was saved with another version
+    '''
+    with open(fileName, 'rb') as file:
+        header = pickle.load(file)
+        if header.get('version') != version:
+            raise ValueError("{} has version {}, expected {}".format(fileName, header.get('version'), version))
+        return header, pickle.load(file)
+
+def priorityRank(priList):
+    '''Ranks how common a word is from its ke_pri/re_pri record information
+    priList - the list of record information (ex. ['ichi1', 'news1', 'nf10'])
+
+    returns the rank, lower is more common
+        nfxx gives xx (1-48), other first lists (news1, ichi1, spec1, gai1) give 49,
+        second lists give 60, and no record information gives 99
+    '''
+    rank = 99
+    for pri in priList:
+        if pri.startswith('nf'):
+            rank = min(rank, int(pri[2:]))
+        elif pri.endswith('1'):
+            rank = min(rank, 49)
+        elif pri.endswith('2'):
+            rank = min(rank, 60)
+    return rank
@@ -1,8 +1,79 @@
+import gzip
+import hashlib
+import io
+import json
+import os
+import re
+import threading
 import unittest
-from os import mkdir
+import zipfile
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from os import mkdir, path
 from shutil import rmtree
+from socketserver import ThreadingMixIn
+from tempfile import mkdtemp
+from unittest import mock
 
-from src.JapaneseDownload.download import loadJMdict, loadKANJIDIC, loadRadicals
+from src.JapaneseDownload import download
+from src.JapaneseDownload.download import loadAll, loadDataset, loadJMdict, loadKANJIDIC, loadRadicals
+
+
+SAMPLES = path.join(path.dirname(__file__), 'samples')
+
+
+class RangeHandler(BaseHTTPRequestHandler):
+    '''Serves in-memory files with support for Range and conditional requests
+    '''
+    files = {}
+    requests = []
+    conditional = True
+    lastModified = 'Thu, 17 Jun 2021 00:00:00 GMT'
+
+    def do_GET(self):
+        data = self.files.get(self.path)
+        if data is None:
+            self.send_error(404)
+            return
+
+        rangeHeader = self.headers.get('Range')
+        self.requests.append((self.path, rangeHeader))
+        etag = '"{}"'.format(hashlib.sha1(data).hexdigest())
+        if self.conditional and self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+
+        # A Range with an If-Range that does not match the file gets the whole file
+        ifRange = self.headers.get('If-Range')
+        if rangeHeader and ifRange is not None and ifRange not in (etag, self.lastModified):
+            rangeHeader = None
+        if rangeHeader:
+            start = int(re.match(r'bytes=(\d+)-', rangeHeader).group(1))
+            if start >= len(data):
+                self.send_response(416)
+                self.send_header('Content-Range', 'bytes */{}'.format(len(data)))
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header('Content-Range', 'bytes {}-{}/{}'.format(start, len(data) - 1, len(data)))
+            body = data[start:]
+        else:
+            self.send_response(200)
+            body = data
+        if self.conditional:
+            self.send_header('ETag', etag)
+            self.send_header('Last-Modified', self.lastModified)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class LocalServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
 
 
 class downloadTests(unittest.TestCase):
@@ -46,5 +117,266 @@ class downloadTests(unittest.TestCase):
             raise e
 
 
+class localDownloadTests(unittest.TestCase):
+    '''Used to ensure that downloads stream, resume, and run together against a local server
+    '''
+
+    @classmethod
+    def setUpClass(cls):
+        with open(path.join(SAMPLES, 'JMdict_sample.xml'), 'rb') as file:
+            cls.jmdict = file.read()
+        with open(path.join(SAMPLES, 'kanjidic2_sample.xml'), 'rb') as file:
+            cls.kanjidic = file.read()
+        radicals = io.BytesIO()
+        with zipfile.ZipFile(radicals, 'w') as archive:
+            archive.write(path.join(SAMPLES, 'kradfile'), 'kradfile')
+            archive.write(path.join(SAMPLES, 'radkfilex'), 'radkfilex')
+
+        RangeHandler.files = {
+            '/JMdict_e_examp.gz': gzip.compress(cls.jmdict),
+            '/kanjidic2.xml.gz': gzip.compress(cls.kanjidic),
+            '/kradzip.zip': radicals.getvalue()
+        }
+        cls.server = LocalServer(('127.0.0.1', 0), RangeHandler)
+        cls.url = 'http://127.0.0.1:{}'.format(cls.server.server_address[1])
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.folder = mkdtemp()
+        self.cwd = os.getcwd()
+        self.files = dict(RangeHandler.files)
+        RangeHandler.requests = []
+
+    def tearDown(self):
+        RangeHandler.files = self.files
+        RangeHandler.conditional = True
+        os.chdir(self.cwd)
+        rmtree(self.folder)
+
+    def test_streamed(self):
+        '''Downloads a whole file
+        '''
+        saveName = loadDataset(self.url + '/JMdict_e_examp.gz', self.folder, chunkSize=1000)
+        with open(saveName, 'rb') as file:
+            self.assertEqual(file.read(), RangeHandler.files['/JMdict_e_examp.gz'])
+        self.assertFalse(path.exists(saveName + '.part'))
+
+    def test_resume(self):
+        '''Starts from an interrupted download, which should only fetch the missing bytes
+        '''
+        data = RangeHandler.files['/JMdict_e_examp.gz']
+        self.writePart('JMdict_e_examp.gz', data[:500], hashlib.sha1(data).hexdigest())
+
+        saveName = loadDataset(self.url + '/JMdict_e_examp.gz', self.folder)
+        with open(saveName, 'rb') as file:
+            self.assertEqual(file.read(), data)
+        self.assertEqual(RangeHandler.requests, [('/JMdict_e_examp.gz', 'bytes=500-')])
+        self.assertFalse(path.exists(saveName + '.part.json'))
+
+    def test_changedResume(self):
+        '''Starts from an interrupted download of a file that changed since, which should download it again in full
+        '''
+        data = RangeHandler.files['/JMdict_e_examp.gz']
+        self.writePart('JMdict_e_examp.gz', b'x' * 500, 'old')
+
+        saveName = loadDataset(self.url + '/JMdict_e_examp.gz', self.folder)
+        with open(saveName, 'rb') as file:
+            self.assertEqual(file.read(), data)
+
+    def test_uncheckedResume(self):
+        '''Starts from a partial file without validators, which cannot be checked and should be dropped
+        '''
+        data = RangeHandler.files['/JMdict_e_examp.gz']
+        with open(path.join(self.folder, 'JMdict_e_examp.gz.part'), 'wb') as file:
+            file.write(b'x' * 500)
+
+        saveName = loadDataset(self.url + '/JMdict_e_examp.gz', self.folder)
+        with open(saveName, 'rb') as file:
+            self.assertEqual(file.read(), data)
+        self.assertEqual(RangeHandler.requests, [('/JMdict_e_examp.gz', None)])
+
+    def writePart(self, name, data, etagHash):
+        '''Writes an interrupted download with the ETag it was downloaded with
+        '''
+        partName = path.join(self.folder, name + '.part')
+        with open(partName, 'wb') as file:
+            file.write(data)
+        with open(partName + '.json', 'w', encoding='utf-8') as file:
+            json.dump({'etag': '"{}"'.format(etagHash), 'last_modified': None}, file)
+
+    def test_staleResume(self):
+        '''Starts from a checked partial file longer than the file on the server, which should get a 416 and restart the download
+        '''
+        data = RangeHandler.files['/kanjidic2.xml.gz']
+        self.writePart('kanjidic2.xml.gz', b'x' * (len(data) + 10), hashlib.sha1(data).hexdigest())
+
+        saveName = loadDataset(self.url + '/kanjidic2.xml.gz', self.folder)
+        with open(saveName, 'rb') as file:
+            self.assertEqual(hashlib.sha256(file.read()).hexdigest(), hashlib.sha256(data).hexdigest())
+        self.assertEqual(RangeHandler.requests, [('/kanjidic2.xml.gz', 'bytes={}-'.format(len(data) + 10)), ('/kanjidic2.xml.gz', None)])
+
+    def test_changedBetweenRequests(self):
+        '''Interrupts a download and changes the file on the server before resuming, which should restart from zero
+        '''
+        url = self.url + '/JMdict_e_examp.gz'
+        iterContent = download.requests.Response.iter_content
+
+        def interrupted(response, chunkSize=1, *args, **kwargs):
+            chunks = iterContent(response, chunkSize, *args, **kwargs)
+            yield next(chunks)
+            raise download.requests.ConnectionError("interrupted")
+
+        with mock.patch.object(download.requests.Response, 'iter_content', interrupted):
+            with self.assertRaises(download.requests.ConnectionError):
+                loadDataset(url, self.folder, chunkSize=100)
+        partName = path.join(self.folder, 'JMdict_e_examp.gz.part')
+        self.assertEqual(path.getsize(partName), 100)
+
+        data = gzip.compress(self.jmdict + b'<!-- new -->')
+        RangeHandler.files['/JMdict_e_examp.gz'] = data
+        saveName = loadDataset(url, self.folder, chunkSize=100)
+        with open(saveName, 'rb') as file:
+            self.assertEqual(hashlib.sha256(file.read()).hexdigest(), hashlib.sha256(data).hexdigest())
+        self.assertEqual(RangeHandler.requests, [('/JMdict_e_examp.gz', None), ('/JMdict_e_examp.gz', 'bytes=100-')])
+        self.assertFalse(path.exists(partName))
+        self.assertFalse(path.exists(partName + '.json'))
+
+    def test_loadAll(self):
+        '''Loads every dataset at once
+        '''
+        os.chdir(self.folder)
+        with mock.patch.multiple(download, JMDICT_URL=self.url + '/JMdict_e_examp.gz',
+                                 KANJIDIC_URL=self.url + '/kanjidic2.xml.gz', RADICALS_URL=self.url + '/kradzip.zip'):
+            loadAll()
+
+        with open(path.join('data', 'JMdict_e_examp.xml'), 'rb') as file:
+            self.assertEqual(file.read(), self.jmdict)
+        with open(path.join('data', 'kanjidic2.xml'), 'rb') as file:
+            self.assertEqual(file.read(), self.kanjidic)
+        self.assertTrue(path.exists(path.join('data', 'kradzip', 'radkfilex')))
+        self.assertEqual(sorted(os.listdir('data')), ['JMdict_e_examp.xml', 'kanjidic2.xml', 'kradzip', 'manifest.json'])
+
+    def test_loadResume(self):
+        '''Loads the JMdict after an interrupted download, which should resume by default
+        '''
+        os.chdir(self.folder)
+        os.mkdir('data')
+        data = RangeHandler.files['/JMdict_e_examp.gz']
+        with open(path.join('data', 'JMdict_e_examp.gz.part'), 'wb') as file:
+            file.write(data[:500])
+        with open(path.join('data', 'JMdict_e_examp.gz.part.json'), 'w', encoding='utf-8') as file:
+            json.dump({'etag': '"{}"'.format(hashlib.sha1(data).hexdigest()), 'last_modified': None}, file)
+
+        with mock.patch.object(download, 'JMDICT_URL', self.url + '/JMdict_e_examp.gz'):
+            loadJMdict()
+        with open(path.join('data', 'JMdict_e_examp.xml'), 'rb') as file:
+            self.assertEqual(file.read(), self.jmdict)
+        self.assertEqual(RangeHandler.requests, [('/JMdict_e_examp.gz', 'bytes=500-')])
+
+    def refresh(self):
+        '''Refreshes the JMdict from the local server
+
+        returns True if the JMdict was unpacked again
+        '''
+        with mock.patch.object(download, 'JMDICT_URL', self.url + '/JMdict_e_examp.gz'):
+            return download.refreshDataset(download.JMDICT_URL, path.join('data', 'JMdict_e_examp.xml'),
+                                           lambda name: download.unzip_gz(name, '.xml'))
+
+    def test_notModified(self):
+        '''Refreshes twice, where the second refresh should get a 304 and skip decompressing
+        '''
+        os.chdir(self.folder)
+        os.mkdir('data')
+        self.assertTrue(self.refresh())
+        manifest = download.readManifest()[self.url + '/JMdict_e_examp.gz']
+        self.assertEqual(manifest['last_modified'], RangeHandler.lastModified)
+
+        self.assertFalse(self.refresh())
+        self.assertEqual(len(RangeHandler.requests), 2)
+        self.assertEqual(sorted(os.listdir('data')), ['JMdict_e_examp.xml', 'manifest.json'])
+
+        # A new release on the server is downloaded again
+        RangeHandler.files['/JMdict_e_examp.gz'] = gzip.compress(self.jmdict + b'<!-- new -->')
+        self.assertTrue(self.refresh())
+        with open(path.join('data', 'JMdict_e_examp.xml'), 'rb') as file:
+            self.assertTrue(file.read().endswith(b'<!-- new -->'))
+
+    def test_sameChecksum(self):
+        '''Refreshes from a server without ETags, where the checksum should skip decompressing
+        '''
+        RangeHandler.conditional = False
+        os.chdir(self.folder)
+        os.mkdir('data')
+        self.assertTrue(self.refresh())
+        self.assertFalse(self.refresh())
+
+        # A missing output is unpacked again even though the checksum is the same
+        os.remove(path.join('data', 'JMdict_e_examp.xml'))
+        self.assertTrue(self.refresh())
+
+    def test_refreshStreamed(self):
+        '''Decompresses while downloading, where only the xml should be written
+        '''
+        os.chdir(self.folder)
+        os.mkdir('data')
+        url = self.url + '/JMdict_e_examp.gz'
+        saveName = path.join('data', 'JMdict_e_examp.xml')
+        self.assertTrue(download.refreshStreamed(url, saveName, chunkSize=100))
+        with open(saveName, 'rb') as file:
+            self.assertEqual(file.read(), self.jmdict)
+        self.assertEqual(sorted(os.listdir('data')), ['JMdict_e_examp.xml', 'manifest.json'])
+        self.assertEqual(download.readManifest()[url]['sha256'],
+                         hashlib.sha256(RangeHandler.files['/JMdict_e_examp.gz']).hexdigest())
+
+        self.assertFalse(download.refreshStreamed(url, saveName))
+        RangeHandler.conditional = False
+        self.assertFalse(download.refreshStreamed(url, saveName))
+
+    def test_truncatedStream(self):
+        '''Decompresses a cut off gzip file, which should fail without leaving a partial output
+        '''
+        os.chdir(self.folder)
+        os.mkdir('data')
+        RangeHandler.files['/JMdict_e_examp.gz'] = RangeHandler.files['/JMdict_e_examp.gz'][:-20]
+        saveName = path.join('data', 'JMdict_e_examp.xml')
+        with self.assertRaises(EOFError):
+            download.refreshStreamed(self.url + '/JMdict_e_examp.gz', saveName)
+        self.assertEqual(os.listdir('data'), [])
+
+    def test_unwritableStream(self):
+        '''Decompresses into a missing folder, which should raise the error from opening the output
+        '''
+        saveName = path.join(self.folder, 'missing', 'JMdict_e_examp.xml')
+        with self.assertRaises(FileNotFoundError) as context:
+            download.refreshStreamed(self.url + '/JMdict_e_examp.gz', saveName, dataDir=self.folder)
+        self.assertIsNone(context.exception.__context__)
+
+    def test_openDataset(self):
+        '''Parses a dataset straight from the download
+        '''
+        from src.JapaneseParsers.parseJMdict import parseEntries
+        from src.JapaneseParsers.parseKANJIDIC import parseCharacter
+
+        with download.openDataset(self.url + '/JMdict_e_examp.gz', chunkSize=100) as stream:
+            entries = list(parseEntries(stream, stream=True))
+        self.assertEqual(entries, list(parseEntries(path.join(SAMPLES, 'JMdict_sample.xml'))))
+
+        with download.openDataset(self.url + '/kanjidic2.xml.gz') as stream:
+            characters = [character[0] for character in parseCharacter(stream, stream=True)]
+        self.assertEqual(characters, ['亜', '唖', '口', '食'])
+
+    def test_concatenatedGzip(self):
+        '''Decompresses a gzip file made of several members
+        '''
+        data = gzip.compress(b'first ') + gzip.compress(b'second')
+        chunks = [data[i:i + 7] for i in range(0, len(data), 7)]
+        self.assertEqual(b''.join(download.iterDecompressed(chunks)), b'first second')
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,83 @@
+import os
+import pickle
+import unittest
+from os import path
+from shutil import copy, rmtree
+from tempfile import mkdtemp
+
+from src.JapaneseParsers.cacheParse import cachedCharacters, cachedEntries, getCacheName, readCache
+from src.JapaneseParsers.parseJMdict import parseEntries
+from src.JapaneseParsers.parseKANJIDIC import parseCharacter
+
+
+SAMPLES = path.join(path.dirname(__file__), 'samples')
+
+
+class testCache(unittest.TestCase):
+    '''Used to ensure that the parse cache is reused and invalidated properly
+    '''
+
+    def setUp(self):
+        self.folder = mkdtemp()
+        self.xlmFile = copy(path.join(SAMPLES, 'JMdict_sample.xml'), self.folder)
+        self.cacheName = getCacheName(parseEntries, self.xlmFile, (False, False, True))
+
+    def tearDown(self):
+        rmtree(self.folder)
+
+    def test_warmStart(self):
+        '''Parses twice, checking that the second run is served from the cache
+        '''
+        expected = list(parseEntries(self.xlmFile))
+        self.assertEqual(list(cachedEntries(self.xlmFile)), expected)
+        self.assertTrue(path.exists(self.cacheName))
+
+        self.assertEqual(readCache(self.cacheName, self.xlmFile), expected)
+        self.assertEqual(list(cachedEntries(self.xlmFile)), expected)
+
+    def test_touchedFile(self):
+        '''Changes only the mtime, so the content hash should keep the cache
+        '''
+        list(cachedEntries(self.xlmFile))
+        stat = os.stat(self.xlmFile)
+        os.utime(self.xlmFile, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self.assertIsNotNone(readCache(self.cacheName, self.xlmFile))
+        with open(self.cacheName, 'rb') as file:
+            self.assertEqual(pickle.load(file)['mtime'], stat.st_mtime_ns + 10**9)
+
+    def test_truncatedCache(self):
+        '''Cuts the items of the cache short, so the cache should be ignored and rebuilt
+        '''
+        expected = list(cachedEntries(self.xlmFile))
+        size = os.path.getsize(self.cacheName)
+        with open(self.cacheName, 'r+b') as file:
+            file.truncate(size - 100)
+
+        self.assertIsNone(readCache(self.cacheName, self.xlmFile))
+        self.assertEqual(list(cachedEntries(self.xlmFile)), expected)
+        self.assertEqual(os.path.getsize(self.cacheName), size)
+
+    def test_changedFile(self):
+        '''Changes the content, so the cache should be rebuilt
+        '''
+        list(cachedEntries(self.xlmFile))
+        with open(self.xlmFile, encoding='utf-8') as file:
+            content = file.read()
+        with open(self.xlmFile, 'w', encoding='utf-8') as file:
+            file.write(content.replace('<gloss>to eat</gloss>', '<gloss>to consume</gloss>'))
+
+        self.assertIsNone(readCache(self.cacheName, self.xlmFile))
+        entries = list(cachedEntries(self.xlmFile))
+        self.assertIn('to consume', entries[3][1]['食べる']['たべる']['phrases'])
+
+    def test_characters(self):
+        '''Checks that the KANJIDIC characters are cached unchanged
+        '''
+        xmlFile = copy(path.join(SAMPLES, 'kanjidic2_sample.xml'), self.folder)
+        expected = list(parseCharacter(xmlFile))
+        self.assertEqual(list(cachedCharacters(xmlFile)), expected)
+        self.assertEqual(list(cachedCharacters(xmlFile)), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import gzip
+import io
+import unittest
+from os import path
+from shutil import rmtree
+from tempfile import mkdtemp
+
+from src.JapaneseParsers.parseJMdict import getEntityTable, parseEntries, parseEntriesParallel
+from src.JapaneseParsers.util_parse import BlockReader, EntityTable, iterCodeBlocks
+
+
+SAMPLES = path.join(path.dirname(__file__), 'samples')
+
+CODE_KEYS = ['part_of_speech', 'fields', 'info_def', 'dialects', 'info_word']
+
+
+def describeEntry(kana, item, table):
+    '''Expands the entity codes of a parsed entry into their descriptions
+    '''
+    def describeCell(cell):
+        cell = dict(cell)
+        for key in CODE_KEYS:
+            cell[key] = table.describe(cell[key])
+        return cell
+
+    if kana:
+        return {word: describeCell(cell) for word, cell in item.items()}
+    return {word: {reading: describeCell(cell) for reading, cell in readings.items()}
+            for word, readings in item.items()}
+
+
+class testEntityCodes(unittest.TestCase):
+    '''Used to ensure that keeping the entity codes gives the same entries as expanding them
+    '''
+
+    def setUp(self):
+        self.xlmFile = path.join(SAMPLES, 'JMdict_sample.xml')
+        self.table = getEntityTable(self.xlmFile)
+
+    def test_codes(self):
+        '''Parses the sample with codes, which should keep the entity names
+        '''
+        entries = {seq: item for seq, kana, item in parseEntries(self.xlmFile, sequence=True, codes=True)}
+        self.assertEqual(entries[1358280]['食べる']['たべる']['part_of_speech'][:2], ['v1', 'vt'])
+        self.assertEqual(entries[2029080]['ねえ']['part_of_speech'], ['int'])
+        self.assertEqual(self.table['v1'], 'Ichidan verb')
+
+    def test_sameEntries(self):
+        '''Expands the codes with the entity table, which should match the entries parsed with descriptions
+        '''
+        for stream in [False, True]:
+            expected = list(parseEntries(self.xlmFile, stream=stream))
+            coded = list(parseEntries(self.xlmFile, stream=stream, codes=True))
+            self.assertEqual([(kana, describeEntry(kana, item, self.table)) for kana, item in coded], expected)
+
+    def test_filters(self):
+        '''Removes archaic and inappropriate entries with codes, which should remove the same entries
+        '''
+        self.assertEqual(self.table.matching('archaic'), frozenset(['arch', 'adj-ku', 'v4r']))
+        for remove_archaic in [False, True]:
+            for filter in [False, True]:
+                expected = list(parseEntries(self.xlmFile, remove_archaic, filter, sequence=True))
+                coded = list(parseEntries(self.xlmFile, remove_archaic, filter, sequence=True, codes=True))
+                self.assertEqual([(seq, kana, describeEntry(kana, item, self.table)) for seq, kana, item in coded],
+                                 expected)
+
+    def test_sources(self):
+        '''Parses a gzip archive, a file object, and in parallel with codes
+        '''
+        expected = list(parseEntries(self.xlmFile, codes=True))
+
+        folder = mkdtemp()
+        try:
+            gzName = path.join(folder, 'JMdict_sample.xml.gz')
+            with open(self.xlmFile, 'rb') as file, gzip.open(gzName, 'wb') as archive:
+                archive.write(file.read())
+            self.assertEqual(list(parseEntries(gzName, stream=True, codes=True)), expected)
+            self.assertEqual(getEntityTable(gzName)['v1'], 'Ichidan verb')
+        finally:
+            rmtree(folder)
+
+        with open(self.xlmFile, 'rb') as file:
+            self.assertEqual(list(parseEntries(file, stream=True, codes=True)), expected)
+        self.assertEqual(list(parseEntriesParallel(self.xlmFile, processes=2, codes=True)), expected)
+
+    def test_codeBlocks(self):
+        '''Reads the rewritten xml with blocks smaller than the DTD
+        '''
+        with open(self.xlmFile, 'rb') as file:
+            original = file.read()
+
+        table = EntityTable()
+        text = BlockReader(iterCodeBlocks(io.BytesIO(original), table, blockSize=64)).read()
+        self.assertIn(b'<!ENTITY v1 "v1">', text)
+        self.assertEqual(text[text.index(b']>'):], original[original.index(b']>'):])
+        self.assertEqual(table['X'], 'rude or X-rated term (not displayed in educational software)')
+
+
+if __name__ == '__main__':
+    unittest.main()
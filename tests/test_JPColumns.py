@@ -0,0 +1,76 @@
+import unittest
+import zipfile
+from os import path
+from shutil import rmtree
+from tempfile import mkdtemp
+
+from src.JapaneseParsers.columnsKANJIDIC import (
+    ALIGNMENT, MISSING, buildColumns, getList, getString, loadColumns, numpy, saveColumns
+)
+from src.JapaneseParsers.parseKANJIDIC import parseCharacter
+
+
+SAMPLES = path.join(path.dirname(__file__), 'samples')
+
+
+class testColumns(unittest.TestCase):
+    '''Used to ensure that the columnar KANJIDIC export matches the parser output
+    '''
+
+    @classmethod
+    def setUpClass(cls):
+        cls.folder = mkdtemp()
+        cls.xmlFile = path.join(SAMPLES, 'kanjidic2_sample.xml')
+        cls.characters = list(parseCharacter(cls.xmlFile))
+        cls.fileName = path.join(cls.folder, 'kanjidic2.npz')
+        saveColumns(buildColumns(cls.xmlFile), cls.fileName)
+
+    @classmethod
+    def tearDownClass(cls):
+        rmtree(cls.folder)
+
+    def checkColumns(self, columns):
+        '''Compares every column with the parsed characters
+        '''
+        for row, kanjiItem in enumerate(self.characters):
+            self.assertEqual(getString(columns, 'literal', row), kanjiItem[0])
+            for name, position in [('grade', 5), ('stroke', 6), ('freq', 8), ('jlpt', 9)]:
+                expected = MISSING if kanjiItem[position] is None else int(kanjiItem[position])
+                self.assertEqual(int(columns[name][row]), expected)
+            for name, position in [('on', 15), ('kun', 16), ('meanings', 17), ('nanori', 18)]:
+                self.assertEqual(getList(columns, name, row), kanjiItem[position])
+
+    def test_memoryviews(self):
+        '''Loads the columns as memoryviews over the mapped file
+        '''
+        columns = loadColumns(self.fileName)
+        self.assertEqual(len(columns['stroke']), 4)
+        self.assertEqual(columns['stroke'].format, 'h')
+        self.checkColumns(columns)
+
+    def test_aligned(self):
+        '''Checks that the array data of every member starts on an aligned offset
+        '''
+        with open(self.fileName, 'rb') as file:
+            data = file.read()
+        for info in zipfile.ZipFile(self.fileName).infolist():
+            self.assertEqual(info.compress_type, zipfile.ZIP_STORED)
+            extraLength = int.from_bytes(data[info.header_offset + 28:info.header_offset + 30], 'little')
+            start = info.header_offset + 30 + len(info.filename) + extraLength
+            headerLength = int.from_bytes(data[start + 8:start + 10], 'little')
+            self.assertEqual(start % ALIGNMENT, 0)
+            self.assertEqual((start + 10 + headerLength) % ALIGNMENT, 0)
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_numpy(self):
+        '''Loads the columns with numpy, both memory mapped and with numpy.load
+        '''
+        columns = loadColumns(self.fileName, asNumpy=True)
+        self.checkColumns(columns)
+        with numpy.load(self.fileName) as archive:
+            for name, column in columns.items():
+                self.assertTrue(numpy.array_equal(archive[name], column))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+from os import path
+
+from src.JapaneseParsers.deinflectJMdict import ADJ_I, V1, V5K, V5KS, DeinflectIndex, deinflect, getTypes, inflect
+
+
+SAMPLES = path.join(path.dirname(__file__), 'samples')
+
+
+class testDeinflect(unittest.TestCase):
+    '''Used to ensure that conjugated words are taken back to their dictionary forms
+    '''
+
+    def test_candidates(self):
+        '''Rewrites suffixes one rule at a time, only where the type allows it
+        '''
+        candidates = {(candidate, candidateType): reasons for candidate, candidateType, reasons in deinflect('食べられなかった')}
+        self.assertEqual(candidates[('食べる', V1)], ('passive or potential', 'negative', 'past'))
+        self.assertIn(('食べられない', ADJ_I), candidates)
+        # ない is only taken off adjectives, not the word as written
+        self.assertEqual(deinflect('食べる')[0][0], '食べる')
+        self.assertNotIn('食べなる', [candidate for candidate, _, _ in deinflect('食べられる')])
+
+    def test_types(self):
+        '''Reads the types from the part-of-speech codes
+        '''
+        self.assertEqual(getTypes(['v1', 'vt']), V1)
+        self.assertEqual(getTypes(['v5k-s', 'vi']), V5KS)
+        self.assertEqual(getTypes(['n', 'exp']), 0)
+
+    def test_inflect(self):
+        '''Every conjugated form deinflects back to its dictionary form
+        '''
+        for word, wordType in [('食べる', V1), ('書く', V5K), ('行く', V5KS), ('高い', ADJ_I)]:
+            forms = inflect(word, wordType)
+            self.assertTrue(forms)
+            for form, reasons in forms.items():
+                self.assertIn((word, wordType, reasons), deinflect(form), form)
+        self.assertIn('書いて', inflect('書く', V5K))
+        self.assertNotIn('行いて', inflect('行く', V5KS))
+
+
+class testDeinflectIndex(unittest.TestCase):
+    '''Used to ensure that conjugated words are found in the JMdict
+    '''
+
+    def setUp(self):
+        self.index = DeinflectIndex.fromFile(path.join(SAMPLES, 'JMdict_sample.xml'))
+
+    def test_lookup(self):
+        '''Finds the dictionary form and entry of conjugated verbs and adjectives
+        '''
+        cases = {
+            '食べられなかった': [('食べる', 1358280, ('passive or potential', 'negative', 'past'))],
+            '言いました': [('言う', 1587040, ('polite', 'past'))],
+            '云わない': [('云う', 1587040, ('negative',))],
+            '高くなかった': [('高い', 1270350, ('negative', 'past'))],
+            '行って': [('行く', 1578850, ('te',))],
+            'いきます': [('いく', 1578850, ('polite',))],
+            'たべている': [('たべる', 1358280, ('te', 'progressive'))],
+        }
+        for text, expected in cases.items():
+            self.assertEqual(self.index.lookup(text), expected, text)
+
+    def test_asWritten(self):
+        '''Finds words as written whatever their part-of-speech, and nothing for unknown words
+        '''
+        self.assertEqual(self.index.lookup('明白'), [('明白', 1000220, ())])
+        self.assertEqual(self.index.lookup('食べさせなかった'), [('食べる', 1358280, ('causative', 'negative', 'past'))])
+        self.assertEqual(self.index.lookup('知らない'), [])
+
+    def test_cache(self):
+        '''Keeps the results of recent lookups up to the cache size
+        '''
+        index = DeinflectIndex.fromFile(path.join(SAMPLES, 'JMdict_sample.xml'), cacheSize=2)
+        first = index.lookup('食べた')
+        self.assertIs(index.lookup('食べた'), first)
+        index.lookup('行った')
+        index.lookup('言った')
+        self.assertEqual(len(index.cache), 2)
+        self.assertNotIn('食べた', index.cache)
+
+
+if __name__ == '__main__':
+    unittest.main()
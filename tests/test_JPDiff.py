@@ -0,0 +1,130 @@
+import unittest
+from os import path
+from shutil import rmtree
+from tempfile import mkdtemp
+
+from src.JapaneseParsers.diffJMdict import (
+    ADDED, MODIFIED, REMOVED, diffEntries, diffSnapshots, loadSnapshot, makeSnapshot, saveSnapshot
+)
+from src.JapaneseParsers.exportSQLite import connect, exportDatabase, getEntries, updateEntries
+from src.JapaneseParsers.indexJMdict import JMdictIndex
+from src.JapaneseParsers.parseJMdict import parseEntries
+from src.JapaneseParsers.util_parse import iterRawElements
+
+
+SAMPLES = path.join(path.dirname(__file__), 'samples')
+
+NEW_ENTRY = '''<entry>
+<ent_seq>2999999</ent_seq>
+<r_ele>
+<reb>テスト</reb>
+</r_ele>
+<sense>
+<pos>&n;</pos>
+<gloss>test</gloss>
+</sense>
+</entry>
+</JMdict>'''
+
+
+class testDiff(unittest.TestCase):
+    '''Used to ensure that only the changed entries of a new release are found and applied
+    '''
+
+    def setUp(self):
+        self.folder = mkdtemp()
+        self.oldFile = path.join(SAMPLES, 'JMdict_sample.xml')
+        with open(self.oldFile, 'r', encoding='utf-8') as file:
+            text = file.read()
+
+        # Change a gloss, drop the ねえ entry, and add a new entry
+        text = text.replace('<gloss>to eat</gloss>', '<gloss>to eat (food)</gloss>')
+        start = text.index('<entry>\n<ent_seq>2029080')
+        text = text[:start] + text[text.index('</entry>', start) + len('</entry>\n'):]
+        text = text.replace('</JMdict>', NEW_ENTRY)
+
+        self.newFile = path.join(self.folder, 'JMdict_new.xml')
+        with open(self.newFile, 'w', encoding='utf-8') as file:
+            file.write(text)
+
+    def tearDown(self):
+        rmtree(self.folder)
+
+    def test_snapshots(self):
+        '''Compares the snapshots of two releases, and saves and loads a snapshot
+        '''
+        old = makeSnapshot(self.oldFile)
+        self.assertEqual(len(old), 11)
+        self.assertEqual(diffSnapshots(old, old), ([], [], []))
+        self.assertEqual(diffSnapshots(old, makeSnapshot(self.newFile)), ([2999999], [2029080], [1358280]))
+
+        snapshotName = path.join(self.folder, 'JMdict.snapshot')
+        saveSnapshot(old, snapshotName, self.oldFile)
+        self.assertEqual(loadSnapshot(snapshotName), old)
+
+    def test_rawEntries(self):
+        '''Splits the entries with blocks smaller than an entry, which should match the default split
+        '''
+        expected = list(iterRawElements(self.oldFile, 'JMdict', 'entry'))
+        self.assertEqual(len(expected), 11)
+        self.assertEqual(list(iterRawElements(self.oldFile, 'JMdict', 'entry', blockSize=7)), expected)
+        self.assertTrue(expected[0][0].endswith(b'<JMdict>'))
+        self.assertTrue(all(raw.startswith(b'<entry>') and raw.endswith(b'</entry>') for _, raw in expected))
+
+    def test_entityChange(self):
+        '''Changes the description of an entity, which should only modify the entries using it
+        '''
+        with open(self.oldFile, 'r', encoding='utf-8') as file:
+            text = file.read()
+        with open(self.newFile, 'w', encoding='utf-8') as file:
+            file.write(text.replace('<!ENTITY int "interjection (kandoushi)">', '<!ENTITY int "interjection">'))
+
+        changes = list(diffEntries(self.oldFile, self.newFile))
+        self.assertEqual([(change, seq) for change, seq, _, _ in changes], [(MODIFIED, 2029080)])
+        self.assertEqual(changes[0][3]['ねえ']['part_of_speech'], ['interjection'])
+
+    def test_diffEntries(self):
+        '''Finds the changed entries against a snapshot and against the previous file
+        '''
+        snapshot = {}
+        changes = list(diffEntries(makeSnapshot(self.oldFile), self.newFile, snapshot=snapshot))
+        self.assertEqual([(change, seq) for change, seq, kana, item in changes],
+                         [(MODIFIED, 1358280), (ADDED, 2999999), (REMOVED, 2029080)])
+        self.assertIn('to eat (food)', changes[0][3]['食べる']['たべる']['phrases'])
+        newEntries = {seq: (kana, item) for seq, kana, item in parseEntries(self.newFile, sequence=True)}
+        self.assertEqual(changes[1][2:], newEntries[2999999])
+        self.assertEqual(changes[2][2:], (None, None))
+        self.assertEqual(snapshot, makeSnapshot(self.newFile))
+
+        self.assertEqual(list(diffEntries(self.oldFile, self.oldFile)), [])
+        self.assertEqual(len(list(diffEntries(self.oldFile, self.newFile))), 3)
+
+    def test_applyChanges(self):
+        '''Applies the changes to an index and a database, which should then match a full rebuild
+        '''
+        changes = list(diffEntries(self.oldFile, self.newFile))
+        expected = list(parseEntries(self.newFile, sequence=True))
+
+        index = JMdictIndex.fromFile(self.oldFile)
+        self.assertEqual(index.applyChanges(changes), 3)
+        rebuilt = JMdictIndex.fromFile(self.newFile)
+        self.assertEqual(index.entries, rebuilt.entries)
+        for table in ['byKanji', 'byReading', 'byGloss']:
+            self.assertEqual({key: sorted(seqs) for key, seqs in getattr(index, table).items()},
+                             {key: sorted(seqs) for key, seqs in getattr(rebuilt, table).items()})
+
+        dbFile = path.join(self.folder, 'japanese.sqlite')
+        exportDatabase(dbFile, xlmFile=self.oldFile)
+        conn = connect(dbFile)
+        try:
+            self.assertEqual(updateEntries(conn, changes), 3)
+            seqs = [row[0] for row in conn.execute('SELECT ent_seq FROM entry')]
+            self.assertEqual(getEntries(conn, seqs),
+                             sorted(expected))
+            self.assertEqual(conn.execute('SELECT COUNT(*) FROM gloss WHERE gloss = ?', ('rude interjection',)).fetchone()[0], 0)
+        finally:
+            conn.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
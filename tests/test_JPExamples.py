@@ -0,0 +1,67 @@
+import unittest
+from os import path
+from shutil import rmtree
+from tempfile import mkdtemp
+
+from src.JapaneseParsers.exampleJMdict import ExampleCorpus, iterExamples
+from src.JapaneseParsers.parseJMdict import parseEntries
+
+
+SAMPLES = path.join(path.dirname(__file__), 'samples')
+
+
+class testExampleCorpus(unittest.TestCase):
+    '''Used to ensure that example sentences are kept once and found by entry and by word
+    '''
+
+    def setUp(self):
+        self.xlmFile = path.join(SAMPLES, 'JMdict_sample.xml')
+        self.corpus = ExampleCorpus.fromFile(self.xlmFile)
+
+    def test_sentences(self):
+        '''Reads both sentences of each example from its ex_sent elements
+        '''
+        for _, item in parseEntries(self.xlmFile):
+            if '明白' in item:
+                self.assertEqual(item['明白']['めいはく']['examples'],
+                                 [(['tat', '123593'], '明白', 'That is an obvious fact.', 'それは明白な事実だ。')])
+
+    def test_deduplicate(self):
+        '''Stores a sentence given for several entries once
+        '''
+        self.assertEqual(len(self.corpus), 2)
+        self.assertEqual(self.corpus.getSentence(123593), ('tat', 'それは明白な事実だ。', 'That is an obvious fact.'))
+        self.assertIsNone(self.corpus.getSentence(1))
+        self.assertEqual([seq for seq, _, _ in iterExamples(self.xlmFile)], [1000220, 1358280])
+
+    def test_lookup(self):
+        '''Finds the examples of an entry, and the sentences of a word as written or as used
+        '''
+        self.assertEqual(self.corpus.lookupEntry(1358280), [
+            (1, 77654, '食べる', '朝ご飯を食べる。', 'I eat breakfast.'),
+            (1, 123593, '食べ', 'それは明白な事実だ。', 'That is an obvious fact.')
+        ])
+        self.assertEqual(self.corpus.lookupEntry('1358280', sense=2), [])
+        self.assertEqual(self.corpus.lookupEntry(1000320), [])
+        self.assertEqual([sourceId for sourceId, _, _ in self.corpus.lookupWord('たべる')], [77654, 123593])
+        self.assertEqual(self.corpus.lookupWord('食べ'), [(123593, 'それは明白な事実だ。', 'That is an obvious fact.')])
+        self.assertEqual([sourceId for sourceId, _, _ in self.corpus.lookupWord('めいはく')], [123593])
+
+    def test_save(self):
+        '''Loads the same corpus that was saved
+        '''
+        folder = mkdtemp()
+        try:
+            fileName = path.join(folder, 'examples.bin')
+            self.corpus.save(fileName)
+            loaded = ExampleCorpus.load(fileName)
+        finally:
+            rmtree(folder)
+
+        self.assertEqual(loaded.sentences, self.corpus.sentences)
+        self.assertEqual(loaded.lookupEntry(1358280), self.corpus.lookupEntry(1358280))
+        self.assertEqual(loaded.lookupWord('食べる'), self.corpus.lookupWord('食べる'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import contextlib
+import io
+import unittest
+from os import path
+
+from src.JapaneseParsers.filterJMdict import EntryFilter
+from src.JapaneseParsers.parseJMdict import parseEntries, parseEntriesParallel
+
+
+SAMPLES = path.join(path.dirname(__file__), 'samples')
+
+
+def project(kana, item, keys):
+    '''Keeps only some keys of the reading dictionaries of a parsed entry
+    '''
+    if kana:
+        return {word: {key: cell[key] for key in keys} for word, cell in item.items()}
+    return {word: {reading: {key: cell[key] for key in keys} for reading, cell in readings.items()}
+            for word, readings in item.items()}
+
+
+class testEntryFilter(unittest.TestCase):
+    '''Used to ensure that filtering before decoding keeps the same entries as filtering afterwards
+    '''
+
+    def setUp(self):
+        self.xlmFile = path.join(SAMPLES, 'JMdict_sample.xml')
+        self.entries = list(parseEntries(self.xlmFile, sequence=True))
+
+    def getSeqs(self, **kwargs):
+        return [seq for seq, _, _ in parseEntries(self.xlmFile, sequence=True, **kwargs)]
+
+    def test_checks(self):
+        '''Filters by each kind of check, with and without entity codes
+        '''
+        cases = [
+            (EntryFilter(pos='v1'), [1358280]),
+            (EntryFilter(kanaOnly=True), [1000000, 1049180, 2029080, 2833960]),
+            (EntryFilter(field=['food', 'comp']), [1358280, 1049180]),
+            (EntryFilter(priority='ichi1', excludePos='pn'), [1000220, 1358280, 1587040, 1270350, 1578850]),
+            (EntryFilter(excludeMisc='X', kanaOnly=False), [1000220, 1358280, 1405800, 1587040, 1270350, 1578850]),
+        ]
+        for where, expected in cases:
+            self.assertEqual(self.getSeqs(where=where), expected)
+            self.assertEqual(self.getSeqs(where=where, codes=True), expected)
+            parallel = parseEntriesParallel(self.xlmFile, sequence=True, processes=2, where=where)
+            self.assertEqual([seq for seq, _, _ in parallel], expected)
+
+        kept = {seq: (kana, item) for seq, kana, item in parseEntries(self.xlmFile, sequence=True, where=cases[1][0])}
+        self.assertEqual(kept, {seq: (kana, item) for seq, kana, item in self.entries if kana})
+
+    def test_fileObject(self):
+        '''Filters a file object, which needs codes=True for the entity checks
+        '''
+        with open(self.xlmFile, 'rb') as file:
+            self.assertRaises(ValueError, list, parseEntries(file, stream=True, where=EntryFilter(pos='v1')))
+        with open(self.xlmFile, 'rb') as file:
+            self.assertEqual(len(list(parseEntries(file, stream=True, where=EntryFilter(priority='news1')))), 4)
+        with open(self.xlmFile, 'rb') as file:
+            self.assertEqual(len(list(parseEntries(file, stream=True, codes=True, where=EntryFilter(pos='v1')))), 1)
+
+    def test_projection(self):
+        '''Builds only some keys, which should match the full entries with the other keys removed
+        '''
+        keys = ['phrases', 'part_of_speech', 'record']
+        projected = list(parseEntries(self.xlmFile, sequence=True, keys=keys))
+        self.assertEqual(projected, [(seq, kana, project(kana, item, keys)) for seq, kana, item in self.entries])
+
+        filtered = list(parseEntries(self.xlmFile, True, True, sequence=True, keys=['phrases']))
+        expected = list(parseEntries(self.xlmFile, True, True, sequence=True))
+        self.assertEqual(filtered, [(seq, kana, project(kana, item, ['phrases'])) for seq, kana, item in expected])
+
+        records = list(parseEntries(self.xlmFile, keys=['phrases'], records=True))
+        self.assertEqual(records[2][1]['彼処']['かしこ'].part_of_speech, ())
+        self.assertRaises(ValueError, list, parseEntries(self.xlmFile, keys=['gloss']))
+
+    def test_quiet(self):
+        '''Removes archaic and inappropriate entries without printing anything
+        '''
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.assertEqual(len(list(parseEntries(self.xlmFile, True, True))), 10)
+        self.assertEqual(output.getvalue(), '')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+from os import path
+
+from src.JapaneseParsers.fuzzyJMdict import ReadingIndex, editDistance, getDeletions
+from src.JapaneseParsers.util_kana import foldLongVowels, normalizeReading, romajiToKana, toHiragana
+
+
+SAMPLES = path.join(path.dirname(__file__), 'samples')
+
+
+class testKana(unittest.TestCase):
+    '''Used to ensure that readings typed in any script normalize to the same hiragana
+    '''
+
+    def test_hiragana(self):
+        '''Folds full and half width katakana into hiragana
+        '''
+        self.assertEqual(toHiragana('タベル'), 'たべる')
+        self.assertEqual(toHiragana('ｶﾀｶﾅ'), 'かたかな')
+        self.assertEqual(toHiragana('ヴァ食べ'), 'ゔぁ食べ')
+
+    def test_romaji(self):
+        '''Converts Hepburn, Kunrei, and wapuro romaji
+        '''
+        cases = {'taberu': 'たべる', 'shinbun': 'しんぶん', 'shimbun': 'しんぶん', 'sinbun': 'しんぶん',
+                 'kitte': 'きって', 'matcha': 'まっちゃ', 'konnichiwa': 'こんにちわ', "kon'ya": 'こんや',
+                 'konya': 'こにゃ', 'onna': 'おんな', 'honn': 'ほん', 'tōkyō': 'とうきょう', 'tsukue': 'つくえ',
+                 'tukue': 'つくえ', 'kyou': 'きょう', 'jaa': 'じゃあ', 'chotto': 'ちょっと'}
+        for romaji, kana in cases.items():
+            self.assertEqual(romajiToKana(romaji), kana, romaji)
+
+    def test_longVowels(self):
+        '''Expands long vowel marks and folds lengthening vowels
+        '''
+        self.assertEqual(normalizeReading('ラーメン'), 'らあめん')
+        self.assertEqual(normalizeReading('KONPYU-TA-'), 'こんぴゅうたあ')
+        self.assertEqual(normalizeReading('ー'), 'ー')
+        self.assertEqual(foldLongVowels('とうきょう'), foldLongVowels(normalizeReading('tokyo')))
+        self.assertEqual(foldLongVowels('せんせい'), 'せんせ')
+
+
+class testReadingIndex(unittest.TestCase):
+    '''Used to ensure that readings are found from any script and with typos
+    '''
+
+    def setUp(self):
+        self.index = ReadingIndex.fromFile(path.join(SAMPLES, 'JMdict_sample.xml'), maxDistance=2)
+
+    def test_lookup(self):
+        '''Looks up readings as katakana, hiragana, and romaji
+        '''
+        for text in ['たべる', 'タベル', 'taberu']:
+            self.assertEqual(self.index.lookup(text), [('たべる', 1358280)])
+        self.assertEqual(self.index.lookup('コンピューター'), [('コンピューター', 1049180)])
+        self.assertEqual(self.index.lookup('konpyuta'), [('コンピューター', 1049180), ('コンピュータ', 1049180)])
+        self.assertEqual(self.index.lookup('konpyuta', folded=False), [])
+        self.assertEqual(self.index.lookup('ne-'), [('ねえ', 2029080)])
+
+    def test_editDistance(self):
+        '''Counts swaps of neighbours as one edit, and stops past the limit
+        '''
+        self.assertEqual(editDistance('あそこ', 'あすこ', 2), 1)
+        self.assertEqual(editDistance('たべる', 'たるべ', 2), 1)
+        self.assertEqual(editDistance('たべる', 'た', 2), 2)
+        self.assertEqual(editDistance('たべる', 'いく', 1), 2)
+        self.assertEqual(getDeletions('あいう', 1), {'あいう', 'いう', 'あう', 'あい'})
+
+    def test_search(self):
+        '''Finds the readings within the typos, matching a comparison with every reading
+        '''
+        self.assertEqual(self.index.search('tabelu', maxDistance=1)[0], (0, 'たべる', 1358280))
+        self.assertEqual(self.index.search('tabru', maxDistance=1), [(1, 'たべる', 1358280), (1, 'たる', 1405800)])
+        self.assertRaises(ValueError, self.index.search, 'taberu', 3)
+
+        for text in ['たべる', 'あそこ', 'いう', 'こんぴゅた', 'かしこい', 'xyz']:
+            for maxDistance in [0, 1, 2]:
+                key = normalizeReading(text)
+                expected = sorted((editDistance(key, other, maxDistance), other) for other in self.index.keys
+                                  if editDistance(key, other, maxDistance) <= maxDistance)
+                found = sorted({(distance, normalizeReading(reb)) for distance, reb, _ in
+                                self.index.search(text, maxDistance)})
+                self.assertEqual(found, expected, (text, maxDistance))
+
+
+if __name__ == '__main__':
+    unittest.main()
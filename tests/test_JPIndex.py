@@ -0,0 +1,72 @@
+import unittest
+from os import path
+
+from src.JapaneseParsers.autocompleteJMdict import PrefixIndex
+from src.JapaneseParsers.indexJMdict import JMdictIndex, tokenize
+
+
+SAMPLES = path.join(path.dirname(__file__), 'samples')
+
+
+class testIndex(unittest.TestCase):
+    '''Used to ensure that the in-memory JMdict index finds entries
+    '''
+
+    @classmethod
+    def setUpClass(cls):
+        cls.index = JMdictIndex.fromFile(path.join(SAMPLES, 'JMdict_sample.xml'))
+
+    def test_lookups(self):
+        '''Looks up entries by sequence number, kanji, reading, and gloss
+        '''
+        self.assertEqual(len(self.index), 11)
+        seq, kana, item = self.index.lookupSeq('1358280')
+        self.assertFalse(kana)
+        self.assertIn('食べる', item)
+
+        self.assertEqual([seq for seq, _, _ in self.index.lookupKanji('彼所')], [1000320])
+        self.assertEqual([seq for seq, _, _ in self.index.lookupReading('あしこ')], [1000320])
+        self.assertEqual([seq for seq, _, _ in self.index.lookupGloss('To EAT')], [1358280])
+        self.assertEqual([seq for seq, _, _ in self.index.lookupGloss('to')], [1358280, 1405800, 1578850, 1587040])
+        self.assertEqual(self.index.lookupGloss('to fly'), [])
+        self.assertIsNone(self.index.lookupSeq(1))
+
+    def test_memory(self):
+        '''Checks that the lookup tables are counted in the memory usage
+        '''
+        self.assertGreater(self.index.memoryUsage(), self.index.memoryUsage(entries=False))
+        self.assertEqual(tokenize('to move (towards)'), ['to', 'move', 'towards'])
+
+
+class testPrefix(unittest.TestCase):
+    '''Used to ensure that the autocomplete index ranks prefix matches by commonness
+    '''
+
+    def test_search(self):
+        '''Searches the sample for kana and kanji prefixes
+        '''
+        index = PrefixIndex.fromFile(path.join(SAMPLES, 'JMdict_sample.xml'))
+        self.assertEqual(index.search('たべ'), [('たべる', 1358280)])
+        self.assertEqual([word for word, _ in index.search('た')], ['たかい', 'たべる', 'たる'])
+        self.assertEqual([word for word, _ in index.search('コンピ')], ['コンピューター', 'コンピュータ'])
+        self.assertEqual(index.search('食'), [('食べる', 1358280)])
+        self.assertEqual(index.search('た', k=1), [('たかい', 1270350)])
+        self.assertEqual(index.search('ぬ'), [])
+
+    def test_precomputed(self):
+        '''Checks that the precomputed prefixes give the same results as scanning
+        '''
+        words = [(word, seq, pri) for seq, (word, pri) in enumerate([
+            ('あい', ['nf30']), ('あいて', ['news1', 'nf02']), ('あう', []), ('あお', ['ichi1']),
+            ('あおい', ['spec2']), ('あか', ['nf10']), ('いえ', ['nf05']), ('いく', [])
+        ])]
+        scanned = PrefixIndex(words, maxK=3, scanLimit=100)
+        precomputed = PrefixIndex(words, maxK=3, scanLimit=1)
+        self.assertIn('あ', precomputed.top)
+        for prefix in ['', 'あ', 'あい', 'あお', 'い']:
+            self.assertEqual(precomputed.search(prefix, 3), scanned.search(prefix, 3))
+        self.assertEqual([word for word, _ in precomputed.search('あ', 3)], ['あいて', 'あか', 'あい'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import multiprocessing
+import unittest
+from os import path
+from shutil import rmtree
+from tempfile import mkdtemp
+
+from src.JapaneseParsers.indexJMdict import JMdictIndex
+from src.JapaneseParsers.mappedDictionary import MappedDictionary, compileDictionary
+from src.JapaneseParsers.parseKANJIDIC import parseCharacter
+
+
+SAMPLES = path.join(path.dirname(__file__), 'samples')
+
+
+def lookupInWorker(args):
+    '''Opens the dictionary in a worker process and looks up a reading
+    '''
+    fileName, reb = args
+    with MappedDictionary(fileName) as dictionary:
+        return [seq for seq, _, _ in dictionary.lookupReading(reb)]
+
+
+class testMapped(unittest.TestCase):
+    '''Used to ensure that the memory mapped dictionary gives the same lookups as the parsed datasets
+    '''
+
+    @classmethod
+    def setUpClass(cls):
+        cls.folder = mkdtemp()
+        cls.fileName = path.join(cls.folder, 'japanese.jdcmap')
+        compileDictionary(cls.fileName, path.join(SAMPLES, 'JMdict_sample.xml'), path.join(SAMPLES, 'kanjidic2_sample.xml'))
+        cls.index = JMdictIndex.fromFile(path.join(SAMPLES, 'JMdict_sample.xml'))
+        cls.dictionary = MappedDictionary(cls.fileName)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.dictionary.close()
+        rmtree(cls.folder)
+
+    def test_entries(self):
+        '''Looks up every entry, kanji, reading, and gloss token, and compares them with the JMdictIndex
+        '''
+        self.assertEqual(len(self.dictionary), len(self.index))
+        for seq in self.index.entries:
+            self.assertEqual(self.dictionary.lookupSeq(seq), self.index.lookupSeq(seq))
+        for keb in self.index.byKanji:
+            self.assertEqual(self.dictionary.lookupKanji(keb), self.index.lookupKanji(keb))
+        for reb in self.index.byReading:
+            self.assertEqual(self.dictionary.lookupReading(reb), self.index.lookupReading(reb))
+        for token in self.index.byGloss:
+            self.assertEqual(self.dictionary.lookupGloss(token), self.index.lookupGloss(token))
+        self.assertEqual(self.dictionary.lookupGloss('to eat'), self.index.lookupGloss('to eat'))
+
+    def test_missing(self):
+        '''Looks up keys that are not in the dictionary
+        '''
+        self.assertIsNone(self.dictionary.lookupSeq(1))
+        self.assertIsNone(self.dictionary.lookupSeq(9999999))
+        self.assertEqual(self.dictionary.lookupKanji('飲む'), [])
+        self.assertEqual(self.dictionary.lookupReading(''), [])
+        self.assertEqual(self.dictionary.lookupGloss('zzz'), [])
+        self.assertIsNone(self.dictionary.findCharacter('飲'))
+
+    def test_characters(self):
+        '''Finds every character of the KANJIDIC
+        '''
+        for kanjiItem in parseCharacter(path.join(SAMPLES, 'kanjidic2_sample.xml')):
+            self.assertEqual(self.dictionary.findCharacter(kanjiItem[0]), kanjiItem)
+
+    def test_close(self):
+        '''Closes the dictionary while the results of its lookups are still in use
+        '''
+        dictionary = MappedDictionary(self.fileName)
+        records = dictionary.findKey('entries.kanji', '食べる')
+        seqs = dictionary.getSection('entries.seqs')
+        dictionary.close()
+        self.assertEqual(len(records), 1)
+        self.assertEqual(len(seqs), len(self.index))
+
+    def test_processes(self):
+        '''Opens the same file from several worker processes
+        '''
+        with multiprocessing.Pool(2) as pool:
+            results = pool.map(lookupInWorker, [(self.fileName, 'たべる'), (self.fileName, 'いく')])
+        self.assertEqual(results, [[1358280], [1578850]])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+from os import path
+
+from src.JapaneseParsers.parseRADKFILE import parseRadK
+from src.JapaneseParsers.searchRadicals import RadicalSearch, iterBits
+
+
+SAMPLES = path.join(path.dirname(__file__), 'samples')
+
+
+class testRadicalSearch(unittest.TestCase):
+    '''Used to ensure that the radical bitsets find the right Kanji
+    '''
+
+    @classmethod
+    def setUpClass(cls):
+        cls.search = RadicalSearch.fromFiles(path.join(SAMPLES, 'radkfilex'), path.join(SAMPLES, 'kanjidic2_sample.xml'))
+
+    def test_lastRadical(self):
+        '''Checks that the last radical of the file is parsed
+        '''
+        self.assertEqual(list(parseRadK(path.join(SAMPLES, 'radkfilex')))[-1], ('良', '7', '食'))
+
+    def test_search(self):
+        '''Searches by several radicals, with and without stroke counts
+        '''
+        self.assertEqual(self.search.search(['口']), ['口', '亜', '唖'])
+        self.assertEqual(self.search.search(['口', '一']), ['亜', '唖'])
+        self.assertEqual(self.search.search(['口', '人']), [])
+        self.assertEqual(self.search.search(['口'], maxStrokes=7), ['口', '亜'])
+        self.assertEqual(self.search.search(['口'], minStrokes=8), ['唖'])
+        self.assertEqual(self.search.search(['口'], minStrokes=4, maxStrokes=6), [])
+        self.assertEqual(self.search.search(['？']), [])
+
+    def test_nextRadicals(self):
+        '''Checks the radicals left for narrowing a search
+        '''
+        kanji, radicals = self.search.query(['口'])
+        self.assertEqual(kanji, ['口', '亜', '唖'])
+        self.assertEqual(radicals, ['一', '｜'])
+
+        # Radicals shared by every result would not narrow it down
+        kanji, radicals = self.search.query(['一'])
+        self.assertEqual((kanji, radicals), (['亜', '唖'], []))
+
+        kanji, radicals = self.search.query(['口'], maxStrokes=3)
+        self.assertEqual((kanji, radicals), (['口'], []))
+        self.assertEqual(list(iterBits(0b100100000001)), [0, 8, 11])
+
+
+if __name__ == '__main__':
+    unittest.main()
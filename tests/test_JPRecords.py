@@ -0,0 +1,53 @@
+import pickle
+import unittest
+from os import path
+
+from src.JapaneseParsers.parseJMdict import parseEntries, parseEntriesParallel
+from src.JapaneseParsers.recordJMdict import Reading
+
+
+SAMPLES = path.join(path.dirname(__file__), 'samples')
+
+
+class testRecords(unittest.TestCase):
+    '''Used to ensure that the compact records hold the same data as the dictionaries
+    '''
+
+    def test_sameContent(self):
+        '''Converts every record back to a dictionary and compares it to the dictionary output
+        '''
+        xlmFile = path.join(SAMPLES, 'JMdict_sample.xml')
+        for (kana, item), (recordKana, record) in zip(parseEntries(xlmFile), parseEntries(xlmFile, records=True)):
+            self.assertEqual(kana, recordKana)
+            if kana:
+                self.assertEqual(item, {word: reading.asDict() for word, reading in record.items()})
+            else:
+                self.assertEqual(item, {word: {pronounce: reading.asDict() for pronounce, reading in readings.items()}
+                                        for word, readings in record.items()})
+
+    def test_dictionaryAccess(self):
+        '''Checks that a record can be read like the reading dictionaries
+        '''
+        _, item = next(parseEntries(path.join(SAMPLES, 'JMdict_sample.xml'), records=True))
+        reading = item['ヽ']
+        self.assertIsInstance(reading, Reading)
+        self.assertEqual(reading['part_of_speech'], ('unclassified',))
+        self.assertIs(reading.examples, ())
+        with self.assertRaises(KeyError):
+            reading['gloss']
+
+    def test_pickle(self):
+        '''Rebuilds pickled records with shared attributes, so worker processes can send them
+        '''
+        xlmFile = path.join(SAMPLES, 'JMdict_sample.xml')
+        entries = list(parseEntries(xlmFile, records=True))
+        self.assertEqual(list(parseEntriesParallel(xlmFile, records=True, processes=2)), entries)
+
+        reading = entries[0][1]['ヽ']
+        loaded = pickle.loads(pickle.dumps(reading))
+        self.assertEqual(loaded, reading)
+        self.assertIs(next(iter(loaded.phrases.values())), next(iter(reading.phrases.values())))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import os
+import unittest
+from os import path
+from shutil import rmtree
+from tempfile import mkdtemp
+
+from src.JapaneseParsers.exportSQLite import (
+    connect, exportDatabase, findByGloss, findByKanji, findByReading, findBySeq, findCharacter,
+    findKanjiByRadicals, findRadicals
+)
+from src.JapaneseParsers.parseJMdict import parseEntries
+from src.JapaneseParsers.parseKANJIDIC import parseCharacter
+
+
+SAMPLES = path.join(path.dirname(__file__), 'samples')
+
+
+class testSQLite(unittest.TestCase):
+    '''Used to ensure that the SQLite export can be queried
+    '''
+
+    @classmethod
+    def setUpClass(cls):
+        cls.folder = mkdtemp()
+        cls.dbFile = path.join(cls.folder, 'japanese.sqlite')
+        exportDatabase(cls.dbFile,
+                       xlmFile=path.join(SAMPLES, 'JMdict_sample.xml'),
+                       kanjiFile=path.join(SAMPLES, 'kanjidic2_sample.xml'),
+                       kradFile=path.join(SAMPLES, 'kradfile'),
+                       radkFile=path.join(SAMPLES, 'radkfilex'),
+                       batchSize=3)
+        cls.conn = connect(cls.dbFile)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.conn.close()
+        rmtree(cls.folder)
+
+    def test_entries(self):
+        '''Checks that every exported entry matches the parser output
+        '''
+        for seq, kana, item in parseEntries(path.join(SAMPLES, 'JMdict_sample.xml'), sequence=True):
+            self.assertEqual(findBySeq(self.conn, seq), (seq, kana, item))
+
+    def test_tables(self):
+        '''Queries the tags, cross-references, and examples of the readings in SQL
+        '''
+        rows = self.conn.execute('SELECT DISTINCT keb FROM reading JOIN reading_pos USING (reading_id) '
+                                 'WHERE tag = ? ORDER BY keb', ('Ichidan verb',))
+        self.assertEqual([keb for keb, in rows], ['喰べる', '食べる'])
+        rows = self.conn.execute('SELECT word, reading, sense FROM reading_xref JOIN reading USING (reading_id) '
+                                 'WHERE keb = ? AND reb = ? ORDER BY position', ('彼処', 'あそこ'))
+        self.assertEqual(rows.fetchall(), [('何処', None, None), ('此処', None, 1)])
+        self.assertEqual(self.conn.execute('SELECT COUNT(*) FROM example').fetchone()[0], 2)
+
+    def test_lookups(self):
+        '''Looks up entries by kanji, reading, and gloss
+        '''
+        self.assertEqual([seq for seq, _, _ in findByKanji(self.conn, '食べる')], [1358280])
+        self.assertEqual([seq for seq, _, _ in findByReading(self.conn, 'たべる')], [1358280])
+        self.assertEqual([seq for seq, _, _ in findByGloss(self.conn, 'To Eat')], [1358280])
+        self.assertEqual(findByKanji(self.conn, '飲む'), [])
+        self.assertIsNone(findBySeq(self.conn, 1))
+
+    def test_kanji(self):
+        '''Looks up characters and radicals
+        '''
+        expected = next(parseCharacter(path.join(SAMPLES, 'kanjidic2_sample.xml')))
+        self.assertEqual(findCharacter(self.conn, '亜'), expected)
+        self.assertEqual(findRadicals(self.conn, '食'), ['人', '良'])
+        self.assertEqual(findKanjiByRadicals(self.conn, ['口', '一']), ['亜', '唖'])
+        rows = self.conn.execute('SELECT literal FROM character_reading WHERE r_type = ? AND reading = ?', ('ja_on', 'ア'))
+        self.assertEqual([literal for literal, in rows], ['亜', '唖'])
+
+    def test_failedExport(self):
+        '''Keeps the previous database and removes the partial one when the export fails
+        '''
+        with self.assertRaises(FileNotFoundError):
+            exportDatabase(self.dbFile, xlmFile=path.join(self.folder, 'missing.xml'))
+        self.assertFalse(path.exists(self.dbFile + '.tmp'))
+        self.assertEqual(findRadicals(self.conn, '食'), ['人', '良'])
+        self.assertIn('japanese.sqlite', os.listdir(self.folder))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+from os import path
+from shutil import rmtree
+from tempfile import mkdtemp
+
+from src.JapaneseParsers.parseKANJIDIC import parseCharacter
+from src.JapaneseParsers.searchEnglish import (
+    ENTRY, KANJI, EnglishIndex, decodePostings, encodeVarint, getTerms, stem
+)
+
+
+SAMPLES = path.join(path.dirname(__file__), 'samples')
+
+
+class testEnglishSearch(unittest.TestCase):
+    '''Used to ensure that the english search finds and ranks entries and characters by meaning
+    '''
+
+    def setUp(self):
+        self.xlmFile = path.join(SAMPLES, 'JMdict_sample.xml')
+        self.kanjiFile = path.join(SAMPLES, 'kanjidic2_sample.xml')
+        self.index = EnglishIndex.fromFiles(self.xlmFile, self.kanjiFile)
+
+    def test_stem(self):
+        '''Stems words the way the Porter stemmer does
+        '''
+        words = ['caresses', 'ponies', 'relational', 'generalizations', 'eating', 'hopping', 'happy', 'agreed', 'filing']
+        self.assertEqual([stem(word) for word in words],
+                         ['caress', 'poni', 'relat', 'gener', 'eat', 'hop', 'happi', 'agre', 'file'])
+        self.assertEqual(getTerms('To eat (food)'), ['eat', 'food'])
+
+    def test_postings(self):
+        '''Encodes gaps and counts as variable length integers and decodes them again
+        '''
+        data = bytearray()
+        for value in [3, 1, 125, 2, 20000, 1]:
+            encodeVarint(value, data)
+        self.assertEqual(len(data), 8)
+        self.assertEqual(decodePostings(data, 0, len(data)), ([3, 128, 20128], [1, 2, 1]))
+
+    def test_meanings(self):
+        '''Reads the english meanings of the KANJIDIC, which have no m_lang
+        '''
+        meanings = {kanjiItem[0]: kanjiItem[17] for kanjiItem in parseCharacter(self.kanjiFile)}
+        self.assertEqual(meanings['亜'], ['Asia', 'rank next', 'come after'])
+
+    def test_search(self):
+        '''Finds entries and characters by their english meaning, best first
+        '''
+        self.assertEqual(len(self.index), 15)
+        self.assertEqual([(kind, key) for kind, key, _ in self.index.search('eating')],
+                         [(KANJI, '食'), (ENTRY, 1358280)])
+        self.assertEqual([key for _, key, _ in self.index.search('eats', kind=ENTRY)], [1358280])
+        self.assertEqual([key for _, key, _ in self.index.search('over there')][:1], [1000320])
+        self.assertEqual(self.index.search('xylophone'), [])
+        self.assertEqual(self.index.search('the'), [])
+
+        scores = [score for _, _, score in self.index.search('there', k=20)]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+
+    def test_priority(self):
+        '''Boosts the entries with ke_pri/re_pri commonness tags
+        '''
+        plain = EnglishIndex.fromFiles(self.xlmFile, self.kanjiFile, priorityWeight=0)
+        # 1000320 only has ichi1, which ranks 49 out of 99, and 1405800 has no tags
+        for query, seq, boost in [('there', 1000320, 1 + 0.5 * 50 / 98), ('sufficient', 1405800, 1)]:
+            ranked = self.index.search(query, k=1)[0]
+            unranked = plain.search(query, k=1)[0]
+            self.assertEqual(ranked[1], seq)
+            self.assertAlmostEqual(ranked[2] / unranked[2], boost, places=5)
+
+    def test_saveLoad(self):
+        '''Saves and loads the index, which should give the same results
+        '''
+        folder = mkdtemp()
+        try:
+            fileName = path.join(folder, 'english.index')
+            self.index.save(fileName)
+            loaded = EnglishIndex.load(fileName)
+        finally:
+            rmtree(folder)
+
+        self.assertEqual(loaded.keys, self.index.keys)
+        for query in ['eat', 'there', 'mouth', 'Asia', 'rank next']:
+            self.assertEqual(loaded.search(query), self.index.search(query))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+from os import path
+from shutil import rmtree
+from tempfile import mkdtemp
+
+from src.JapaneseParsers.segmentJMdict import LONGEST, Segmenter, segmentCorpus
+
+
+SAMPLES = path.join(path.dirname(__file__), 'samples')
+
+
+class testSegmenter(unittest.TestCase):
+    '''Used to ensure that unspaced text is split into JMdict words
+    '''
+
+    def setUp(self):
+        self.xlmFile = path.join(SAMPLES, 'JMdict_sample.xml')
+        self.segmenter = Segmenter.fromFile(self.xlmFile)
+
+    def test_trie(self):
+        '''Finds every keb and reb in the double array, and nothing else
+        '''
+        for word in ['明白', 'めいはく', '彼処', 'あそこ', '食べる', 'コンピューター', 'コンピュータ', 'ヽ']:
+            self.assertIn(word, self.segmenter)
+        for word in ['明', '食べ', 'コンピューターズ', '']:
+            self.assertNotIn(word, self.segmenter)
+        self.assertEqual(len(self.segmenter), 30)
+
+    def test_segment(self):
+        '''Splits a sentence into words, grouping unknown katakana and latin characters
+        '''
+        self.assertEqual(self.segmenter.segment('彼処でコンピュータを食べる'), [
+            ('彼処', (1000320,)), ('で', ()), ('コンピュータ', (1049180,)), ('を', ()), ('食べる', (1358280,))
+        ])
+        self.assertEqual(self.segmenter.segment('ABCテストは高い'), [
+            ('ABC', ()), ('テスト', ()), ('は', ()), ('高い', (1270350,))
+        ])
+        self.assertEqual(self.segmenter.segment(''), [])
+
+    def test_modes(self):
+        '''Takes the longest word at each position, or the cheapest path through the lattice
+        '''
+        segmenter = Segmenter([('あい', 1, ['ichi1']), ('いう', 2, []), ('あ', 3, [])])
+        self.assertEqual(segmenter.segment('あいう', LONGEST), [('あい', (1,)), ('う', ())])
+        self.assertEqual(segmenter.segment('あいう'), [('あ', (3,)), ('いう', (2,))])
+        self.assertRaises(ValueError, segmenter.segment, 'あいう', 'shortest')
+
+    def test_inflections(self):
+        '''Adds the conjugated forms of verbs and adjectives when asked to
+        '''
+        segmenter = Segmenter.fromFile(self.xlmFile, depth=2)
+        self.assertEqual(segmenter.segment('言いました高くない'), [('言いました', (1587040,)), ('高くない', (1270350,))])
+        self.assertEqual(self.segmenter.segment('高くない')[0], ('高', ()))
+
+
+class testSegmentCorpus(unittest.TestCase):
+    '''Used to ensure that a saved segmenter gives the same words when loaded, and in worker processes
+    '''
+
+    def setUp(self):
+        self.segmenter = Segmenter.fromFile(path.join(SAMPLES, 'JMdict_sample.xml'))
+        self.directory = mkdtemp()
+        self.fileName = path.join(self.directory, 'segmenter.bin')
+        self.segmenter.save(self.fileName)
+        self.sentences = ['彼処で食べる', 'コンピューターは明白', 'いく', 'ねえ、あそこ'] * 10
+
+    def tearDown(self):
+        rmtree(self.directory)
+
+    def test_load(self):
+        '''Loads the same trie that was saved
+        '''
+        loaded = Segmenter.load(self.fileName)
+        self.assertEqual(loaded.segmentBatch(self.sentences), self.segmenter.segmentBatch(self.sentences))
+        self.assertEqual(len(loaded), len(self.segmenter))
+
+    def test_processes(self):
+        '''Splits a corpus in chunks over several processes, in order or as they finish
+        '''
+        expected = self.segmenter.segmentBatch(self.sentences)
+        self.assertEqual(list(segmentCorpus(self.fileName, self.sentences, processes=2, chunkSize=3)), expected)
+        unordered = dict(segmentCorpus(self.fileName, self.sentences, processes=2, chunkSize=3, ordered=False))
+        self.assertEqual(unordered, dict(zip(self.sentences, expected)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+import gzip
+import io
+import unittest
+import zipfile
+from os import path
+from shutil import rmtree
+from tempfile import mkdtemp
+
+from src.JapaneseParsers.parseJMdict import parseEntries, parseEntriesParallel
+from src.JapaneseParsers.parseKANJIDIC import parseCharacter
+from src.JapaneseParsers.parseKRADFILE import parseKRad
+from src.JapaneseParsers.parseRADKFILE import parseRadK
+
+
+SAMPLES = path.join(path.dirname(__file__), 'samples')
+
+
+class testJMdictStream(unittest.TestCase):
+    '''Used to ensure that the incremental JMdict parser matches the full tree parser
+    '''
+
+    def test_sameEntries(self):
+        '''Parses the sample with and without streaming, then compares every entry
+        '''
+        xlmFile = path.join(SAMPLES, 'JMdict_sample.xml')
+        treeEntries = list(parseEntries(xlmFile))
+        streamEntries = list(parseEntries(xlmFile, stream=True))
+
+        self.assertEqual(len(treeEntries), 11)
+        self.assertEqual(treeEntries, streamEntries)
+
+    def test_fileObject(self):
+        '''Checks that an open file object can be streamed
+        '''
+        with open(path.join(SAMPLES, 'JMdict_sample.xml'), 'rb') as file:
+            kana, item = next(parseEntries(file, stream=True))
+            self.assertTrue(kana)
+            self.assertIn('ヽ', item)
+
+    def test_parallel(self):
+        '''Parses the sample in several chunks across processes and compares it with the serial parse
+        '''
+        xlmFile = path.join(SAMPLES, 'JMdict_sample.xml')
+        serialEntries = list(parseEntries(xlmFile, True, True))
+        parallelEntries = list(parseEntriesParallel(xlmFile, True, True, processes=2, chunksPerProcess=3))
+        self.assertEqual(serialEntries, parallelEntries)
+
+        unorderedEntries = list(parseEntriesParallel(xlmFile, processes=2, ordered=False, chunksPerProcess=3))
+        self.assertCountEqual([repr(item) for item in parseEntries(xlmFile)], [repr(item) for item in unorderedEntries])
+
+
+class testKANJIStream(unittest.TestCase):
+    '''Used to ensure that the incremental KANJIDIC parser matches the full tree parser
+    '''
+
+    def test_sameCharacters(self):
+        '''Parses the sample with and without streaming, then compares every character
+        '''
+        xmlFile = path.join(SAMPLES, 'kanjidic2_sample.xml')
+        treeCharacters = list(parseCharacter(xmlFile))
+        streamCharacters = list(parseCharacter(xmlFile, stream=True))
+
+        self.assertEqual([item[0] for item in treeCharacters], ['亜', '唖', '口', '食'])
+        self.assertEqual(treeCharacters, streamCharacters)
+        self.assertEqual(len(streamCharacters[0]), 19)
+
+
+class testCompressedSources(unittest.TestCase):
+    '''Used to ensure that the parsers read gzip and zip archives the same as the uncompressed files
+    '''
+
+    def setUp(self):
+        self.folder = mkdtemp()
+        for name in ['JMdict_sample.xml', 'kanjidic2_sample.xml']:
+            with open(path.join(SAMPLES, name), 'rb') as file, gzip.open(path.join(self.folder, name + '.gz'), 'wb') as archive:
+                archive.write(file.read())
+        self.zipName = path.join(self.folder, 'kradzip.zip')
+        with zipfile.ZipFile(self.zipName, 'w') as archive:
+            archive.write(path.join(SAMPLES, 'kradfile'), 'kradfile')
+            archive.write(path.join(SAMPLES, 'radkfilex'), 'radkfilex')
+
+    def tearDown(self):
+        rmtree(self.folder)
+
+    def test_gzipJMdict(self):
+        '''Parses the gzip JMdict as a path and as a file object, with and without streaming
+        '''
+        expected = list(parseEntries(path.join(SAMPLES, 'JMdict_sample.xml')))
+        gzName = path.join(self.folder, 'JMdict_sample.xml.gz')
+        self.assertEqual(list(parseEntries(gzName)), expected)
+        self.assertEqual(list(parseEntries(gzName, stream=True)), expected)
+        with open(gzName, 'rb') as file:
+            self.assertEqual(list(parseEntries(file, stream=True)), expected)
+            self.assertFalse(file.closed)
+
+        # Archives cannot be split between processes, so they are parsed serially
+        self.assertEqual(list(parseEntriesParallel(gzName, processes=2)), expected)
+
+    def test_gzipKANJIDIC(self):
+        '''Parses the gzip KANJIDIC
+        '''
+        expected = list(parseCharacter(path.join(SAMPLES, 'kanjidic2_sample.xml')))
+        gzName = path.join(self.folder, 'kanjidic2_sample.xml.gz')
+        self.assertEqual(list(parseCharacter(gzName)), expected)
+        self.assertEqual(list(parseCharacter(gzName, stream=True)), expected)
+
+    def test_zipRadicals(self):
+        '''Parses the radical files from inside the zip archive
+        '''
+        self.assertEqual(list(parseKRad(self.zipName, 'kradfile')), list(parseKRad(path.join(SAMPLES, 'kradfile'))))
+        self.assertEqual(list(parseRadK(self.zipName, 'radkfilex')), list(parseRadK(path.join(SAMPLES, 'radkfilex'))))
+        with self.assertRaises(ValueError):
+            list(parseKRad(self.zipName))
+
+        with open(path.join(SAMPLES, 'kradfile'), 'rb') as file:
+            data = io.BytesIO(gzip.compress(file.read()))
+        self.assertEqual(list(parseKRad(data)), list(parseKRad(path.join(SAMPLES, 'kradfile'))))
+
+
+if __name__ == '__main__':
+    unittest.main()